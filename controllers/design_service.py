@@ -0,0 +1,310 @@
+"""
+Servicio local HTTP/JSON de diseño de vigas compuestas (sin Qt).
+
+Uso:
+    python -m controllers.design_service --port 8765 --workers 4
+
+Endpoints:
+    POST /design   Un diseño (objeto JSON), una lista de diseños o {"designs": [...]}.
+                   Cada diseño usa las claves de CompositeBeamDesign con la
+                   etiqueta del perfil en 'beam_name'.
+    GET  /metrics  Rendimiento: solicitudes, diseños, lotes, latencias.
+    GET  /health   Estado del servicio.
+
+El servidor es asíncrono (asyncio, HTTP/1.1 con keep-alive). Las
+solicitudes concurrentes se agrupan en lotes vectorizados que se despachan
+a un pool de procesos; cada solicitud se responde cuando su lote termina.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from models.batch_calculator import evaluate_records
+from models.section_database import SteelSectionDatabase
+
+
+def _warm_worker():
+    # Carga la base de datos y sus tablas una vez por proceso
+    SteelSectionDatabase.get_table()
+
+
+class ServiceMetrics:
+    """Contadores y latencias recientes del servicio (se usa desde el event loop)."""
+    def __init__(self, window=10000):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.designs = 0
+        self.errors = 0
+        self.batches = 0
+        self.in_flight = 0
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+
+    def request_started(self):
+        self.in_flight += 1
+
+    def request_finished(self, n_designs, latency_s, failed=False):
+        self.in_flight -= 1
+        self.requests += 1
+        self.designs += n_designs
+        self.errors += int(failed)
+        self.latencies_ms.append(latency_s * 1000.0)
+
+    def batch_dispatched(self, size):
+        self.batches += 1
+        self.batch_sizes.append(size)
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        lat = sorted(self.latencies_ms)
+        sizes = list(self.batch_sizes)
+
+        def pct(p):
+            return lat[min(len(lat) - 1, int(p / 100.0 * len(lat)))] if lat else 0.0
+
+        return {
+            "uptime_s": uptime,
+            "requests": self.requests,
+            "designs": self.designs,
+            "errors": self.errors,
+            "batches": self.batches,
+            "in_flight": self.in_flight,
+            "requests_per_s": self.requests / uptime if uptime > 0 else 0.0,
+            "designs_per_s": self.designs / uptime if uptime > 0 else 0.0,
+            "mean_batch_size": sum(sizes) / len(sizes) if sizes else 0.0,
+            "latency_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99), "max": lat[-1] if lat else 0.0},
+        }
+
+
+class RequestBatcher:
+    """
+    Agrupa solicitudes concurrentes en lotes: espera hasta max_wait_s desde
+    la primera solicitud pendiente o hasta reunir max_batch diseños, y envía
+    el lote al pool de procesos sin bloquear la recepción de nuevas solicitudes.
+    """
+    def __init__(self, executor, metrics, max_batch=4096, max_wait_s=0.002):
+        self.executor = executor
+        self.metrics = metrics
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.pending = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    def submit(self, records):
+        """Encola una lista de diseños; retorna un Future con la lista de resultados."""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.put_nowait((records, future))
+        return future
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.pending.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait_s
+            while size < self.max_batch:
+                if self.pending.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.pending.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self.pending.get_nowait()
+                batch.append(item)
+                size += len(item[0])
+            loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        records = [rec for recs, _ in batch for rec in recs]
+        self.metrics.batch_dispatched(len(records))
+        try:
+            # strict: un error que afecte a todo el lote se lanza en lugar de
+            # marcar las filas de todas las solicitudes
+            results = await loop.run_in_executor(self.executor, partial(evaluate_records, strict=True), records)
+        except Exception as e:
+            if len(batch) == 1 and not isinstance(e, (TypeError, ValueError)):
+                outcomes = [e]
+            else:
+                # Se reevalúa cada solicitud por separado para que el error
+                # solo llegue a la que lo provoca
+                outcomes = await asyncio.gather(
+                    *(loop.run_in_executor(self.executor, evaluate_records, recs) for recs, _ in batch),
+                    return_exceptions=True)
+        else:
+            bounds = [0]
+            for recs, _ in batch:
+                bounds.append(bounds[-1] + len(recs))
+            outcomes = [results[a:b] for a, b in zip(bounds, bounds[1:])]
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+
+class DesignService:
+    """
+    Servidor HTTP/JSON local: atiende conexiones con asyncio, agrupa las
+    solicitudes con RequestBatcher y evalúa los lotes en un pool de procesos.
+    """
+    REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+               500: "Internal Server Error"}
+    MAX_BODY = 256 * 1024 * 1024
+
+    def __init__(self, host="127.0.0.1", port=8765, workers=None, max_batch=4096,
+                 max_wait_s=0.002, timeout_s=60.0):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.timeout_s = timeout_s
+        self.metrics = ServiceMetrics()
+        self.executor = None
+        self.batcher = None
+        self.server = None
+
+    async def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        self.batcher = RequestBatcher(self.executor, self.metrics, self.max_batch, self.max_wait_s)
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.batcher.stop()
+        self.executor.shutdown(wait=True)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    # Sin un largo válido no se puede delimitar el cuerpo: se cierra tras responder
+                    self._write_json(writer, 400, {"error": "Content-Length inválido"}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if length > self.MAX_BODY:
+                    self._write_json(writer, 413, {"error": "Solicitud demasiado grande"}, keep_alive=False)
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                self._write_json(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _write_json(self, writer, status, payload, keep_alive=True):
+        body = json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {self.REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+
+    async def _route(self, method, path, body):
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "POST" and path == "/design":
+            return await self._design(body)
+        return 404, {"error": "Ruta no encontrada"}
+
+    async def _design(self, body):
+        t0 = time.perf_counter()
+        self.metrics.request_started()
+        try:
+            payload = json.loads(body or b"null")
+            if isinstance(payload, dict) and "designs" in payload:
+                records, single = payload["designs"], False
+            elif isinstance(payload, list):
+                records, single = payload, False
+            elif isinstance(payload, dict):
+                records, single = [payload], True
+            else:
+                raise ValueError("Se espera un objeto o una lista de diseños")
+            if not all(isinstance(r, dict) for r in records):
+                raise ValueError("Cada diseño debe ser un objeto JSON")
+        except ValueError as e:
+            self.metrics.request_finished(0, time.perf_counter() - t0, failed=True)
+            return 400, {"error": str(e)}
+
+        try:
+            results = await asyncio.wait_for(self.batcher.submit(records), self.timeout_s) if records else []
+        except Exception as e:
+            self.metrics.request_finished(len(records), time.perf_counter() - t0, failed=True)
+            return 500, {"error": f"Error Crítico: {e}"}
+
+        self.metrics.request_finished(len(records), time.perf_counter() - t0)
+        return 200, (results[0] if single else {"results": results})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local JSON de diseño de vigas compuestas")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-batch", type=int, default=4096)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    service = DesignService(args.host, args.port, args.workers, args.max_batch, args.max_wait_ms / 1000.0)
+    print(f"Servicio de diseño en http://{args.host}:{args.port} (POST /design, GET /metrics)")
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
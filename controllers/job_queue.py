@@ -0,0 +1,500 @@
+"""
+Cola de trabajos por carpeta vigilada para corridas de diseño desatendidas (sin Qt).
+
+Uso:
+    python -m controllers.job_queue /ruta/compartida --workers 4
+    python -m controllers.job_queue /ruta/compartida --once
+
+Cada archivo de trabajo (.json o .csv) en la carpeta es una lista de vigas
+en el formato de CompositeBeamDesign, con la etiqueta del perfil en
+'beam_name' y opcionalmente 'label':
+    JSON: lista de diseños, o {"defaults": {...}, "designs": [...]}, donde
+          defaults completa los datos que falten en cada diseño.
+    CSV:  una fila por viga. Las columnas conn_<clave> van a connector_props
+          (conn_diameter, conn_fu, conn_label, ...).
+Un trabajo se toma solo cuando su archivo lleva settle_s sin modificarse
+(una copia en curso no se lee a medias); lo más seguro es copiarlo como
+<trabajo>.json.part y renombrarlo al terminar. Un JSON truncado se
+reintenta en las pasadas siguientes (hasta MAX_ATTEMPTS) antes de darlo
+por inválido.
+
+Junto a cada trabajo se escriben:
+    <trabajo>.lock         reclamo atómico (host y pid del proceso que lo corre)
+    <trabajo>.status.json  estado: running / incomplete / done / failed, conteos y errores
+    <trabajo>.out/         <viga>.pdf y <viga>.json por viga, results.json al final
+
+Las vigas terminadas se reconocen por su <viga>.json. Si un proceso muere,
+su reclamo queda huérfano: otro proceso lo recupera y continúa con las vigas
+que faltan. Si falla el proceso de alguna viga, el trabajo queda
+'incomplete' y se reintenta en la siguiente pasada (hasta MAX_ATTEMPTS);
+después se da por terminado con esas vigas como error. Si un proceso del
+pool muere (memoria, señal), el pool se reemplaza y las vigas que estaban
+en vuelo se reevalúan de a una: solo la que vuelve a romperlo cuenta como
+caída.
+
+Cada <viga>.json guarda en 'depends' las huellas de lo que determina su
+resultado (datos de la viga, filas del perfil y del canal, versión del
+cálculo y de la memoria); con ellas controllers.project_rebuild recalcula
+solo las vigas afectadas por un cambio en las tablas de perfiles, en el
+cálculo o en las plantillas de la memoria.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from models.calculator import CompositeBeamDesign
+from models.section_database import SteelSectionDatabase
+from utils.report_generator import PDFReportGenerator
+from utils.report_templates import record_summary
+from models.validation import validate_records
+from views.section_figures import FigureRenderer, pna_elevation
+
+JOB_EXTENSIONS = (".json", ".csv")
+TEXT_FIELDS = ("label", "beam_name", "deck_orientation", "connector_type")
+# Pasadas por trabajo antes de dar por perdidas las vigas cuyo proceso falló
+MAX_ATTEMPTS = 3
+
+# Figuras reutilizadas entre las memorias de cada proceso
+_renderer = FigureRenderer()
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _safe_name(label):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(label)).strip("._") or "viga"
+
+
+def _parse_value(key, text):
+    if key in TEXT_FIELDS or key == "conn_label":
+        return text.strip()
+    text = text.strip()
+    return float(text) if text else None
+
+
+def read_job(path):
+    """Lista de diseños de un archivo de trabajo (ver el encabezado del módulo)."""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            designs = []
+            for row in csv.DictReader(f):
+                rec, conn = {}, {}
+                for key, text in row.items():
+                    if key is None or text is None or not key.strip():
+                        continue
+                    key = key.strip()
+                    value = _parse_value(key, text)
+                    if value is None or value == "":
+                        continue
+                    if key.startswith("conn_"):
+                        conn[key[5:]] = value
+                    else:
+                        rec[key] = value
+                if conn:
+                    rec["connector_props"] = conn
+                designs.append(rec)
+        return designs
+
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    if isinstance(payload, dict):
+        defaults = payload.get("defaults", {})
+        designs = [dict(defaults, **d) for d in payload.get("designs", [])]
+    elif isinstance(payload, list):
+        designs = payload
+    else:
+        raise ValueError("Se espera una lista de diseños o {'designs': [...]}")
+    if not all(isinstance(d, dict) for d in designs):
+        raise ValueError("Cada diseño debe ser un objeto JSON")
+    return designs
+
+
+def design_beam(record, pdf_path):
+    """
+    Calcula una viga con el modelo escalar y escribe su memoria PDF (de forma
+    atómica). Retorna el resumen de la viga o {'error': ...}.
+    """
+    sections = SteelSectionDatabase.get_sections()
+    name = str(record.get("beam_name", "")).strip().upper()
+    report = validate_records([dict(record, beam_name=name)])
+    messages = report.row_messages(0)
+    if not report.valid[0]:
+        return {"error": "; ".join(m for sev, m in messages if sev == "error")}
+    inputs = dict(record, beam_name=name, beam_properties=sections[name])
+    inputs.setdefault("connector_props", {})
+    try:
+        results = CompositeBeamDesign(inputs).run()
+        tmp = pdf_path + ".tmp"
+        section_png = _renderer.render_section(inputs, pna_elevation(inputs, results['strength']),
+                                               pdf_path + ".section.png")
+        try:
+            PDFReportGenerator(tmp, {"inputs": inputs, "results": results},
+                               {"section_plot": section_png}).generate()
+        finally:
+            os.remove(section_png)
+        os.replace(tmp, pdf_path)
+    except KeyError as e:
+        return {"error": f"Falta el dato {e}"}
+    except (TypeError, ValueError, ZeroDivisionError) as e:
+        return {"error": f"Datos numéricos inválidos: {e}"}
+    summary = record_summary(inputs, results)
+    summary.update({
+        "phi_Mn": results['strength']['phi_Mn'], "M_u": results['loads']['M_u'],
+        "ratio_flexure": results['strength']['ratio'], "ratio_shear": results['shear']['ratio'],
+        "ratio_deflection": max(results['deflections']['short']['ratio'], results['deflections']['long']['ratio']),
+        "percent": results['conn_data']['percent'], "pdf": os.path.basename(pdf_path),
+        "warnings": [m for _, m in messages],
+    })
+    return summary
+
+
+def beam_stems(designs):
+    """Nombre de archivo (sin extensión) de cada viga de un trabajo, único dentro del trabajo."""
+    stems, seen = [], set()
+    for i, rec in enumerate(designs):
+        stem = _safe_name(rec.get("label") or f"{i + 1:04d}_{rec.get('beam_name', '')}")
+        if stem in seen:
+            stem = f"{stem}_{i + 1}"
+        seen.add(stem)
+        stems.append(stem)
+    return stems
+
+
+def design_dependencies(record):
+    """
+    Huellas de las que depende el resultado de una viga: sus datos (JSON
+    canónico), la fila de su perfil en la tabla W, la de su canal en la
+    tabla C (conectores tipo canal por etiqueta) y las versiones del cálculo
+    y de la memoria PDF.
+    """
+    name = str(record.get("beam_name", "")).strip().upper()
+    props = record.get("connector_props")
+    label = props.get("label") if isinstance(props, dict) and record.get("connector_type") == "Channel" else None
+    return {
+        "inputs": hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode("utf-8")).hexdigest(),
+        "section": SteelSectionDatabase.get_fingerprints().get(name),
+        "connector": SteelSectionDatabase.get_channel_fingerprints().get(label) if isinstance(label, str) else None,
+        "calculator": CompositeBeamDesign.fingerprint(),
+        "report": PDFReportGenerator.fingerprint(),
+    }
+
+
+def _run_beam(record, out_dir, stem):
+    result = design_beam(record, os.path.join(out_dir, stem + ".pdf"))
+    result["label"] = record.get("label", stem)
+    result["depends"] = design_dependencies(record)
+    # El .json por viga marca la viga como terminada (se escribe después del PDF)
+    _write_atomic(os.path.join(out_dir, stem + ".json"), json.dumps(result))
+    return stem, result
+
+
+class JobQueue:
+    """
+    Ejecutor de trabajos sobre una carpeta: reclama cada trabajo con un
+    archivo .lock creado en forma exclusiva y reparte sus vigas en un pool
+    de procesos con a lo sumo 2 x workers vigas en vuelo.
+    """
+    def __init__(self, folder, workers=None, status_interval_s=1.0, settle_s=2.0):
+        self.folder = os.path.abspath(folder)
+        self.workers = workers or os.cpu_count() or 1
+        self.status_interval_s = status_interval_s
+        self.settle_s = settle_s
+        self.owner = f"{socket.gethostname()} {os.getpid()}"
+        self.executor = None
+
+    # --- Reclamo de trabajos ---
+    def pending_jobs(self):
+        """
+        Trabajos sin estado terminal, en orden de llegada (fecha de
+        modificación). Se omiten los modificados hace menos de settle_s:
+        pueden estar copiándose todavía.
+        """
+        jobs = []
+        now = time.time()
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            if not name.endswith(JOB_EXTENSIONS) or name.endswith(".status.json"):
+                continue
+            try:
+                if not os.path.isfile(path) or now - os.path.getmtime(path) < self.settle_s:
+                    continue
+            except OSError:
+                continue
+            status = self.read_status(path)
+            if status.get("state") in ("done", "failed"):
+                continue
+            jobs.append(path)
+        return sorted(jobs, key=lambda p: (os.path.getmtime(p), p))
+
+    @staticmethod
+    def read_status(job):
+        try:
+            with open(job + ".status.json", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _lock_owner(lock):
+        try:
+            with open(lock, encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @classmethod
+    def _lock_is_stale(cls, lock):
+        """Dueño del reclamo si es de un proceso muerto de este host; None si no."""
+        owner = cls._lock_owner(lock)
+        try:
+            host, pid = owner.split()
+        except (AttributeError, ValueError):
+            return None
+        if host != socket.gethostname():
+            return None
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return owner
+        except (PermissionError, ValueError):
+            return None
+        return None
+
+    def claim(self, job):
+        """Crea <trabajo>.lock en forma exclusiva; recupera reclamos de procesos muertos."""
+        lock = job + ".lock"
+        stale = self._lock_is_stale(lock) if os.path.exists(lock) else None
+        if stale is not None:
+            # Solo un proceso logra renombrar el reclamo huérfano. Entre la
+            # verificación y el renombre otro proceso pudo recuperarlo y crear
+            # uno nuevo: se relee el dueño y, si no es el huérfano, el reclamo
+            # vivo se devuelve a su lugar (os.link no reemplaza uno existente).
+            grabbed = f"{lock}.stale.{os.getpid()}"
+            try:
+                os.rename(lock, grabbed)
+            except OSError:
+                return False
+            if self._lock_owner(grabbed) != stale:
+                try:
+                    os.link(grabbed, lock)
+                except OSError:
+                    pass
+                os.remove(grabbed)
+                return False
+            os.remove(grabbed)
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(self.owner)
+        return True
+
+    def release(self, job):
+        try:
+            os.remove(job + ".lock")
+        except OSError:
+            pass
+
+    # --- Ejecución ---
+    def _status(self, job, **fields):
+        status = dict(self.read_status(job), job=os.path.basename(job), owner=self.owner,
+                      updated=time.time(), **fields)
+        # Un campo en None se quita (p. ej. el error de una pasada anterior)
+        status = {k: v for k, v in status.items() if v is not None}
+        _write_atomic(job + ".status.json", json.dumps(status, indent=1))
+
+    def run_job(self, job):
+        """Procesa un trabajo ya reclamado; retorna su estado final."""
+        attempts = self.read_status(job).get("attempts", 0) + 1
+        try:
+            designs = read_job(job)
+        except (OSError, ValueError) as e:
+            # Un JSON truncado puede ser una copia que aún no termina: se reintenta
+            if isinstance(e, json.JSONDecodeError) and attempts < MAX_ATTEMPTS:
+                self._status(job, state="incomplete", attempts=attempts, error=f"Archivo de trabajo incompleto: {e}")
+                return "incomplete"
+            self._status(job, state="failed", attempts=attempts, error=f"Archivo de trabajo inválido: {e}")
+            return "failed"
+
+        out_dir = job + ".out"
+        os.makedirs(out_dir, exist_ok=True)
+        stems = beam_stems(designs)
+
+        results, crashed = {}, {}
+        labels = {stem: rec.get("label", stem) for stem, rec in zip(stems, designs)}
+        todo = []
+        for stem, rec in zip(stems, designs):
+            try:
+                with open(os.path.join(out_dir, stem + ".json"), encoding="utf-8") as f:
+                    results[stem] = json.load(f)
+            except (OSError, ValueError):
+                todo.append((stem, rec))
+
+        total = len(designs)
+        self._status(job, state="running", total=total, done=len(results), resumed=len(results), attempts=attempts,
+                     started=self.read_status(job).get("started", time.time()), error=None)
+        last = time.monotonic()
+        records = dict(zip(stems, designs))
+        in_flight, futures, broken = set(), {}, []
+
+        def collect(future):
+            stem = futures.pop(future)
+            try:
+                results[stem] = future.result()[1]
+            except BrokenProcessPool:
+                broken.append(stem)
+            except Exception as e:
+                # Sin .json por viga: se reintenta al reanudar el trabajo
+                crashed[stem] = {"error": f"Error Crítico: {e}", "label": labels[stem]}
+
+        queue = iter(todo)
+        while True:
+            for stem, rec in queue:
+                try:
+                    future = self.executor.submit(_run_beam, rec, out_dir, stem)
+                except BrokenProcessPool:
+                    self._restart_executor()
+                    future = self.executor.submit(_run_beam, rec, out_dir, stem)
+                futures[future] = stem
+                in_flight.add(future)
+                if len(in_flight) >= 2 * self.workers:
+                    break
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                collect(future)
+            if broken:
+                # Murió un proceso del pool: todas las vigas en vuelo fallan
+                # sin que se sepa cuál lo provocó. Se reemplaza el pool y se
+                # reevalúan de a una, sin descontarles un intento
+                for future in wait(in_flight)[0]:
+                    collect(future)
+                in_flight = set()
+                self._restart_executor()
+                for stem, result in self._run_isolated([(s, records[s]) for s in broken], out_dir).items():
+                    if "crash" in result:
+                        crashed[stem] = {"error": f"Error Crítico: {result['crash']}", "label": labels[stem]}
+                    else:
+                        results[stem] = result
+                broken.clear()
+            if time.monotonic() - last >= self.status_interval_s:
+                self._status(job, state="running", done=len(results))
+                last = time.monotonic()
+
+        if crashed and attempts < MAX_ATTEMPTS:
+            # El trabajo queda pendiente: la próxima pasada corre solo las vigas que faltan
+            self._status(job, state="incomplete", done=len(results),
+                         errors=[{"label": r["label"], "error": r["error"]} for r in crashed.values()])
+            return "incomplete"
+        results.update(crashed)
+        ordered = [dict(results[s], file=s) for s in stems]
+        errors = [{"label": r.get("label"), "error": r["error"]} for r in ordered if "error" in r]
+        _write_atomic(os.path.join(out_dir, "results.json"), json.dumps(ordered, indent=1))
+        self._status(job, state="done", done=total, failed=len(errors), errors=errors, finished=time.time())
+        return "done"
+
+    def _run_isolated(self, items, out_dir):
+        """
+        Corre las vigas [(stem, registro)] de a una en un pool propio de un
+        proceso. Retorna {stem: resultado}; las que vuelven a romper el pool
+        quedan como {'crash': motivo}.
+        """
+        done, pool = {}, None
+        try:
+            for stem, rec in items:
+                pool = pool or self._new_executor(1)
+                try:
+                    done[stem] = pool.submit(_run_beam, rec, out_dir, stem).result()[1]
+                except BrokenProcessPool:
+                    done[stem] = {"crash": "el proceso de la viga terminó abruptamente"}
+                    pool.shutdown(wait=False)
+                    pool = None
+                except Exception as e:
+                    done[stem] = {"crash": str(e)}
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        return done
+
+    def run_once(self):
+        """Procesa todos los trabajos disponibles; retorna {trabajo: estado}."""
+        processed = {}
+        for job in self.pending_jobs():
+            if not self.claim(job):
+                continue
+            try:
+                processed[job] = self.run_job(job)
+            except Exception as e:
+                # Un error inesperado no detiene la cola: el trabajo se reintenta hasta MAX_ATTEMPTS
+                state = "failed" if self.read_status(job).get("attempts", 0) >= MAX_ATTEMPTS else "incomplete"
+                self._status(job, state=state, error=f"Error Crítico: {e}")
+                processed[job] = state
+            finally:
+                self.release(job)
+        return processed
+
+    def _new_executor(self, workers=None):
+        return ProcessPoolExecutor(max_workers=workers or self.workers, initializer=SteelSectionDatabase.get_sections)
+
+    def _restart_executor(self):
+        """Reemplaza el pool cuando uno de sus procesos murió (BrokenProcessPool)."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self._new_executor()
+
+    def __enter__(self):
+        self.executor = self._new_executor()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+        return False
+
+    def watch(self, poll_s=2.0):
+        """Vigila la carpeta indefinidamente; un error en una pasada no detiene el servicio."""
+        while True:
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                print(f"Error en la pasada de la cola: {e}", file=sys.stderr)
+                processed = {}
+            # Los trabajos que quedaron incompletos se reintentan en la próxima pasada
+            if not processed or all(state == "incomplete" for state in processed.values()):
+                time.sleep(poll_s)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cola de trabajos de diseño por carpeta vigilada")
+    parser.add_argument("folder")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--poll", type=float, default=2.0, help="intervalo de sondeo (s)")
+    parser.add_argument("--once", action="store_true", help="procesa lo pendiente y termina")
+    args = parser.parse_args(argv)
+
+    with JobQueue(args.folder, args.workers, settle_s=args.poll) as queue:
+        if args.once:
+            for job, state in queue.run_once().items():
+                print(f"{os.path.basename(job)}: {state}")
+        else:
+            print(f"Vigilando {queue.folder} con {queue.workers} procesos")
+            try:
+                queue.watch(args.poll)
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Reconstrucción incremental de los trabajos terminados de la cola (sin Qt).
+
+Uso:
+    python -m controllers.project_rebuild /ruta/compartida
+    python -m controllers.project_rebuild /ruta/compartida/lote.json --dry-run
+
+Compara las huellas guardadas en cada <viga>.json ('depends', ver
+job_queue.design_dependencies) con las actuales, de modo que tras corregir
+una fila de assets/w_sections.csv o c_sections.csv, el cálculo o las
+plantillas de la memoria solo se revisan las vigas afectadas:
+  1. Huellas iguales: la viga no se toca.
+  2. Huellas distintas (o sin .json): se reevalúa en una sola pasada
+     vectorizada (BatchCompositeBeamDesign sobre filas de la SectionTable,
+     con la etapa constructiva) y se compara con el resumen guardado.
+  3. La memoria se regenera (modelo escalar + PDF, en el pool de procesos)
+     solo si cambiaron los datos de la viga o la versión de la memoria
+     (utils.report_generator.REPORT_MODULES), falta su PDF o algún valor
+     del resumen se movió más allá de la tolerancia; si no, solo se
+     actualizan el .json y sus huellas.
+Escribe <trabajo>.out/rebuild.json con las relaciones que se movieron y las
+memorias regeneradas, y actualiza results.json.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from controllers.job_queue import (JOB_EXTENSIONS, JobQueue, _run_beam, _write_atomic, beam_stems,
+                                   design_dependencies, read_job)
+from models.batch_calculator import BatchCompositeBeamDesign, records_to_inputs
+from models.section_database import SteelSectionDatabase
+from models.validation import validate_records
+
+# Valores del resumen de design_beam que se comparan (relaciones y resistencias)
+SUMMARY_FIELDS = ("ratio_flexure", "ratio_shear", "ratio_deflection", "ratio", "phi_Mn", "M_u", "percent")
+GOVERNS = ("Flexión", "Cortante", "Deflexión", "Constructiva")
+RTOL = 1e-9
+
+
+def batch_summaries(records):
+    """
+    Resumen de cada diseño con los mismos campos que design_beam (sin pdf),
+    evaluado en una sola pasada vectorizada. Los diseños que no pasan la
+    validación se reportan con la clave 'error'; si el lote no se puede
+    evaluar vectorizado, los válidos quedan en None (se recalculan con el
+    modelo escalar). Un registro que ni siquiera se puede validar se reporta
+    con su error sin detener el resto, como en la cola.
+    """
+    table = SteelSectionDatabase.get_table()
+    summaries = [None] * len(records)
+    try:
+        records = [dict(r, beam_name=str(r.get("beam_name", "")).strip().upper()) for r in records]
+        report = validate_records(records, table)
+    except Exception:
+        # Se aíslan los registros malformados validándolos uno por uno
+        valid = []
+        for i, r in enumerate(records):
+            try:
+                validate_records([dict(r, beam_name=str(r.get("beam_name", "")).strip().upper())], table)
+                valid.append(i)
+            except Exception as e:
+                summaries[i] = {"error": f"Datos inválidos: {e}"}
+        # Si todos se validan por separado, el lote se evalúa registro por registro
+        groups = [[i] for i in valid] if len(valid) == len(records) else [valid] if valid else []
+        for group in groups:
+            for i, summary in zip(group, batch_summaries([records[i] for i in group])):
+                summaries[i] = summary
+        return summaries
+    for i, messages in report.errors().items():
+        summaries[i] = {"error": "; ".join(messages)}
+    valid = np.flatnonzero(report.valid).tolist()
+    if not valid:
+        return summaries
+    try:
+        inputs = records_to_inputs([records[i] for i in valid], table, report.subset(valid))
+        res = BatchCompositeBeamDesign(inputs).run(include_construction=True)
+    except (KeyError, TypeError, ValueError):
+        return summaries
+
+    # Misma relación que controla que record_summary (la primera en caso de empate)
+    ratios = np.stack([res['ratio_flexure'], res['ratio_shear'], res['ratio_deflection'], res['ratio_construction']])
+    governs = np.argmax(ratios, axis=0)
+    columns = {k: res[k].tolist() for k in ("phi_Mn", "M_u", "ratio_flexure", "ratio_shear",
+                                            "ratio_deflection", "percent")}
+    columns["ratio"] = ratios[governs, np.arange(len(valid))].tolist()
+    for j, i in enumerate(valid):
+        summary = {k: columns[k][j] for k in columns}
+        summary.update({"beam_name": records[i]["beam_name"], "governs": GOVERNS[governs[j]],
+                        "status": "OK" if summary["ratio"] <= 1.0 else "FALLA",
+                        "warnings": [m for _, m in report.row_messages(i)]})
+        summaries[i] = summary
+    return summaries
+
+
+def summary_changes(old, new, rtol=RTOL):
+    """Campos del resumen que cambiaron: [{'field', 'old', 'new'}]."""
+    if "error" in old or "error" in new:
+        if old.get("error") == new.get("error"):
+            return []
+        return [{"field": "error", "old": old.get("error"), "new": new.get("error")}]
+    changes = []
+    for k in SUMMARY_FIELDS:
+        a, b = old.get(k), new[k]
+        if a is None or not abs(b - a) <= rtol * max(abs(a), abs(b)):
+            changes.append({"field": k, "old": a, "new": b})
+    changes += [{"field": k, "old": old.get(k), "new": new[k]} for k in ("governs", "status") if old.get(k) != new[k]]
+    return changes
+
+
+def _read_result(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def rebuild_job(job, executor=None, rtol=RTOL, dry_run=False):
+    """
+    Reconstruye un trabajo ya terminado (ver el encabezado del módulo). Las
+    memorias se regeneran en 'executor' (ProcessPoolExecutor) o en este
+    proceso. Con dry_run solo se reporta lo que cambiaría. Retorna el
+    reporte: total, stale, refreshed, memos (archivos) y moved
+    ([{label, file, changes}]).
+    """
+    start = time.perf_counter()
+    designs = read_job(job)
+    stems = beam_stems(designs)
+    out_dir = job + ".out"
+    results = [_read_result(os.path.join(out_dir, stem + ".json")) for stem in stems]
+    depends = [design_dependencies(rec) for rec in designs]
+    stale = [i for i, (res, dep) in enumerate(zip(results, depends)) if res is None or res.get("depends") != dep]
+
+    moved, memos, refreshed = [], [], []
+    for i, summary in zip(stale, batch_summaries([designs[i] for i in stale])):
+        old = results[i]
+        changes = summary_changes(old, summary, rtol) if old is not None and summary is not None else []
+        if changes:
+            moved.append({"label": designs[i].get("label", stems[i]), "file": stems[i], "changes": changes})
+        saved = old.get("depends", {}) if old is not None else {}
+        if (old is None or summary is None or changes
+                or any(saved.get(k) != depends[i][k] for k in ("inputs", "report"))
+                or ("error" not in summary and not os.path.exists(os.path.join(out_dir, stems[i] + ".pdf")))):
+            memos.append(i)
+        else:
+            results[i] = dict(old, **summary, label=designs[i].get("label", stems[i]), depends=depends[i])
+            refreshed.append(i)
+
+    report = {"job": os.path.basename(job), "total": len(designs), "stale": len(stale), "refreshed": len(refreshed),
+              "memos": [stems[i] for i in memos], "moved": moved}
+    if dry_run:
+        report["elapsed_s"] = time.perf_counter() - start
+        return report
+
+    os.makedirs(out_dir, exist_ok=True)
+    for i in refreshed:
+        _write_atomic(os.path.join(out_dir, stems[i] + ".json"), json.dumps(results[i]))
+    if executor is None:
+        for i in memos:
+            results[i] = _run_beam(designs[i], out_dir, stems[i])[1]
+    else:
+        futures = {executor.submit(_run_beam, designs[i], out_dir, stems[i]): i for i in memos}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()[1]
+
+    if stale:
+        ordered = [dict(res, file=stem) for stem, res in zip(stems, results)]
+        _write_atomic(os.path.join(out_dir, "results.json"), json.dumps(ordered, indent=1))
+    report["elapsed_s"] = time.perf_counter() - start
+    _write_atomic(os.path.join(out_dir, "rebuild.json"), json.dumps(dict(report, finished=time.time()), indent=1))
+    return report
+
+
+def finished_jobs(queue):
+    """Trabajos de la carpeta de la cola con estado 'done'."""
+    jobs = []
+    for name in sorted(os.listdir(queue.folder)):
+        path = os.path.join(queue.folder, name)
+        if (name.endswith(JOB_EXTENSIONS) and not name.endswith(".status.json")
+                and os.path.isfile(path) and queue.read_status(path).get("state") == "done"):
+            jobs.append(path)
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconstrucción incremental de trabajos terminados")
+    parser.add_argument("path", help="carpeta de la cola o archivo de trabajo")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rtol", type=float, default=RTOL, help="tolerancia relativa de los valores del resumen")
+    parser.add_argument("--dry-run", action="store_true", help="solo reporta lo que cambiaría")
+    args = parser.parse_args(argv)
+
+    path = os.path.abspath(args.path)
+    folder = path if os.path.isdir(path) else os.path.dirname(path)
+    with JobQueue(folder, args.workers) as queue:
+        for job in (finished_jobs(queue) if os.path.isdir(path) else [path]):
+            if not queue.claim(job):
+                print(f"{os.path.basename(job)}: en uso, se omite")
+                continue
+            try:
+                report = rebuild_job(job, queue.executor, args.rtol, args.dry_run)
+            finally:
+                queue.release(job)
+            print(f"{report['job']}: {report['total']} vigas, {report['stale']} con dependencias cambiadas, "
+                  f"{len(report['moved'])} con valores movidos, {len(report['memos'])} memorias "
+                  f"{'por regenerar' if args.dry_run else 'regeneradas'} ({report['elapsed_s']:.2f} s)")
+            for entry in report["moved"]:
+                text = ", ".join(f"{c['field']}: {c['old']} -> {c['new']}" for c in entry["changes"])
+                print(f"  {entry['label']}: {text}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,622 @@
+import numpy as np
+from models.section_database import SteelSectionDatabase
+from models.section_table import shear_coefficients
+from models.connector_tables import ChannelCapacityTable, StudCapacityTable
+from models.vibration import walking_vibration
+from models.construction import CONSTRUCTION_KEYS, construction_stage
+from models.stud_layout import max_stud_spacing, stud_layout
+from models.moving_load import moving_load_envelope
+from models.long_term import DEFAULT_AGES, long_term_deflection
+from models.pna_table import PlasticMomentTable
+from models.validation import validate_records
+
+# Propiedades de perfil requeridas por el motor vectorizado
+SECTION_KEYS = ("A", "d", "tw", "bf", "tf", "Ix", "Zx")
+
+# Entradas numéricas que pueden ser escalares o arrays (una fila por diseño)
+NUMERIC_KEYS = ("span_ft", "spacing_ft", "slab_thickness", "fc_ksi", "fy_ksi",
+                "rib_width", "rib_height", "dl_psf", "ll_psf", "connector_spacing")
+
+# Variables de diseño de las sensibilidades (ver BatchCompositeBeamDesign.gradients)
+GRADIENT_VARIABLES = ("span_ft", "spacing_ft", "dl_psf", "ll_psf", "fc_ksi", "fy_ksi",
+                      "slab_thickness", "rib_height", "connector_spacing")
+
+# Valores por defecto de conectores (iguales a CompositeBeamDesign); height = NaN -> Hs = hr + 2
+CONNECTOR_DEFAULTS = {"diameter": 0.75, "fu": 65.0, "height": np.nan, "studs_per_rib": 1.0,
+                      "tf": 0.0, "tw": 0.0, "length": 0.0}
+
+
+class BatchCompositeBeamDesign:
+    """
+    Versión vectorizada de CompositeBeamDesign.
+    Evalúa N diseños en una sola pasada con arrays de numpy; cada entrada
+    puede ser un escalar (común a todos) o un array de longitud N.
+    Replica método a método las fórmulas del modelo escalar.
+
+    Los perfiles se indican con 'beam_properties' (dict de arrays) o con
+    'section_rows' (filas de la SectionTable), en cuyo caso las propiedades
+    y derivadas precalculadas se leen directamente de la tabla.
+    """
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.table = inputs.get('section_table')
+        self.rows = inputs.get('section_rows')
+        if self.rows is not None:
+            if self.table is None:
+                self.table = SteelSectionDatabase.get_table()
+            self.rows = np.asarray(self.rows, dtype=np.intp)
+            props = self.table.gather(self.rows)
+        else:
+            props = inputs['beam_properties']
+        self.props = props
+        conn_props = dict(inputs.get('connector_props', {}))
+        # Canales de la base de datos: por etiqueta ('label') o fila de la tabla C
+        channel_labels = conn_props.pop('label', None)
+        self.channel_rows = conn_props.pop('channel_rows', None)
+        if channel_labels is not None:
+            row_of = ChannelCapacityTable.default().row_of
+            self.channel_rows = np.array([row_of.get(l, -1) for l in np.atleast_1d(channel_labels)], dtype=np.intp)
+
+        columns = [np.asarray(inputs[k], dtype=float) for k in NUMERIC_KEYS if k in inputs]
+        columns += [np.asarray(props[k], dtype=float) for k in SECTION_KEYS]
+        if self.rows is not None:
+            columns.append(self.rows)
+        columns += [np.asarray(v, dtype=float) for v in conn_props.values()]
+        if self.channel_rows is not None:
+            columns.append(np.asarray(self.channel_rows))
+        columns += [np.asarray(inputs.get('deck_orientation', 'Perpendicular')),
+                    np.asarray(inputs.get('connector_type', 'Stud'))]
+        shape = np.broadcast_shapes(*[c.shape for c in columns]) or (1,)
+        self.n = shape[0]
+        if self.rows is not None:
+            self.rows = np.broadcast_to(self.rows, shape)
+        if self.channel_rows is not None:
+            self.channel_rows = np.broadcast_to(np.asarray(self.channel_rows, dtype=np.intp), shape)
+
+        def col(value, default=None):
+            if value is None:
+                value = default
+            return np.broadcast_to(np.asarray(value, dtype=float), shape)
+
+        # Geometría y Materiales
+        self.L = col(inputs['span_ft'])
+        self.s = col(inputs['spacing_ft'])
+        self.tc = col(inputs['slab_thickness'])
+        self.fc = col(inputs['fc_ksi'])
+        self.fy = col(inputs['fy_ksi'])
+        self.wr = col(inputs['rib_width'])
+        self.hr = col(inputs['rib_height'])
+        self.DL = col(inputs['dl_psf'])
+        self.LL = col(inputs['ll_psf'])
+
+        # Propiedades del Acero
+        self.Es = 29000.0 # ksi
+        self.As = col(props['A'])
+        self.d = col(props['d'])
+        self.Ix = col(props['Ix'])
+        self.tw = col(props['tw'])
+        self.h_tw = col(props['h_tw']) if 'h_tw' in props else None
+
+        # Conectores
+        self.connector_spacing = col(inputs.get('connector_spacing'), 12.0)
+        self.conn = {k: col(conn_props.get(k), v) for k, v in CONNECTOR_DEFAULTS.items()}
+        self.is_stud = np.broadcast_to(np.asarray(inputs.get('connector_type', 'Stud')) == 'Stud', shape)
+        self.is_channel = np.broadcast_to(np.asarray(inputs.get('connector_type', 'Stud')) == 'Channel', shape)
+        self.is_parallel = np.broadcast_to(np.asarray(inputs.get('deck_orientation', 'Perpendicular')) != 'Perpendicular', shape)
+
+    @classmethod
+    def from_input_list(cls, inputs_list):
+        """Apila una lista de diccionarios de entrada escalares (formato de CompositeBeamDesign)."""
+        stacked = {k: np.array([inp[k] for inp in inputs_list], dtype=float)
+                   for k in NUMERIC_KEYS if k in inputs_list[0]}
+        if 'connector_spacing' not in stacked:
+            stacked['connector_spacing'] = np.array([inp.get('connector_spacing', 12.0) for inp in inputs_list])
+        keys = SECTION_KEYS + (('h_tw',) if all('h_tw' in inp['beam_properties'] for inp in inputs_list) else ())
+        stacked['beam_properties'] = {
+            k: np.array([inp['beam_properties'][k] for inp in inputs_list], dtype=float) for k in keys
+        }
+        stacked['connector_props'] = {
+            k: np.array([inp.get('connector_props', {}).get(k, v) for inp in inputs_list], dtype=float)
+            for k, v in CONNECTOR_DEFAULTS.items()
+        }
+        channel_labels = [inp.get('connector_props', {}).get('label') or '' for inp in inputs_list]
+        if any(channel_labels):
+            stacked['connector_props']['label'] = np.array(channel_labels)
+        stacked['deck_orientation'] = np.array([inp.get('deck_orientation', 'Perpendicular') for inp in inputs_list])
+        stacked['connector_type'] = np.array([inp.get('connector_type', 'Stud') for inp in inputs_list])
+        return cls(stacked)
+
+    def calculate_loads(self):
+        w_u = self.s * (1.2 * self.DL + 1.6 * self.LL) / 1000 # kips/ft
+        w_service = self.s * (self.DL + self.LL) / 1000 # kips/ft
+
+        M_u = (w_u * self.L**2) / 8
+        V_u = (w_u * self.L) / 2
+        return {"w_u": w_u, "M_u": M_u, "V_u": V_u, "w_service": w_service}
+
+    def get_effective_width(self):
+        # AISC I3.1a
+        return np.minimum(self.L * 12 / 4, self.s * 12)
+
+    def calculate_connectors(self):
+        # --- Cálculo Ec (ACI 318) ---
+        Ec = 57000.0 * np.sqrt(self.fc * 1000) / 1000.0
+        sqrt_fc_Ec = np.sqrt(self.fc * Ec)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Stud (AISC I8.2a): consulta a la tabla precalculada
+            Qn_stud, reduction, Qn_conc, Qn_steel = StudCapacityTable.default().lookup(
+                self.conn['diameter'], self.conn['fu'], self.fc, self.hr, self.wr,
+                self.is_parallel, self.conn['studs_per_rib'])
+
+            # Channel (AISC I8.2b): tabla precalculada si el canal viene de la base de datos
+            Qn_chan = 0.3 * (self.conn['tf'] + 0.5 * self.conn['tw']) * self.conn['length'] * sqrt_fc_Ec
+            if self.channel_rows is not None:
+                from_table = self.channel_rows >= 0
+                Qn_table = ChannelCapacityTable.default().lookup(np.maximum(self.channel_rows, 0),
+                                                                 self.conn['length'], self.fc)
+                Qn_chan = np.where(from_table, Qn_table, Qn_chan)
+
+        Qn = np.where(self.is_stud, Qn_stud, np.where(self.is_channel, Qn_chan, 0.0))
+
+        N_half = np.floor((self.L * 12 / 2) / self.connector_spacing)
+        Sum_Qn = N_half * Qn
+
+        Ac = self.get_effective_width() * self.tc
+        Vh_req = np.minimum(0.85 * self.fc * Ac, self.As * self.fy)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = np.where(Vh_req > 0, np.minimum(100.0, Sum_Qn / Vh_req * 100.0), 0.0)
+
+        return {"Qn_unit": Qn, "N_half": N_half, "Sum_Qn": Sum_Qn, "Vh_req": Vh_req,
+                "percent": percent, "Ec": Ec, "stud_reduction": reduction, "stud_conc_governs": Qn_conc <= reduction * Qn_steel}
+
+    def moment_table(self):
+        """Tabla PNA (filas de la SectionTable o una tabla propia para beam_properties) y sus filas."""
+        if self.rows is not None:
+            return self.table.plastic_moment_table(), self.rows
+        if getattr(self, '_moment_table', None) is None:
+            self._moment_table = PlasticMomentTable({k: np.broadcast_to(np.asarray(self.props[k], dtype=float), (self.n,))
+                                                     for k in ('A', 'd', 'bf', 'tf')})
+        return self._moment_table, np.arange(self.n)
+
+    def check_composite_strength(self, M_u, conn_data):
+        b_eff = self.get_effective_width()
+        C_force = np.minimum(conn_data['Sum_Qn'], conn_data['Vh_req'])
+
+        # PNA en losa, ala o alma (AISC Tabla 3-19) por consulta a la tabla del perfil
+        table, rows = self.moment_table()
+        flex = table.flexural_strength(rows, C_force, self.fy, self.hr + self.tc, self.fc, b_eff)
+        PhiMn = flex['phi_Mn']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(PhiMn > 0, M_u / PhiMn, 999.0)
+
+        return {"phi_Mn": PhiMn, "ratio": ratio, "a": flex['a'], "b_eff": b_eff, "C_force": C_force,
+                "Y2": flex['Y2'], "y_pna": flex['y_pna'], "r": flex['r']}
+
+    def check_shear_strength(self, V_u):
+        # AISC Eq. G2-1 con Phi y Cv1 según la clasificación del alma (G2.1)
+        if self.rows is not None:
+            PhiVn, phi_v, Cv1 = self.table.shear_strength(self.rows, self.fy)
+        else:
+            if self.h_tw is not None:
+                phi_v, Cv1 = shear_coefficients(self.h_tw, self.fy, self.Es)
+            else:
+                phi_v, Cv1 = np.ones(self.n), np.ones(self.n)
+            PhiVn = phi_v * 0.6 * self.fy * self.d * self.tw * Cv1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(PhiVn > 0, V_u / PhiVn, 999.0)
+        return {"PhiVn": PhiVn, "ratio": ratio, "phi_v": phi_v, "Cv1": Cv1}
+
+    def calculate_transformed_section(self, conn_data, long_term=False, ec_factor=1.0):
+        # ec_factor: 1.35 para el módulo dinámico del concreto (AISC DG11)
+        n_base = self.Es / (conn_data['Ec'] * ec_factor)
+        n = n_base * 2.0 if long_term else n_base
+        b_tr = self.get_effective_width() / n
+
+        y_s = self.d / 2.0
+        y_slab = self.d + self.hr + (self.tc / 2.0)
+        A_slab_tr = b_tr * self.tc
+        I_slab_tr = (b_tr * self.tc**3) / 12.0
+
+        # Ribs de concreto solo cuentan con deck paralelo
+        b_tr_ribs = np.where(self.is_parallel, b_tr * self.wr / 12.0, 0.0)
+        A_ribs_tr = b_tr_ribs * self.hr
+        y_ribs = np.where(self.is_parallel, self.d + (self.hr / 2.0), 0.0)
+        I_ribs_tr = (b_tr_ribs * self.hr**3) / 12.0
+
+        A_c_tr = A_slab_tr + A_ribs_tr
+        with np.errstate(divide='ignore', invalid='ignore'):
+            has_conc = A_c_tr > 0
+            y_c = np.where(has_conc, (A_slab_tr * y_slab + A_ribs_tr * y_ribs) / A_c_tr, y_slab)
+            Io_c = np.where(has_conc,
+                            (I_slab_tr + A_slab_tr * (y_slab - y_c)**2) + (I_ribs_tr + A_ribs_tr * (y_ribs - y_c)**2),
+                            I_slab_tr)
+
+            Sum_A = self.As + A_c_tr
+            Y_bar = np.where(Sum_A > 0, (self.As * y_s + A_c_tr * y_c) / Sum_A, 0.0)
+
+        I_tr = self.Ix + self.As * (Y_bar - y_s)**2 + Io_c + A_c_tr * (y_c - Y_bar)**2
+        I_eff = self.Ix + np.sqrt(conn_data['percent'] / 100.0) * (I_tr - self.Ix)
+
+        return {"n": n, "n_base": n_base, "b_tr": b_tr, "Y_bar": Y_bar, "I_tr": I_tr, "I_eff": I_eff}
+
+    def calculate_deflections(self, conn_data, loads):
+        trans_short = self.calculate_transformed_section(conn_data, long_term=False)
+        trans_long = self.calculate_transformed_section(conn_data, long_term=True)
+        L_in = self.L * 12
+        num = 5 * (loads['w_service'] / 12) * L_in**4
+
+        delta_inst = num / (384 * self.Es * trans_short['I_eff'])
+        delta_long = num / (384 * self.Es * trans_long['I_eff'])
+        limit_360 = L_in / 360.0
+        limit_240 = L_in / 240.0
+
+        return {
+            "short": {"delta": delta_inst, "data": trans_short, "limit": limit_360, "ratio": delta_inst / limit_360},
+            "long":  {"delta": delta_long, "data": trans_long, "limit": limit_240, "ratio": delta_long / limit_240}
+        }
+
+    def gradients(self, loads, conn, strength, shear, defs, discrete_studs=False):
+        """
+        Derivadas analíticas de ratio_flexure, ratio_shear y ratio_deflection
+        respecto de GRADIENT_VARIABLES (en sus unidades de entrada), por regla
+        de la cadena en modo directo sobre los resultados intermedios de run().
+        Cada tangente es un dict {variable: array} con solo las variables de
+        las que depende la cantidad (ver _chain), por lo que el costo es una
+        fracción de la pasada de run().
+
+        Se derivan los valores que entrega run(): donde se consultan tablas
+        precalculadas (h(r) de la PNA, Qn de pernos y canales) se usa la
+        pendiente del tramo interpolado, no la de la fórmula exacta, así las
+        derivadas coinciden con las diferencias finitas de run(). Los tramos constantes (reducción del deck en
+        1.0, Cv1, ramas de min) se derivan en la rama activa. El número de
+        conectores floor(6L/s) se deriva como 6L/s continuo (tendencia de
+        diseño); con discrete_studs se toma su derivada exacta, nula entre
+        saltos. Retorna {ratio: {variable: array (N,)}}.
+        """
+        L, s, fc, fy, tc, hr, As = self.L, self.s, self.fc, self.fy, self.tc, self.hr, self.As
+        dL, ds, dDL, dLL, dfc, dfy, dtc, dhr, dsc = ({v: 1.0} for v in GRADIENT_VARIABLES)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Cargas
+            w_u, w_service = loads['w_u'], loads['w_service']
+            dw_u = _chain((w_u / s, ds), (1.2 * s / 1000, dDL), (1.6 * s / 1000, dLL))
+            dw_service = _chain((w_service / s, ds), (s / 1000, dDL), (s / 1000, dLL))
+            dln_M_u = _chain((1 / w_u, dw_u), (2 / L, dL))
+            dln_V_u = _chain((1 / w_u, dw_u), (1 / L, dL))
+
+            # Ancho efectivo y Ec (Ec ~ √f'c)
+            b_eff = strength['b_eff']
+            by_span = L * 3 <= s * 12
+            dln_b = {"span_ft": np.where(by_span, 1 / L, 0.0), "spacing_ft": np.where(by_span, 0.0, 1 / s)}
+            dln_Ec = _chain((0.5 / fc, dfc))
+
+            # Conectores: pendiente en f'c de las tablas (Rg y Rp son constantes por tramos, sin derivada)
+            stud_fc = np.where(conn['stud_conc_governs'],
+                               StudCapacityTable.default().conc_slope(self.conn['diameter'], fc), 0.0)
+            chan_fc = 0.75 / fc
+            if self.channel_rows is not None:
+                chan_fc = np.where(self.channel_rows >= 0, ChannelCapacityTable.default().fc_slope(
+                    np.maximum(self.channel_rows, 0), self.conn['length'], fc), chan_fc)
+            dln_Qn = {"fc_ksi": np.where(self.is_stud, stud_fc, np.where(self.is_channel, chan_fc, 0.0))}
+            Qn, N_half, Sum_Qn, Vh = conn['Qn_unit'], conn['N_half'], conn['Sum_Qn'], conn['Vh_req']
+            sc = self.connector_spacing
+            dN = {} if discrete_studs else _chain((6 / sc, dL), (-6 * L / sc**2, dsc))
+            dSum_Qn = _chain((Qn, dN), (Sum_Qn, dln_Qn))
+            Vc = 0.85 * fc * b_eff * tc
+            concrete_governs = Vc <= As * fy
+            dVh = _select(concrete_governs, _chain((Vc, dln_b), (Vc / fc, dfc), (Vc / tc, dtc)), _chain((As, dfy)))
+
+            # Flexión: Mn = C Y2 + Fy h(r), con h'(r) de la tabla PNA (≈ As y_pna) y r = C/(As Fy)
+            C, Y2, a = strength['C_force'], strength['Y2'], strength['a']
+            table, rows = self.moment_table()
+            y_pna = table.steel_slope(rows, strength['r']) / As
+            dC = _select(Sum_Qn <= Vh, dSum_Qn, dVh)
+            da = _chain((1 / (0.85 * fc * b_eff), dC), (-a / fc, dfc), (-a, dln_b))
+            Mn = strength['phi_Mn'] * 12 / 0.9
+            h = (Mn - C * Y2) / fy
+            dMn = _chain((Y2 + y_pna, dC), (C, dhr), (C, dtc), (-C / 2, da), (h - y_pna * C / fy, dfy))
+            d_flexure = _chain((strength['ratio'], dln_M_u), (-strength['ratio'] / Mn, dMn))
+
+            # Cortante: phi Vn ~ Fy (Cv1 = 1) o ~ √Fy (AISC G2-4)
+            d_shear = _chain((shear['ratio'], dln_V_u),
+                             (-shear['ratio'] * np.where(shear['Cv1'] < 1.0, 0.5, 1.0) / fy, dfy))
+
+            # Deflexión: delta / límite ~ w L³ / I_eff, en la rama (corto o largo plazo) que gobierna
+            p = conn['percent']
+            k = np.sqrt(p / 100.0)
+            partial = (p > 0) & (p < 100.0)
+            dln_k = _chain((np.where(partial, 0.5 / Sum_Qn, 0.0), dSum_Qn), (np.where(partial, -0.5 / Vh, 0.0), dVh))
+            dln_b_tr = _chain((1.0, dln_b), (1.0, dln_Ec))
+            long_governs = defs['long']['ratio'] >= defs['short']['ratio']
+            data = {key: np.where(long_governs, defs['long']['data'][key], defs['short']['data'][key])
+                    for key in ('b_tr', 'I_tr', 'I_eff')}
+            ratio = np.maximum(defs['short']['ratio'], defs['long']['ratio'])
+            dI_tr = self._transformed_inertia_tangent(data['b_tr'], dln_b_tr)
+            dI_eff = _chain((k * (data['I_tr'] - self.Ix), dln_k), (k, dI_tr))
+            d_deflection = _chain((ratio / w_service, dw_service), (3 * ratio / L, dL), (-ratio / data['I_eff'], dI_eff))
+
+        zero = np.zeros(self.n)
+        out = {}
+        for name, d in (("ratio_flexure", d_flexure), ("ratio_shear", d_shear), ("ratio_deflection", d_deflection)):
+            out[name] = {v: np.nan_to_num(np.broadcast_to(d[v], (self.n,)), nan=0.0, posinf=0.0, neginf=0.0)
+                         if v in d else zero for v in GRADIENT_VARIABLES}
+        for name, res in (("ratio_flexure", strength), ("ratio_shear", shear)):
+            if np.any(res['ratio'] == 999.0):
+                out[name] = {v: np.where(res['ratio'] == 999.0, 0.0, g) for v, g in out[name].items()}
+        return out
+
+    def _transformed_inertia_tangent(self, b_tr, dln_b_tr):
+        """
+        Tangente de I_tr = Σ(I + A y²) - (Σ A y)² / Σ A sobre acero, losa y
+        nervios (mismas partes que calculate_transformed_section).
+        """
+        tc, hr, d = self.tc, self.hr, self.d
+        dtc, dhr = {"slab_thickness": 1.0}, {"rib_height": 1.0}
+        b_ribs = np.where(self.is_parallel, b_tr * self.wr / 12.0, 0.0)
+        # (A, dA, y, dy, dI) de cada parte; el acero no varía
+        parts = [(b_tr * tc, _chain((b_tr * tc, dln_b_tr), (b_tr, dtc)), d + hr + tc / 2,
+                  _chain((1.0, dhr), (0.5, dtc)),
+                  _chain((b_tr * tc**3 / 12, dln_b_tr), (b_tr * tc**2 / 4, dtc)))]
+        if np.any(self.is_parallel):
+            parts.append((b_ribs * hr, _chain((b_ribs * hr, dln_b_tr), (b_ribs, dhr)), d + hr / 2, _chain((0.5, dhr)),
+                          _chain((b_ribs * hr**3 / 12, dln_b_tr), (b_ribs * hr**2 / 4, dhr))))
+        S0, S1 = self.As, self.As * d / 2
+        dS0, dS1, dS2 = {}, {}, {}
+        for A, dA, y, dy, dI in parts:
+            S0, S1 = S0 + A, S1 + A * y
+            dS0 = _chain((1.0, dS0), (1.0, dA))
+            dS1 = _chain((1.0, dS1), (y, dA), (A, dy))
+            dS2 = _chain((1.0, dS2), (1.0, dI), (y**2, dA), (2 * A * y, dy))
+        return _chain((1.0, dS2), (-2 * S1 / S0, dS1), (S1**2 / S0**2, dS0))
+
+    def check_long_term(self, conn_data=None, ages=DEFAULT_AGES, sustained_live=0.25, **options):
+        """
+        Deflexión diferida en el tiempo (ver long_term_deflection) en lugar de
+        n = 2 n_base con la carga total: la carga muerta y la fracción
+        'sustained_live' de la viva son sostenidas (flujo plástico) y el resto
+        de la viva es transitoria; se agrega la curvatura por retracción.
+        Retorna curvas (N, T) sobre las edades 'ages' (días).
+        """
+        conn = conn_data or self.calculate_connectors()
+        w_sustained = self.s * (self.DL + sustained_live * self.LL) / 1000  # kips/ft
+        w_transient = self.s * (1.0 - sustained_live) * self.LL / 1000
+        section = {"As": self.As, "d": self.d, "Ix": self.Ix, "b_eff": self.get_effective_width(),
+                   "tc": self.tc, "hr": self.hr, "wr": self.wr, "parallel": self.is_parallel}
+        return long_term_deflection(self.L, w_sustained, w_transient, section, conn['Ec'], conn['percent'],
+                                    ages, Es=self.Es, **options)
+
+    def check_vibration(self, conn_data, girder_span_ft=None, girder_I=None, live_psf=11.0, dead_psf=None,
+                        beta=0.03, limit=0.005):
+        """
+        Vibración por caminata (AISC DG11) con la sección transformada de
+        calculate_transformed_section usando 1.35Ec y acción compuesta total.
+        live_psf: carga viva de vibración (11 psf oficinas); dead_psf: carga
+        muerta real (por defecto la de diseño). girder_I: inercia dinámica del
+        girder de apoyo (in⁴); sin girder se evalúa solo la viga.
+        """
+        full = dict(conn_data, percent=np.full(self.n, 100.0))
+        trans = self.calculate_transformed_section(full, ec_factor=1.35)
+        dead = self.DL if dead_psf is None else dead_psf
+        wj = self.s * (dead + live_psf) / 1000.0  # kips/ft
+        de = self.tc + self.hr / 2.0
+        return walking_vibration(self.L, self.s, wj, trans['I_tr'], de, trans['n'],
+                                 girder_span_ft, girder_I, beta=beta, limit=limit, Es=self.Es)
+
+    def solve_stud_layout(self, x, M, conn_data=None):
+        """
+        Distribución mínima de pernos para diagramas de momento muestreados en
+        estaciones x (ft) con uno o varios patrones de carga (ver stud_layout).
+        Separaciones límite AISC I8.2d: mínima 6d (repartida entre los pernos
+        por rib) y máxima min(8 (tc + hr), 36 in) (max_stud_spacing).
+        """
+        conn = conn_data or self.calculate_connectors()
+        table, rows = self.moment_table()
+        b_eff = self.get_effective_width()
+        b = lambda v: np.asarray(v)[:, None, None]
+        slab_force = lambda M: table.required_force(b(rows), M, b(self.fy), b(self.hr + self.tc), b(self.fc),
+                                                    b(b_eff), b(conn['Vh_req']))
+        min_spacing = 6.0 * self.conn['diameter'] / self.conn['studs_per_rib']
+        max_spacing = max_stud_spacing(self.tc, self.hr)
+        return stud_layout(x, M, conn['Qn_unit'], conn['Vh_req'], slab_force, min_spacing, max_spacing)
+
+    def check_moving_load(self, vehicle, distribution=1.0, stations=101, positions=400, conn_data=None):
+        """
+        Chequeo con cargas móviles (estacionamientos): envolventes del grupo de
+        ejes (ver moving_load_envelope) multiplicadas por 'distribution', la
+        fracción de cada eje que toma la viga. Como en ASCE 7 4.10 la carga
+        concentrada no actúa junto con la viva uniforme:
+            Mu(x) = 1.2 MD(x) + 1.6 max(ML(x), f Mveh(x))
+        Las envolventes alimentan la flexión compuesta, el cortante y la
+        distribución mínima de pernos.
+        """
+        conn = conn_data or self.calculate_connectors()
+        x = np.linspace(0.0, 1.0, stations)[None, :] * self.L[:, None]
+        env = moving_load_envelope(self.L, x, vehicle, positions)
+
+        L = self.L[:, None]
+        w_D = (self.s * self.DL / 1000.0)[:, None]
+        w_L = (self.s * self.LL / 1000.0)[:, None]
+        M_D, V_D = w_D * x * (L - x) / 2.0, w_D * (L / 2.0 - x)
+        M_L, V_L = w_L * x * (L - x) / 2.0, w_L * (L / 2.0 - x)
+        M_u = 1.2 * M_D + 1.6 * np.maximum(M_L, distribution * env['M_max'])
+        V_pos = 1.2 * V_D + 1.6 * np.maximum(V_L, distribution * env['V_max'])
+        V_neg = 1.2 * V_D + 1.6 * np.minimum(V_L, distribution * env['V_min'])
+        V_u = np.maximum(np.abs(V_pos), np.abs(V_neg))
+
+        strength = self.check_composite_strength(np.max(M_u, axis=1), conn)
+        shear = self.check_shear_strength(np.max(V_u, axis=1))
+        layout = self.solve_stud_layout(x, M_u[:, None, :], conn)
+        return {
+            "x": x, "M_u": M_u, "V_u": V_u,
+            "M_u_max": np.max(M_u, axis=1), "V_u_max": np.max(V_u, axis=1),
+            "phi_Mn": strength['phi_Mn'], "ratio_flexure": strength['ratio'],
+            "PhiVn": shear['PhiVn'], "ratio_shear": shear['ratio'],
+            "n_studs_required": layout['total'], "n_studs": 2 * conn['N_half'],
+            "studs_ok": layout['feasible'] & (layout['total'] <= 2 * conn['N_half']),
+            "stud_layout": layout,
+        }
+
+    def check_construction_stage(self, Lb_ft=None, Cb=1.0, **load_options):
+        """
+        Etapa constructiva (perfil solo con concreto fresco). Por defecto el
+        deck perpendicular arriostra el ala superior (Lb = 0) y con deck
+        paralelo Lb = L. Requiere Zx, Sx, ry, rts, J, ho, bf, tf y W del perfil.
+        """
+        props = {k: np.broadcast_to(np.asarray(self.props[k], dtype=float), (self.n,)) for k in CONSTRUCTION_KEYS}
+        Lb = np.where(self.is_parallel, self.L, 0.0) if Lb_ft is None else Lb_ft
+        return construction_stage(self.L, self.s, self.tc, self.hr, self.wr, self.fy, props, Lb, Cb, self.Es,
+                                  **load_options)
+
+    def run(self, include_vibration=False, include_construction=False, include_gradients=False,
+            include_long_term=False):
+        """
+        Ejecuta la secuencia completa de chequeos y retorna un resumen plano
+        (un array por campo) apto para tablas y gráficos comparativos.
+        Con include_vibration se agregan fn, ap/g y su relación (DG11); con
+        include_construction, la etapa constructiva y la contraflecha; con
+        include_gradients, 'gradients' con las derivadas de cada relación
+        (ver gradients); con include_long_term, la deflexión final por flujo
+        plástico y retracción y su relación L/240 (ver check_long_term).
+        """
+        loads = self.calculate_loads()
+        conn = self.calculate_connectors()
+        strength = self.check_composite_strength(loads['M_u'], conn)
+        shear = self.check_shear_strength(loads['V_u'])
+        defs = self.calculate_deflections(conn, loads)
+
+        summary = {
+            "M_u": loads['M_u'], "V_u": loads['V_u'],
+            "Qn_unit": conn['Qn_unit'], "N_half": conn['N_half'], "Sum_Qn": conn['Sum_Qn'],
+            "percent": conn['percent'],
+            "phi_Mn": strength['phi_Mn'], "a": strength['a'], "b_eff": strength['b_eff'],
+            "ratio_flexure": strength['ratio'],
+            "PhiVn": shear['PhiVn'], "ratio_shear": shear['ratio'],
+            "delta_short": defs['short']['delta'], "delta_long": defs['long']['delta'],
+            "I_eff_short": defs['short']['data']['I_eff'], "I_eff_long": defs['long']['data']['I_eff'],
+            "ratio_deflection": np.maximum(defs['short']['ratio'], defs['long']['ratio']),
+        }
+        if include_vibration:
+            vib = self.check_vibration(conn)
+            summary.update({"f_n": vib['fn'], "ap_g": vib['ap_g'], "ratio_vibration": vib['ratio']})
+        if include_construction:
+            const = self.check_construction_stage()
+            summary.update({"phi_Mn_const": const['phi_Mn'], "delta_wet": const['delta_wet'],
+                            "camber": const['camber'],
+                            "ratio_construction": np.maximum(const['ratio_flexure'], const['ratio_deflection'])})
+        if include_long_term:
+            lt = self.check_long_term(conn)
+            summary.update({"delta_long_term": lt['delta_final'], "delta_shrinkage": lt['delta_shrinkage'][:, -1],
+                            "ratio_long_term": lt['ratio']})
+        if include_gradients:
+            summary["gradients"] = self.gradients(loads, conn, strength, shear, defs)
+        return summary
+
+
+# Campos del resumen de run() que se reportan por diseño
+RESULT_FIELDS = ("M_u", "V_u", "Qn_unit", "N_half", "Sum_Qn", "percent", "phi_Mn", "a", "b_eff",
+                 "ratio_flexure", "PhiVn", "ratio_shear", "delta_short", "delta_long",
+                 "I_eff_short", "I_eff_long", "ratio_deflection")
+
+
+def _is_one(value):
+    return isinstance(value, float) and value == 1.0
+
+
+def _chain(*terms):
+    """Combinación lineal Σ c·dX de tangentes dispersas {variable: array}."""
+    out = {}
+    for c, tangent in terms:
+        for v, d in tangent.items():
+            # Las semillas (d = 1.0) y los términos con c = 1.0 no se multiplican
+            term = d if _is_one(c) else c if _is_one(d) else c * d
+            out[v] = out[v] + term if v in out else term
+    return out
+
+
+def _select(condition, if_true, if_false):
+    """Tangente de np.where(condition, X, Y)."""
+    return {v: np.where(condition, if_true.get(v, 0.0), if_false.get(v, 0.0)) for v in {**if_true, **if_false}}
+
+
+def records_to_inputs(records, table=None, report=None):
+    """
+    Convierte una lista de diseños en formato plano (el de CompositeBeamDesign,
+    con la etiqueta del perfil en 'beam_name' en lugar de 'beam_properties')
+    en entradas columnares para BatchCompositeBeamDesign.
+    Con report (ValidationReport de estos mismos registros, ver
+    models.validation) se usan sus columnas ya convertidas y no se vuelven a
+    convertir los valores crudos; los registros deben ser válidos.
+    Sin report, lanza KeyError si falta un dato o el perfil no existe.
+    """
+    table = table or SteelSectionDatabase.get_table()
+    if report is not None:
+        c = report.columns
+        inputs = {k: c[k] for k in NUMERIC_KEYS}
+        inputs['section_rows'] = c['section_rows']
+        inputs['section_table'] = table
+        inputs['deck_orientation'] = c['deck'].astype(str)
+        inputs['connector_type'] = c['kind'].astype(str)
+        inputs['connector_props'] = {k: c[k] for k in CONNECTOR_DEFAULTS}
+        if c['channel'].astype(bool).any():
+            inputs['connector_props']['label'] = c['channel'].astype(str)
+        return inputs
+
+    inputs = {k: np.array([r[k] for r in records], dtype=float) for k in NUMERIC_KEYS if k != 'connector_spacing'}
+    inputs['connector_spacing'] = np.array([r.get('connector_spacing', 12.0) for r in records], dtype=float)
+    inputs['section_rows'] = table.rows([r['beam_name'] for r in records])
+    inputs['section_table'] = table
+    inputs['deck_orientation'] = np.array([r.get('deck_orientation', 'Perpendicular') for r in records])
+    inputs['connector_type'] = np.array([r.get('connector_type', 'Stud') for r in records])
+
+    conn = [r.get('connector_props') or {} for r in records]
+    inputs['connector_props'] = {
+        k: np.array([c.get(k) if c.get(k) is not None else v for c in conn], dtype=float)
+        for k, v in CONNECTOR_DEFAULTS.items()
+    }
+    labels = [c.get('label') or '' for c in conn]
+    if any(labels):
+        inputs['connector_props']['label'] = np.array(labels)
+    return inputs
+
+
+def evaluate_records(records, strict=False):
+    """
+    Evalúa una lista de diseños (ver records_to_inputs) en una sola pasada
+    vectorizada y retorna una lista de dict de floats, uno por diseño, con
+    los campos de RESULT_FIELDS y el estado global. Los diseños que no
+    pasan la validación (ver models.validation) se reportan con la clave
+    'error' sin detener el resto del lote. Si falla el motor vectorizado,
+    todos los diseños válidos se reportan con ese error; con strict, el
+    error se lanza para que quien juntó el lote lo reparta (ver
+    controllers.design_service).
+    """
+    table = SteelSectionDatabase.get_table()
+    results = [None] * len(records)
+    report = validate_records(records, table)
+    for i, messages in report.errors().items():
+        results[i] = {"error": "; ".join(messages)}
+    valid = np.flatnonzero(report.valid).tolist()
+
+    if valid:
+        try:
+            inputs = records_to_inputs([records[i] for i in valid], table, report.subset(valid))
+            res = BatchCompositeBeamDesign(inputs).run()
+        except (TypeError, ValueError) as e:
+            if strict:
+                raise
+            for i in valid:
+                results[i] = {"error": f"Datos numéricos inválidos: {e}"}
+            return results
+
+        max_ratio = np.maximum.reduce([res['ratio_flexure'], res['ratio_shear'], res['ratio_deflection']])
+        columns = {k: res[k].tolist() for k in RESULT_FIELDS}
+        max_ratio = max_ratio.tolist()
+        for j, i in enumerate(valid):
+            row = {k: columns[k][j] for k in RESULT_FIELDS}
+            row['beam_name'] = records[i]['beam_name']
+            row['max_ratio'] = max_ratio[j]
+            row['status'] = "OK" if max_ratio[j] <= 1.0 else "FALLA"
+            results[i] = row
+    return results
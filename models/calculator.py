@@ -1,10 +1,27 @@
+import hashlib
+import importlib
 import numpy as np
+from models.section_table import shear_coefficients
+from models.connector_tables import ChannelCapacityTable, StudCapacityTable
+from models.construction import construction_stage
+from models.pna_table import PlasticMomentTable
+from models.batch_calculator import BatchCompositeBeamDesign
+
+# Módulos de los que dependen los resultados del cálculo (ver CompositeBeamDesign.fingerprint):
+# el cálculo y la validación (estado y advertencias). La memoria tiene su propia
+# versión (ver PDFReportGenerator.fingerprint)
+CALCULATION_MODULES = ("models.calculator", "models.batch_calculator", "models.connector_tables",
+                       "models.pna_table", "models.section_table", "models.construction",
+                       "models.validation")
+
 
 class CompositeBeamDesign:
     """
     Modelo de cálculo LRFD para vigas compuestas (AISC 360-16).
     Incluye cálculo detallado de Sección Transformada para deflexiones.
     """
+    _fingerprint = None
+
     def __init__(self, inputs):
         self.inputs = inputs
         # Geometría y Materiales
@@ -69,7 +86,6 @@ class CompositeBeamDesign:
         
         Qn = 0.0
         formula_desc = ""
-        Hs = self.hr + 2.0 
         
         unit_name = "studs"
         ref_aisc = "I8.2a"
@@ -79,30 +95,28 @@ class CompositeBeamDesign:
             ref_aisc = "I8.2a"
             d_stud = self.connector_props.get('diameter', 0.75)
             Fu_stud = self.connector_props.get('fu', 65.0)
-            Asc = np.pi * (d_stud**2) / 4.0
-            
-            reduction = 1.0
-            if self.deck_orient == 'Perpendicular':
-                term = (0.85 / np.sqrt(1)) * (self.wr/self.hr) * ((Hs/self.hr)-1)
-                reduction = min(1.0, term)
-            else: # Parallel
-                term = 0.6 * (self.wr/self.hr) * ((Hs/self.hr)-1)
-                reduction = min(1.0, term)
-            
-            Qn_conc = 0.5 * Asc * np.sqrt(self.fc * Ec)
-            Qn_steel = Asc * Fu_stud 
+            Nr = self.connector_props.get('studs_per_rib', 1)
             
-            Qn = min(Qn_conc, Qn_steel) * reduction
-            formula_desc = f"Stud {d_stud}\": min(0.5Asc√(f'cEc), AscFu)*RgRp"
+            # Qn leído de la tabla precalculada (AISC I8.2a, Rg y Rp según el deck)
+            Qn, reduction, Qn_conc, Qn_steel = StudCapacityTable.default().capacity(
+                d_stud, Fu_stud, self.fc, self.hr, self.wr, self.deck_orient != 'Perpendicular', Nr)
+            formula_desc = (f"Stud {d_stud}\" (Nr={Nr}): min(0.5Asc√(f'cEc), RgRpAscFu)"
+                            f" = min({Qn_conc:.2f}, {reduction:.3f}*{Qn_steel:.2f})")
 
         elif self.connector_type == 'Channel':
             unit_name = "channels"
             ref_aisc = "I8.2b"
-            tf = self.connector_props.get('tf', 0.0)
-            tw = self.connector_props.get('tw', 0.0)
             La = self.connector_props.get('length', 0.0)
-            Qn = 0.3 * (tf + 0.5*tw) * La * np.sqrt(self.fc * Ec)
-            formula_desc = "Channel: 0.3(tf+0.5tw)La√(f'cEc)"
+            label = self.connector_props.get('label')
+            if label:
+                # Perfil C de la base de datos: Qn leído de la tabla precalculada
+                Qn = ChannelCapacityTable.default().capacity(label, La, self.fc)
+                formula_desc = f"Channel {label} (La={La}\"): 0.3(tf+0.5tw)La√(f'cEc)"
+            else:
+                tf = self.connector_props.get('tf', 0.0)
+                tw = self.connector_props.get('tw', 0.0)
+                Qn = 0.3 * (tf + 0.5*tw) * La * np.sqrt(self.fc * Ec)
+                formula_desc = "Channel: 0.3(tf+0.5tw)La√(f'cEc)"
 
         N_half = int((self.L * 12 / 2) / self.connector_spacing)
         Sum_Qn = N_half * Qn
@@ -127,38 +141,52 @@ class CompositeBeamDesign:
         }
 
     def check_composite_strength(self, M_u, conn_data):
+        """
+        Resistencia a flexión plástica (AISC I3.2a) con el PNA en la losa, el
+        ala o el alma según C = min(ΣQn, 0.85f'cAc, AsFy) (Tabla 3-19):
+        Mn = C Y2 + Fy h(C), con h tabulado por perfil en PlasticMomentTable.
+        """
         b_eff, _ = self.get_effective_width()
         C_force = min(conn_data['Sum_Qn'], conn_data['Vh_req'])
-        
-        a = C_force / (0.85 * self.fc * b_eff) if b_eff > 0 else 0
-        
-        dist_C_top = a / 2
-        dist_T_top = self.hr + self.tc + (self.d / 2)
-        
-        Y = dist_T_top - dist_C_top
-        Mn = C_force * Y / 12.0 
+
+        table = PlasticMomentTable.from_properties(self.beam_props)
+        flex = table.flexural_strength(0, C_force, self.fy, self.hr + self.tc, self.fc, b_eff)
+        a, Y2, y_pna = float(flex['a']), float(flex['Y2']), float(flex['y_pna'])
+        Mn = float(flex['Mn'])
         PhiMn = 0.9 * Mn
         ratio = M_u / PhiMn if PhiMn > 0 else 999
-        
+        M_steel = Mn - C_force * Y2 / 12.0
+
+        if C_force >= self.As * self.fy * (1 - 1e-9):
+            pna_desc = "PNA en la losa (C = AsFy)"
+        elif y_pna <= self.beam_props['tf']:
+            pna_desc = f"PNA en el ala superior, {y_pna:.3f} in bajo el borde del acero"
+        else:
+            pna_desc = f"PNA en el alma, {y_pna:.2f} in bajo el borde del acero"
+
         steps = {
             "C_calc": f"C = min(SumQn, Vh_req) = {C_force:.1f} kips",
             "a_calc": f"a = C / (0.85 f'c b) = {a:.3f} in",
-            "Y_calc": f"Brazo = ({self.d/2:.2f} + {self.hr} + {self.tc}) - {a/2:.3f} = {Y:.2f} in",
-            "Mn_calc": f"Mn = C * Y = {C_force:.1f} * {Y:.2f} / 12 = {Mn:.1f} k-ft [AISC I3.2]"
+            "Y_calc": f"Y2 = (hr + tc) - a/2 = ({self.hr} + {self.tc}) - {a/2:.3f} = {Y2:.2f} in",
+            "PNA_calc": f"{pna_desc} [AISC Tabla 3-19]",
+            "Mn_calc": f"Mn = C * Y2 + M_acero = ({C_force:.1f} * {Y2:.2f}) / 12 + {M_steel:.1f} = {Mn:.1f} k-ft [AISC I3.2a]"
         }
-        return {"phi_Mn": PhiMn, "ratio": ratio, "a": a, "b_eff": b_eff, 
+        return {"phi_Mn": PhiMn, "ratio": ratio, "a": a, "b_eff": b_eff, "Y2": Y2, "y_pna": y_pna,
                 "status": "OK" if ratio <= 1.0 else "FALLA", "steps": steps, "C_force": C_force}
 
     def check_shear_strength(self, V_u):
         """
         Calcula la resistencia a cortante según AISC 360-16 Capítulo G.
-        Asume perfiles W laminados (Phi=1.0, Cv1=1.0 para la mayoría de casos en edificación).
+        Clasifica el alma con h/tw (G2.1): almas compactas de perfiles laminados
+        usan Phi=1.0 y Cv1=1.0; las esbeltas Phi=0.9 y Cv1 según Eq. G2-3/G2-4.
+        Si el perfil no trae h/tw se asume el caso (a).
         """
         Aw = self.d * self.tw
-        # Vn = 0.6 * Fy * Aw * Cv1 (AISC Eq G2-1)
-        # Para perfiles W típicos h/tw < 2.24 sqrt(E/Fy), entonces Cv1 = 1.0 y Phi = 1.0
-        Cv1 = 1.0
-        Phi = 1.0
+        h_tw = self.beam_props.get('h_tw')
+        if h_tw is None:
+            Phi, Cv1 = 1.0, 1.0
+        else:
+            Phi, Cv1 = (float(v) for v in shear_coefficients(h_tw, self.fy, self.Es))
         
         Vn = 0.6 * self.fy * Aw * Cv1
         PhiVn = Phi * Vn
@@ -166,9 +194,10 @@ class CompositeBeamDesign:
         ratio = V_u / PhiVn if PhiVn > 0 else 999.0
         
         steps = {
+            "Class_calc": self._web_class_step(h_tw, Phi, Cv1),
             "Aw_calc": f"Area Alma ($A_w$) = d * tw = {self.d} * {self.tw} = {Aw:.2f} in²",
             "Formula": "Vn = 0.6 * Fy * Aw * Cv1 [AISC Eq. G2-1]",
-            "Vn_calc": f"Vn = 0.6 * {self.fy} * {Aw:.2f} * {Cv1} = {Vn:.1f} kips",
+            "Vn_calc": f"Vn = 0.6 * {self.fy} * {Aw:.2f} * {Cv1:.3f} = {Vn:.1f} kips",
             "PhiVn_calc": f"$\phi V_n$ = {Phi} * {Vn:.1f} = <b>{PhiVn:.1f} kips</b>"
         }
         
@@ -179,8 +208,39 @@ class CompositeBeamDesign:
             "steps": steps
         }
 
-    def calculate_transformed_section(self, conn_data, long_term=False):
-        Ec = conn_data['Ec']
+    def check_construction_stage(self, Lb_ft=None, Cb=1.0):
+        """
+        Etapa constructiva (antes de la acción compuesta): perfil de acero solo
+        con concreto fresco, deck, peso propio y carga viva de construcción.
+        Flexión según AISC F2/F3 con Lb (deck perpendicular: Lb = 0, arriostrado;
+        paralelo: Lb = L), deflexión por concreto fresco y contraflecha.
+        """
+        if Lb_ft is None:
+            Lb_ft = self.L if self.deck_orient == 'Parallel' else 0.0
+        r = construction_stage(self.L, self.s, self.tc, self.hr, self.wr, self.fy, self.beam_props, Lb_ft, Cb, self.Es)
+        res = {k: (str(v) if k == 'governs' else float(v)) for k, v in r.items()}
+        ratio = max(res['ratio_flexure'], res['ratio_deflection'])
+
+        steps = {
+            "w_calc": f"w_wet = {res['w_wet']:.3f} k/ft, w_u = 1.2 w_wet + 1.6 w_const = {res['w_u']:.3f} k/ft",
+            "Lb_calc": f"Lb = {res['Lb']:.1f} ft, Lp = {res['Lp']:.1f} ft, Lr = {res['Lr']:.1f} ft (Cb = {Cb}) [AISC F2]",
+            "Mn_calc": f"M_u = {res['M_u']:.1f} k-ft, $\phi M_n$ = <b>{res['phi_Mn']:.1f} k-ft</b> (controla {res['governs']})",
+            "delta_calc": f"Δwet = 5 w_wet L⁴/(384 Es Ix) = {res['delta_wet']:.3f} in, contraflecha = {res['camber']:.2f} in",
+        }
+        res.update({"ratio": ratio, "status": "OK" if ratio <= 1.0 else "FALLA", "steps": steps})
+        return res
+
+    def _web_class_step(self, h_tw, Phi, Cv1):
+        if h_tw is None:
+            return "h/tw no disponible: se asume Phi = 1.0, Cv1 = 1.0 [AISC G2.1(a)]"
+        limit = 2.24 * np.sqrt(self.Es / self.fy)
+        if Phi == 1.0:
+            return f"h/tw = {h_tw:.1f} <= 2.24√(E/Fy) = {limit:.1f} -> Phi = 1.0, Cv1 = 1.0 [AISC G2.1(a)]"
+        return f"h/tw = {h_tw:.1f} > 2.24√(E/Fy) = {limit:.1f} -> Phi = 0.9, Cv1 = {Cv1:.3f} [AISC G2.1(b)]"
+
+    def calculate_transformed_section(self, conn_data, long_term=False, ec_factor=1.0):
+        # ec_factor: 1.35 para el módulo dinámico del concreto (AISC DG11)
+        Ec = conn_data['Ec'] * ec_factor
         n_base = self.Es / Ec
         n = n_base * 2.0 if long_term else n_base 
         
@@ -257,4 +317,53 @@ class CompositeBeamDesign:
         return {
             "short": {"delta": delta_inst, "data": trans_short, "limit": limit_360, "ratio": delta_inst/limit_360, "label_limit": "L/360"},
             "long":  {"delta": delta_long, "data": trans_long, "limit": limit_240, "ratio": delta_long/limit_240, "label_limit": "L/240"}
-        }
\ No newline at end of file
+        }
+    def run(self, sensitivities=False):
+        """
+        Secuencia completa de la memoria de cálculo. Retorna el dict de
+        resultados que consumen el reporte HTML y PDFReportGenerator; con
+        sensitivities agrega 'sensitivity' (ver sensitivities), que cuesta
+        una pasada del motor vectorizado adicional.
+        """
+        loads = self.calculate_loads()
+        b_eff, b_eff_steps = self.get_effective_width()
+        conn_data = self.calculate_connectors()
+        strength = self.check_composite_strength(loads['M_u'], conn_data)
+        results = {
+            "loads": loads,
+            "b_eff_steps": b_eff_steps,
+            "strength": strength,
+            "conn_data": conn_data,
+            "deflections": self.calculate_deflections(conn_data, loads),
+            "w_service": loads['w_service'],
+            "shear": self.check_shear_strength(loads['V_u']),
+            "construction": self.check_construction_stage(),
+        }
+        if sensitivities:
+            results["sensitivity"] = self.sensitivities()
+        return results
+
+    @classmethod
+    def fingerprint(cls):
+        """
+        Versión del cálculo: SHA-1 del código fuente de CALCULATION_MODULES.
+        Cualquier cambio en esos módulos invalida los diseños guardados (ver
+        controllers.project_rebuild). Se calcula una sola vez por proceso.
+        """
+        if cls._fingerprint is None:
+            h = hashlib.sha1()
+            for name in CALCULATION_MODULES:
+                with open(importlib.import_module(name).__file__, "rb") as f:
+                    h.update(f.read())
+            cls._fingerprint = h.hexdigest()
+        return cls._fingerprint
+
+    def sensitivities(self):
+        """
+        Derivadas de las relaciones de flexión, cortante y deflexión respecto
+        de las variables de diseño ({relación: {variable: float}}), con el
+        motor vectorizado (ver BatchCompositeBeamDesign.gradients), consistentes
+        con los valores interpolados de las tablas. Solo con run(sensitivities=True).
+        """
+        grads = BatchCompositeBeamDesign.from_input_list([self.inputs]).run(include_gradients=True)['gradients']
+        return {ratio: {v: float(d[0]) for v, d in g.items()} for ratio, g in grads.items()}
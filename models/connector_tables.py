@@ -0,0 +1,212 @@
+from functools import lru_cache
+
+import numpy as np
+from models.section_database import SteelSectionDatabase
+
+
+def concrete_modulus(fc_ksi):
+    """Ec = 57000*sqrt(f'c [psi]) / 1000 (ACI 318), en ksi. Acepta arrays."""
+    return 57000.0 * np.sqrt(np.asarray(fc_ksi, dtype=float) * 1000) / 1000.0
+
+
+def _interp_weights(grid, values):
+    """
+    Índice inferior y peso lineal de cada valor dentro de una grilla uniforme,
+    más una máscara de valores dentro del rango de la grilla.
+    """
+    values = np.asarray(values, dtype=float)
+    step = grid[1] - grid[0]
+    pos = (values - grid[0]) / step
+    inside = (pos >= -1e-9) & (pos <= len(grid) - 1 + 1e-9)
+    with np.errstate(invalid='ignore'):
+        i0 = np.clip(np.floor(np.where(inside, pos, 0.0)).astype(np.intp), 0, len(grid) - 2)
+    t = np.clip(np.where(inside, pos - i0, 0.0), 0.0, 1.0)
+    return i0, t, inside
+
+
+class ChannelCapacityTable:
+    """
+    Resistencia Qn de conectores tipo canal (AISC I8.2b) precalculada sobre
+    una grilla canal x longitud x f'c:
+        Qn = 0.3 (tf + 0.5 tw) La √(f'c Ec)
+    La consulta interpola linealmente en La (exacto, Qn es lineal en La) y en
+    f'c; los valores fuera de la grilla se calculan con la fórmula directa.
+    """
+    LENGTHS = np.arange(2.0, 12.0 + 1e-9, 0.5)    # in
+    FC_VALUES = np.arange(2.5, 10.0 + 1e-9, 0.25)  # ksi
+
+    _default = None
+
+    def __init__(self, channels):
+        self.labels = list(channels)
+        self.row_of = {label: i for i, label in enumerate(self.labels)}
+        self.tf = np.array([channels[l]['tf'] for l in self.labels], dtype=float)
+        self.tw = np.array([channels[l]['tw'] for l in self.labels], dtype=float)
+
+        # Grilla Qn[canal, La, f'c]
+        self.web_term = 0.3 * (self.tf + 0.5 * self.tw)
+        sqrt_fc_Ec = np.sqrt(self.FC_VALUES * concrete_modulus(self.FC_VALUES))
+        self.Qn = self.web_term[:, None, None] * self.LENGTHS[None, :, None] * sqrt_fc_Ec[None, None, :]
+
+    @classmethod
+    def default(cls):
+        """Tabla construida con c_sections.csv; se crea una sola vez."""
+        if cls._default is None:
+            cls._default = cls(SteelSectionDatabase.get_channels())
+        return cls._default
+
+    def rows(self, labels):
+        return np.array([self.row_of[l] for l in np.atleast_1d(labels)], dtype=np.intp)
+
+    def lookup(self, rows, length, fc):
+        """Qn (kips) por canal para filas, longitudes y f'c (escalares o arrays)."""
+        rows, length, fc = np.broadcast_arrays(np.asarray(rows, dtype=np.intp),
+                                               np.asarray(length, dtype=float),
+                                               np.asarray(fc, dtype=float))
+        il, tl, in_l = _interp_weights(self.LENGTHS, length)
+        ifc, tfc, in_fc = _interp_weights(self.FC_VALUES, fc)
+
+        q00 = self.Qn[rows, il, ifc]
+        q10 = self.Qn[rows, il + 1, ifc]
+        q01 = self.Qn[rows, il, ifc + 1]
+        q11 = self.Qn[rows, il + 1, ifc + 1]
+        Qn = (q00 * (1 - tl) * (1 - tfc) + q10 * tl * (1 - tfc)
+              + q01 * (1 - tl) * tfc + q11 * tl * tfc)
+
+        outside = ~(in_l & in_fc)
+        if np.any(outside):
+            direct = self.web_term[rows] * length * np.sqrt(fc * concrete_modulus(fc))
+            Qn = np.where(outside, direct, Qn)
+        return Qn
+
+    def fc_slope(self, rows, length, fc):
+        """
+        d ln Qn / d f'c del valor interpolado (pendiente en f'c del tramo
+        activo); 0.75/f'c fuera de la grilla, donde Qn ~ f'c^0.75.
+        """
+        rows, length, fc = np.broadcast_arrays(np.asarray(rows, dtype=np.intp),
+                                               np.asarray(length, dtype=float),
+                                               np.asarray(fc, dtype=float))
+        il, tl, in_l = _interp_weights(self.LENGTHS, length)
+        ifc, tfc, in_fc = _interp_weights(self.FC_VALUES, fc)
+        q0 = self.Qn[rows, il, ifc] * (1 - tl) + self.Qn[rows, il + 1, ifc] * tl
+        q1 = self.Qn[rows, il, ifc + 1] * (1 - tl) + self.Qn[rows, il + 1, ifc + 1] * tl
+        step = self.FC_VALUES[1] - self.FC_VALUES[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (q1 - q0) / step / (q0 * (1 - tfc) + q1 * tfc)
+            return np.where(in_l & in_fc, slope, 0.75 / fc)
+
+    def capacity(self, label, length, fc):
+        """Qn (kips) de un canal por etiqueta."""
+        return float(self.lookup(self.row_of[label], length, fc))
+
+
+class StudCapacityTable:
+    """
+    Resistencia Qn de pernos (studs) según AISC 360-16 Ec. I8-1,
+        Qn = 0.5 Asc √(f'c Ec) <= Rg Rp Asc Fu
+    precalculada por factores:
+      - Capacidad base por diámetro: Qc = 0.5 Asc √(f'c Ec) sobre una grilla
+        de f'c y Qs = Asc Fu sobre una grilla de Fu (interpolación lineal;
+        exacta en Fu). Fuera de la grilla se usa la fórmula directa.
+      - Factores del deck (I8.2a), tabulados por caso:
+            Rg = 1.0   deck perpendicular con un perno por nervio, o deck
+                       paralelo con wr/hr >= 1.5
+                 0.85  deck perpendicular con dos pernos por nervio, o deck
+                       paralelo con wr/hr < 1.5
+                 0.7   deck perpendicular con tres o más pernos por nervio
+            Rp = 0.75  deck paralelo, o perpendicular con emid-ht >= 2 in
+                 0.6   deck perpendicular con emid-ht < 2 in
+        con emid-ht = (wr - d)/2, la distancia del vástago al alma del deck a
+        media altura del nervio para el perno centrado en el nervio.
+    Hs no interviene en Qn; su mínimo (hr + 1.5 in, I3.2c) se verifica en
+    models.validation.
+    """
+    DIAMETERS = np.array([0.5, 0.625, 0.75])          # in, máximo 3/4 in con deck (I3.2c)
+    FU_VALUES = np.arange(50.0, 80.0 + 1e-9, 5.0)      # ksi
+    FC_VALUES = np.arange(2.5, 10.0 + 1e-9, 0.25)      # ksi
+    STUDS_PER_RIB = np.array([1, 2, 3])                # 3 = tres o más
+    WIDE_RIB = 1.5                                     # wr/hr del caso Rg = 1.0 con deck paralelo
+    EMID_HT = 2.0                                      # in, emid-ht del caso Rp = 0.75
+    CACHE_SIZE = 4096                                  # consultas escalares en memoria (capacity)
+
+    _default = None
+
+    def __init__(self):
+        Asc = np.pi * self.DIAMETERS**2 / 4.0
+        self.Qc = 0.5 * Asc[:, None] * np.sqrt(self.FC_VALUES * concrete_modulus(self.FC_VALUES))[None, :]
+        self.Qs = Asc[:, None] * self.FU_VALUES[None, :]
+
+        # Rg[orientación (0=perp, 1=paralelo), Nr (1, 2, 3+), wr/hr >= 1.5] y Rp[orientación, emid-ht >= 2 in]
+        self.Rg = np.array([[[1.0, 1.0], [0.85, 0.85], [0.7, 0.7]],
+                            [[0.85, 1.0], [0.85, 1.0], [0.85, 1.0]]])
+        self.Rp = np.array([[0.6, 0.75], [0.75, 0.75]])
+        self.capacity = lru_cache(maxsize=self.CACHE_SIZE)(self._capacity)
+
+    @classmethod
+    def default(cls):
+        """Tabla única compartida por el GUI y las corridas en lote."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def factors(self, diameter, hr, wr, parallel, studs_per_rib=1):
+        """Rg y Rp del deck (AISC I8.2a), vectorizado."""
+        diameter, hr, wr, parallel, studs_per_rib = np.broadcast_arrays(
+            *(np.asarray(v, dtype=float) for v in (diameter, hr, wr, parallel, studs_per_rib)))
+        o = parallel.astype(np.intp)
+        i_nr = np.clip(np.nan_to_num(studs_per_rib, nan=1.0), 1, 3).astype(np.intp) - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            wide = (wr / hr >= self.WIDE_RIB).astype(np.intp)
+        emid_ok = ((wr - diameter) / 2.0 >= self.EMID_HT).astype(np.intp)
+        return self.Rg[o, i_nr, wide], self.Rp[o, emid_ok]
+
+    def base_capacity(self, diameter, fu, fc):
+        """Qc = 0.5 Asc √(f'c Ec) y Qs = Asc Fu (kips) interpolados en la grilla."""
+        diameter, fu, fc = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (diameter, fu, fc)))
+        i_d = np.clip(np.searchsorted(self.DIAMETERS, diameter), 0, len(self.DIAMETERS) - 1)
+        on_d = np.isclose(self.DIAMETERS[i_d], diameter)
+        ifc, tfc, in_fc = _interp_weights(self.FC_VALUES, fc)
+        ifu, tfu, in_fu = _interp_weights(self.FU_VALUES, fu)
+        Qn_conc = self.Qc[i_d, ifc] * (1 - tfc) + self.Qc[i_d, ifc + 1] * tfc
+        Qn_steel = self.Qs[i_d, ifu] * (1 - tfu) + self.Qs[i_d, ifu + 1] * tfu
+
+        base_out = ~(on_d & in_fc & in_fu)
+        if np.any(base_out):
+            Asc = np.pi * diameter**2 / 4.0
+            Qn_conc = np.where(base_out, 0.5 * Asc * np.sqrt(fc * concrete_modulus(fc)), Qn_conc)
+            Qn_steel = np.where(base_out, Asc * fu, Qn_steel)
+        return Qn_conc, Qn_steel
+
+    def conc_slope(self, diameter, fc):
+        """
+        d ln Qc / d f'c del valor interpolado (pendiente del tramo de la grilla
+        activo); 0.75/f'c fuera de la grilla, donde Qc ~ f'c^0.75.
+        """
+        diameter, fc = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (diameter, fc)))
+        i_d = np.clip(np.searchsorted(self.DIAMETERS, diameter), 0, len(self.DIAMETERS) - 1)
+        ifc, tfc, in_fc = _interp_weights(self.FC_VALUES, fc)
+        q0, q1 = self.Qc[i_d, ifc], self.Qc[i_d, ifc + 1]
+        step = self.FC_VALUES[1] - self.FC_VALUES[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (q1 - q0) / step / (q0 * (1 - tfc) + q1 * tfc)
+            return np.where(in_fc & np.isclose(self.DIAMETERS[i_d], diameter), slope, 0.75 / fc)
+
+    def lookup(self, diameter, fu, fc, hr, wr, parallel, studs_per_rib=1):
+        """
+        Qn por perno (kips) y factor RgRp del deck, vectorizado.
+        Retorna (Qn, RgRp, Qn_conc, Qn_steel), con Qn_steel = Asc Fu sin reducir.
+        """
+        Qn_conc, Qn_steel = self.base_capacity(diameter, fu, fc)
+        Rg, Rp = self.factors(diameter, hr, wr, parallel, studs_per_rib)
+        reduction = Rg * Rp
+        Qn = np.minimum(Qn_conc, reduction * Qn_steel)
+        return Qn, reduction, Qn_conc, Qn_steel
+
+    def _capacity(self, diameter, fu, fc, hr, wr, parallel, studs_per_rib=1):
+        """
+        Consulta escalar; capacity la envuelve en un lru_cache acotado
+        (CACHE_SIZE), de modo que las corridas repetidas con las mismas
+        entradas se resuelven en memoria sin crecer sin límite.
+        """
+        return tuple(float(v) for v in self.lookup(diameter, fu, fc, hr, wr, bool(parallel), studs_per_rib))
@@ -0,0 +1,102 @@
+import numpy as np
+from models.section_table import ES_KSI
+
+CONCRETE_PCF = 145.0   # Peso del concreto normal (pcf)
+
+# Propiedades del perfil requeridas por la etapa constructiva
+CONSTRUCTION_KEYS = ("Zx", "Sx", "Ix", "ry", "rts", "J", "ho", "bf", "tf", "W")
+
+
+def lateral_torsional_limits(ry, rts, J, Sx, ho, fy, Es=ES_KSI, c=1.0):
+    """
+    Longitudes límite de pandeo lateral-torsional (AISC 360-16 F2), en ft:
+        Lp = 1.76 ry √(E/Fy)                                          (F2-5)
+        Lr = 1.95 rts E/(0.7Fy) √(Jc/(Sx ho) + √((Jc/(Sx ho))² + 6.76(0.7Fy/E)²))   (F2-6)
+    """
+    Lp = 1.76 * ry * np.sqrt(Es / fy) / 12.0
+    jc = J * c / (Sx * ho)
+    Lr = 1.95 * rts * Es / (0.7 * fy) * np.sqrt(jc + np.sqrt(jc**2 + 6.76 * (0.7 * fy / Es)**2)) / 12.0
+    return Lp, Lr
+
+
+def flexural_strength(Zx, Sx, ry, rts, J, ho, bf_2tf, fy, Lb_ft, Cb=1.0, Es=ES_KSI):
+    """
+    Resistencia a flexión del perfil de acero solo (AISC F2 y F3), vectorizada.
+    Retorna dict con phi_Mn (k-ft), Mn por fluencia/LTB/pandeo local de ala,
+    Lp, Lr y el estado límite que controla.
+    """
+    Mp = fy * Zx
+    Lp, Lr = lateral_torsional_limits(ry, rts, J, Sx, ho, fy, Es)
+    Lb = np.asarray(Lb_ft, dtype=float)
+
+    # Pandeo lateral-torsional (F2-2, F2-3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.where(Lr > Lp, (Lb - Lp) / (Lr - Lp), 1.0)
+        Mn_inelastic = Cb * (Mp - (Mp - 0.7 * fy * Sx) * frac)
+        slender = Lb * 12.0 / rts
+        Fcr = Cb * np.pi**2 * Es / slender**2 * np.sqrt(1 + 0.078 * J / (Sx * ho) * slender**2)
+    Mn_ltb = np.where(Lb <= Lp, Mp, np.where(Lb <= Lr, Mn_inelastic, Fcr * Sx))
+    Mn_ltb = np.minimum(Mn_ltb, Mp)
+
+    # Pandeo local del ala (F3-1) para alas no compactas
+    lam_pf = 0.38 * np.sqrt(Es / fy)
+    lam_rf = 1.0 * np.sqrt(Es / fy)
+    Mn_flb = np.where(bf_2tf <= lam_pf, Mp,
+                      Mp - (Mp - 0.7 * fy * Sx) * (bf_2tf - lam_pf) / (lam_rf - lam_pf))
+
+    Mn = np.minimum(Mn_ltb, Mn_flb)
+    governs = np.where(Mn_flb < Mn_ltb, "FLB", np.where(Lb <= Lp, "Y", "LTB"))
+    return {"phi_Mn": 0.9 * Mn / 12.0, "Mp": Mp / 12.0, "Mn_ltb": Mn_ltb / 12.0, "Mn_flb": Mn_flb / 12.0,
+            "Lp": Lp, "Lr": Lr, "Lb": Lb, "governs": governs}
+
+
+def recommended_camber(delta_wet, fraction=0.8, minimum=0.75, increment=0.25):
+    """
+    Contraflecha recomendada (in): una fracción de la deflexión por concreto
+    fresco, redondeada hacia abajo al incremento; no se especifica por debajo
+    del mínimo práctico.
+    """
+    camber = np.floor(fraction * np.asarray(delta_wet, dtype=float) / increment) * increment
+    return np.where(camber >= minimum, camber, 0.0)
+
+
+def construction_loads(s, tc, hr, wr, beam_w, concrete_pcf=CONCRETE_PCF, deck_psf=2.0,
+                       construction_ll_psf=20.0):
+    """
+    Cargas de la etapa constructiva (kips/ft): concreto fresco con los ribs
+    (fracción de concreto wr/12 por pie de deck), deck y peso propio como
+    muerta; carga viva de construcción (ASCE 37) aparte.
+    """
+    concrete_psf = concrete_pcf * (tc + hr * wr / 12.0) / 12.0
+    w_wet = s * (concrete_psf + deck_psf) / 1000.0 + beam_w / 1000.0
+    w_const = s * construction_ll_psf / 1000.0
+    return {"concrete_psf": concrete_psf, "w_wet": w_wet, "w_const": w_const,
+            "w_u": 1.2 * w_wet + 1.6 * w_const}
+
+
+def construction_stage(L, s, tc, hr, wr, fy, props, Lb_ft, Cb=1.0, Es=ES_KSI, **load_options):
+    """
+    Chequeos previos a la acción compuesta con el perfil de acero solo:
+    resistencia a flexión (Ix, Zx y longitud no arriostrada), deflexión por
+    concreto fresco y contraflecha recomendada. Vectorizado: L, s, ... pueden
+    ser arrays y props un dict de arrays con Zx, Sx, Ix, ry, rts, J, ho, bf, tf, W.
+    """
+    loads = construction_loads(s, tc, hr, wr, props['W'], **load_options)
+    M_u = loads['w_u'] * L**2 / 8.0
+    bf_2tf = props['bf'] / (2.0 * props['tf'])
+    strength = flexural_strength(props['Zx'], props['Sx'], props['ry'], props['rts'], props['J'],
+                                 props['ho'], bf_2tf, fy, Lb_ft, Cb, Es)
+
+    L_in = L * 12.0
+    delta_wet = 5 * (loads['w_wet'] / 12.0) * L_in**4 / (384 * Es * props['Ix'])
+    camber = recommended_camber(delta_wet)
+    limit = L_in / 360.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio_flexure = np.where(strength['phi_Mn'] > 0, M_u / strength['phi_Mn'], 999.0)
+    return {
+        "w_wet": loads['w_wet'], "w_u": loads['w_u'], "M_u": M_u,
+        "phi_Mn": strength['phi_Mn'], "Lp": strength['Lp'], "Lr": strength['Lr'], "Lb": strength['Lb'],
+        "governs": strength['governs'], "ratio_flexure": ratio_flexure,
+        "delta_wet": delta_wet, "camber": camber, "limit": limit,
+        "ratio_deflection": (delta_wet - camber) / limit,
+    }
@@ -0,0 +1,506 @@
+"""
+Verificación diferencial de los motores rápidos contra CompositeBeamDesign.
+
+Uso:
+    python -m models.differential --n 2000 --seed 0
+    python -m models.differential --n 500 --min-speedup 5
+    python -m models.differential --n 300 --checks closed_form gradients
+
+Genera diseños válidos al azar (todos los perfiles de la tabla W, ambas
+orientaciones de deck, todos los diámetros de perno admitidos con deck,
+dentro y fuera de la grilla de StudCapacityTable, studs y canales, de la
+base de datos o con tf/tw explícitos), los evalúa uno a uno con el modelo
+escalar y con cada motor alternativo, y compara campo por campo:
+    batch    BatchCompositeBeamDesign con 'beam_properties' (from_input_list)
+    table    BatchCompositeBeamDesign con 'section_rows' (derivadas y tabla
+             PNA precalculadas de la SectionTable), con la etapa constructiva
+    records  evaluate_records (validación + motor por filas, con el estado)
+Como el escalar y los motores leen las mismas tablas precalculadas, además
+se contrastan con referencias independientes (CHECKS):
+    closed_form  Qn y phi Mn del escalar contra las fórmulas cerradas de AISC
+                 (I8.2a con Rg y Rp, I8.2b, I3.2 con el PNA en losa, ala o
+                 alma), con la tolerancia del error de interpolación de las
+                 tablas para su espaciamiento
+    gradients    BatchCompositeBeamDesign.gradients contra diferencias centrales
+    long_term    check_long_term contra el método AAEM edad por edad con la
+                 sección transformada del escalar
+    vibration    check_vibration contra DG11 con la sección del escalar
+    moving_load  moving_load_envelope contra estática de viga simple en las
+                 posiciones críticas (un eje sobre la estación o en un apoyo)
+    sweep        evaluate_chunk por tramos contra el escalar en cada combinación
+Mide el rendimiento (diseños/s) de cada motor y su relación con el escalar.
+Retorna código 1 si algún campo difiere o si un motor no alcanza la
+aceleración mínima pedida.
+"""
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from models.calculator import CompositeBeamDesign
+from models.batch_calculator import (GRADIENT_VARIABLES, RESULT_FIELDS, BatchCompositeBeamDesign, evaluate_records,
+                                     records_to_inputs)
+from models.connector_tables import StudCapacityTable
+from models.long_term import AGING_COEFFICIENT, DEFAULT_AGES, EPS_SH_U, HUMIDITY, PHI_U
+from models.moving_load import VEHICLES, moving_load_envelope
+from models.pna_table import PlasticMomentTable
+from models.section_database import SteelSectionDatabase
+from models.sweep import SWEEP_FIELDS, SweepSpec, evaluate_chunk
+from models.validation import CONNECTOR_TYPES, DECK_ORIENTATIONS
+
+# Campos de la etapa constructiva comparados con check_construction_stage
+CONSTRUCTION_FIELDS = ("phi_Mn_const", "delta_wet", "camber", "ratio_construction")
+
+# Tolerancias por defecto: los motores replican las fórmulas del escalar
+RTOL = 1e-9
+ATOL = 1e-9
+
+# Diámetros de perno muestreados: la grilla de la tabla más uno fuera de ella
+# (fórmula directa); todos dentro del límite de 3/4 in con deck (I3.2c)
+STUD_DIAMETERS = tuple(float(d) for d in StudCapacityTable.DIAMETERS) + (0.375,)
+
+# Diferencias centrales de los gradientes: paso relativo y tolerancia
+GRADIENT_STEP = 1e-6
+GRADIENT_RTOL = 1e-5
+
+
+def random_records(n, seed=0):
+    """
+    n diseños válidos (formato plano con 'beam_name'). Los perfiles recorren
+    la tabla completa en orden aleatorio, de modo que con n >= número de
+    perfiles todos aparecen al menos una vez.
+    """
+    rng = np.random.default_rng(seed)
+    labels = SteelSectionDatabase.get_table().labels
+    channels = list(SteelSectionDatabase.get_channels())
+    sections = np.concatenate([rng.permutation(len(labels)) for _ in range(-(-n // len(labels)))])[:n]
+
+    records = []
+    for i in range(n):
+        hr = float(rng.choice([1.5, 2.0, 3.0]))
+        record = {
+            "beam_name": labels[sections[i]],
+            "span_ft": rng.uniform(10.0, 50.0), "spacing_ft": rng.uniform(4.0, 15.0),
+            "slab_thickness": rng.uniform(2.0, 6.0), "fc_ksi": rng.uniform(3.0, 10.0),
+            "fy_ksi": float(rng.choice([36.0, 50.0, 65.0])),
+            "rib_width": rng.uniform(2.0, 8.0), "rib_height": hr,
+            "dl_psf": rng.uniform(20.0, 120.0), "ll_psf": rng.uniform(0.0, 250.0),
+            "connector_spacing": rng.uniform(4.0, 36.0),
+            "deck_orientation": DECK_ORIENTATIONS[rng.integers(2)],
+            "connector_type": CONNECTOR_TYPES[rng.integers(2)],
+        }
+        if record["connector_type"] == "Stud":
+            props = {"diameter": float(rng.choice(STUD_DIAMETERS)), "fu": float(rng.choice([58.0, 60.0, 65.0])),
+                     "studs_per_rib": int(rng.integers(1, 4))}
+            if rng.random() < 0.5:
+                props["height"] = hr + rng.uniform(1.5, 3.5)
+        elif rng.random() < 0.5:
+            props = {"label": channels[rng.integers(len(channels))], "length": rng.uniform(2.0, 12.0)}
+        else:
+            props = {"tf": rng.uniform(0.2, 0.8), "tw": rng.uniform(0.15, 0.6), "length": rng.uniform(2.0, 12.0)}
+        record["connector_props"] = props
+        records.append(record)
+    return records
+
+
+def scalar_inputs(records):
+    """Entradas de CompositeBeamDesign (con 'beam_properties') para cada diseño."""
+    sections = SteelSectionDatabase.get_sections()
+    return [dict(r, beam_properties=sections[r["beam_name"]]) for r in records]
+
+
+def scalar_summary(inputs):
+    """Campos de RESULT_FIELDS y CONSTRUCTION_FIELDS con los métodos del modelo escalar."""
+    model = CompositeBeamDesign(inputs)
+    loads = model.calculate_loads()
+    conn = model.calculate_connectors()
+    strength = model.check_composite_strength(loads['M_u'], conn)
+    shear = model.check_shear_strength(loads['V_u'])
+    defs = model.calculate_deflections(conn, loads)
+    const = model.check_construction_stage()
+    return {
+        "M_u": loads['M_u'], "V_u": loads['V_u'],
+        "Qn_unit": conn['Qn_unit'], "N_half": conn['N_half'], "Sum_Qn": conn['Sum_Qn'], "percent": conn['percent'],
+        "phi_Mn": strength['phi_Mn'], "a": strength['a'], "b_eff": strength['b_eff'],
+        "ratio_flexure": strength['ratio'], "PhiVn": shear['PhiVn'], "ratio_shear": shear['ratio'],
+        "delta_short": defs['short']['delta'], "delta_long": defs['long']['delta'],
+        "I_eff_short": defs['short']['data']['I_eff'], "I_eff_long": defs['long']['data']['I_eff'],
+        "ratio_deflection": max(defs['short']['ratio'], defs['long']['ratio']),
+        "phi_Mn_const": const['phi_Mn'], "delta_wet": const['delta_wet'], "camber": const['camber'],
+        "ratio_construction": const['ratio'],
+    }
+
+
+def _engine_batch(records, inputs):
+    return BatchCompositeBeamDesign.from_input_list(inputs).run()
+
+
+def _engine_table(records, inputs):
+    return BatchCompositeBeamDesign(records_to_inputs(records)).run(include_construction=True)
+
+
+def _engine_records(records, inputs):
+    rows = evaluate_records(records)
+    out = {k: np.array([r[k] for r in rows]) for k in RESULT_FIELDS}
+    out["status"] = np.array([r["status"] for r in rows])
+    return out
+
+
+# Motores alternativos: nombre -> función (records, inputs) -> {campo: array}
+ENGINES = {"batch": _engine_batch, "table": _engine_table, "records": _engine_records}
+
+
+def _compare(reference, values, rtol=RTOL, atol=ATOL):
+    """
+    Compara arrays (N,) o (N, ...) por campo: coinciden si |valor - referencia|
+    <= atol + rtol |referencia|, con rtol y atol escalares o dicts por campo
+    (escalares o arrays). Retorna ({campo: error / tolerancia máximo},
+    [(campo, fila, referencia, valor)]) con el peor punto de cada fila.
+    """
+    fields, mismatches = {}, []
+    for k, ref in reference.items():
+        ref = np.asarray(ref, dtype=float)
+        value = np.asarray(values[k], dtype=float)
+        r = rtol.get(k, RTOL) if isinstance(rtol, dict) else rtol
+        a = atol.get(k, ATOL) if isinstance(atol, dict) else atol
+        ratio = (np.abs(value - ref) / (a + r * np.abs(ref))).reshape(len(ref), -1)
+        ratio = np.where(np.isnan(ratio), np.inf, ratio)
+        worst = np.argmax(ratio, axis=1) if ratio.size else np.zeros(0, dtype=np.intp)
+        fields[k] = float(np.max(ratio, initial=0.0))
+        flat_ref, flat_value = ref.reshape(len(ref), -1), value.reshape(len(ref), -1)
+        for i in np.flatnonzero(ratio[np.arange(len(ref)), worst] > 1.0):
+            mismatches.append((k, int(i), float(flat_ref[i, worst[i]]), float(flat_value[i, worst[i]])))
+    return fields, mismatches
+
+
+def _concrete_modulus(fc):
+    return 57000.0 * math.sqrt(fc * 1000.0) / 1000.0
+
+
+def closed_form(record, props):
+    """
+    Qn, ΣQn y phi Mn de un diseño con las fórmulas cerradas de AISC, sin
+    tablas precalculadas. Retorna (valores, tolerancias relativas): la
+    tolerancia es la cota del error de la interpolación lineal de las tablas
+    con su espaciamiento,
+      Qn:  Δf'c²/8 · 0.1875/f'c²   (√(f'c Ec) ~ f'c^0.75; lineal en Fu y La)
+      Mn:  Fy Δr²/8 · As²/(2 b)    (h(r) cuadrática por tramos, b = bf o tw)
+           + error de Qn · C (Y2 + d) cuando ΣQn controla
+    """
+    c = record["connector_props"]
+    L, s, tc, hr, wr = (record[k] for k in ("span_ft", "spacing_ft", "slab_thickness", "rib_height", "rib_width"))
+    fc, fy = record["fc_ksi"], record["fy_ksi"]
+    As, d, bf, tf = (props[k] for k in ("A", "d", "bf", "tf"))
+    sqrt_fc_Ec = math.sqrt(fc * _concrete_modulus(fc))
+
+    if record["connector_type"] == "Stud":
+        # I8.2a: Qn = min(0.5 Asc √(f'c Ec), Rg Rp Asc Fu)
+        dia, nr = c["diameter"], c["studs_per_rib"]
+        Asc = math.pi * dia**2 / 4.0
+        if record["deck_orientation"] == "Perpendicular":
+            Rg = 1.0 if nr == 1 else (0.85 if nr == 2 else 0.7)
+            Rp = 0.75 if (wr - dia) / 2.0 >= 2.0 else 0.6
+        else:
+            Rg = 1.0 if wr / hr >= 1.5 else 0.85
+            Rp = 0.75
+        Qn = min(0.5 * Asc * sqrt_fc_Ec, Rg * Rp * Asc * c["fu"])
+    else:
+        # I8.2b: Qn = 0.3 (tf + 0.5 tw) La √(f'c Ec)
+        shape = SteelSectionDatabase.get_channels()[c["label"]] if c.get("label") else c
+        Qn = 0.3 * (shape["tf"] + 0.5 * shape["tw"]) * c["length"] * sqrt_fc_Ec
+
+    N_half = int((L * 12 / 2) / record["connector_spacing"])
+    Sum_Qn = N_half * Qn
+    b_eff = min(L * 12 / 4, s * 12)
+    Vh = min(0.85 * fc * b_eff * tc, As * fy)
+    C = min(Sum_Qn, Vh)
+    a = C / (0.85 * fc * b_eff)
+    Y2 = hr + tc - a / 2.0
+
+    # I3.2: acero en compresión As_c = (As Fy - C)/(2 Fy) desde el ala superior;
+    # equilibrio de momentos respecto del borde superior del acero
+    tw = (As - 2 * bf * tf) / (d - 2 * tf)   # espesor de alma equivalente (incluye filetes)
+    As_c = (As * fy - C) / (2.0 * fy)
+    if As_c <= bf * tf:
+        y_c = As_c / (2.0 * bf)
+    else:
+        yw = (As_c - bf * tf) / tw
+        y_c = (bf * tf * tf / 2.0 + tw * yw * (tf + yw / 2.0)) / As_c
+    y_t = (As * d / 2.0 - As_c * y_c) / (As - As_c)
+    Mn = C * Y2 - fy * As_c * y_c + fy * (As - As_c) * y_t
+
+    # Tolerancias por el espaciamiento de las grillas
+    step = StudCapacityTable.FC_VALUES[1] - StudCapacityTable.FC_VALUES[0]
+    fc_low = max(fc - step, StudCapacityTable.FC_VALUES[0])
+    tol_Qn = step**2 / 8.0 * 0.1875 / fc_low**2 + RTOL
+    r_grid = PlasticMomentTable.from_properties(props).r_grid[0]
+    r = C / (As * fy)
+    i = min(max(int(np.searchsorted(r_grid, r, side='right')) - 1, 0), len(r_grid) - 2)
+    dr = r_grid[i + 1] - r_grid[i]
+    b = bf if As * (1.0 - (r_grid[i] + r_grid[i + 1]) / 2.0) / 2.0 <= bf * tf else tw
+    h_error = fy * dr**2 / 8.0 * As**2 / (2.0 * b)
+    Qn_error = tol_Qn * C * (Y2 + d) if Sum_Qn < Vh else 0.0
+    values = {"Qn_unit": Qn, "Sum_Qn": Sum_Qn, "phi_Mn": 0.9 * Mn / 12.0}
+    tols = {"Qn_unit": tol_Qn, "Sum_Qn": tol_Qn, "phi_Mn": (h_error + Qn_error) / Mn + RTOL}
+    return values, tols
+
+
+def check_closed_form(records, inputs, reference):
+    """Qn, ΣQn y phi Mn del escalar contra closed_form."""
+    rows = [closed_form(r, inp["beam_properties"]) for r, inp in zip(records, inputs)]
+    expected = {k: np.array([v[k] for v, _ in rows]) for k in rows[0][0]}
+    tols = {k: np.array([t[k] for _, t in rows]) for k in rows[0][1]}
+    return _compare(expected, {k: reference[k] for k in expected}, tols)
+
+
+def check_gradients(records, inputs, reference):
+    """
+    BatchCompositeBeamDesign.gradients (con discrete_studs, como las
+    diferencias finitas) contra diferencias centrales de run(). La tolerancia
+    se amplía con la diferencia entre las pendientes a izquierda y derecha,
+    de modo que un quiebre dentro del paso (ramas de min, saltos del número
+    de pernos) no se reporta como error.
+    """
+    base_inputs = records_to_inputs(records)
+    model = BatchCompositeBeamDesign(base_inputs)
+    loads = model.calculate_loads()
+    conn = model.calculate_connectors()
+    strength = model.check_composite_strength(loads['M_u'], conn)
+    shear = model.check_shear_strength(loads['V_u'])
+    defs = model.calculate_deflections(conn, loads)
+    grads = model.gradients(loads, conn, strength, shear, defs, discrete_studs=True)
+    base = model.run()
+
+    expected, values, atol = {}, {}, {}
+    for v in GRADIENT_VARIABLES:
+        h = GRADIENT_STEP * np.maximum(1.0, np.abs(base_inputs[v]))
+        plus = BatchCompositeBeamDesign(dict(base_inputs, **{v: base_inputs[v] + h})).run()
+        minus = BatchCompositeBeamDesign(dict(base_inputs, **{v: base_inputs[v] - h})).run()
+        for ratio, g in grads.items():
+            right, left = (plus[ratio] - base[ratio]) / h, (base[ratio] - minus[ratio]) / h
+            key = f"{ratio}/{v}"
+            expected[key], values[key] = (right + left) / 2.0, g[v]
+            atol[key] = GRADIENT_RTOL * np.abs(g[v]) + np.abs(right - left) + 1e-7
+    return _compare(expected, values, GRADIENT_RTOL, atol)
+
+
+def check_long_term(records, inputs, reference, ages=DEFAULT_AGES, sustained_live=0.25):
+    """
+    check_long_term contra el método del módulo efectivo ajustado por edad
+    evaluado edad por edad, con la sección transformada del modelo escalar
+    (Ec reducido a Ec/(1 + χ φ) mediante ec_factor).
+    """
+    lt = BatchCompositeBeamDesign(records_to_inputs(records)).check_long_term(ages=ages, sustained_live=sustained_live)
+    gamma_c = 1.27 - 0.0067 * HUMIDITY
+    gamma_sh = 1.40 - 0.0102 * HUMIDITY if HUMIDITY <= 80.0 else 3.00 - 0.030 * HUMIDITY
+    creep = lambda t, t0: (max(t - t0, 0.0)**0.6 / (10.0 + max(t - t0, 0.0)**0.6)) * PHI_U * gamma_c
+
+    expected = np.zeros((len(records), len(ages)))
+    for i, inp in enumerate(inputs):
+        model = CompositeBeamDesign(inp)
+        conn = model.calculate_connectors()
+        L_in = model.L * 12.0
+        K = 5.0 * L_in**4 / (384.0 * model.Es)
+        w_sus = model.s * (model.DL + sustained_live * model.LL) / 1000.0 / 12.0
+        w_tr = model.s * (1.0 - sustained_live) * model.LL / 1000.0 / 12.0
+        I0 = model.calculate_transformed_section(conn)['I_eff']
+        for j, t in enumerate(ages):
+            sec = model.calculate_transformed_section(conn, ec_factor=1.0 / (1.0 + AGING_COEFFICIENT * creep(t, 28.0)))
+            sec_sh = model.calculate_transformed_section(conn, ec_factor=1.0 / (1.0 + AGING_COEFFICIENT * creep(t, 7.0)))
+            eps = max(t - 7.0, 0.0) / (35.0 + max(t - 7.0, 0.0)) * EPS_SH_U * gamma_sh
+            conc = sec_sh['table_data']['conc']
+            curvature = eps * conc['A'] * (conc['y'] - sec_sh['Y_bar']) / sec_sh['I_eff']
+            loaded = t >= 28.0
+            expected[i, j] = (K * w_sus / sec['I_eff'] + K * w_tr / I0 if loaded else 0.0) + curvature * L_in**2 / 8.0
+    return _compare({"delta_total": expected}, {"delta_total": lt['delta_total']}, RTOL)
+
+
+def check_vibration(records, inputs, reference, live_psf=11.0, beta=0.03, limit=0.005):
+    """check_vibration (viga sola) contra DG11 con la sección transformada del escalar (1.35 Ec, 100%)."""
+    res = BatchCompositeBeamDesign(records_to_inputs(records)).run(include_vibration=True)
+    expected = {"f_n": [], "ap_g": [], "ratio_vibration": []}
+    for inp in inputs:
+        model = CompositeBeamDesign(inp)
+        sec = model.calculate_transformed_section(dict(model.calculate_connectors(), percent=100.0), ec_factor=1.35)
+        wj = model.s * (model.DL + live_psf) / 1000.0
+        delta = 5 * (wj / 12.0) * (model.L * 12)**4 / (384 * model.Es * sec['I_tr'])
+        fn = 0.18 * math.sqrt(386.0 / delta)
+        de = model.tc + model.hr / 2.0
+        Bj = 2.0 * ((de**3 / sec['n']) / (sec['I_tr'] / model.s))**0.25 * model.L
+        ap_g = 0.065 * math.exp(-0.35 * fn) / (beta * (wj / model.s) * Bj * model.L)
+        for k, v in (("f_n", fn), ("ap_g", ap_g), ("ratio_vibration", ap_g / limit)):
+            expected[k].append(v)
+    return _compare({k: np.array(v) for k, v in expected.items()}, res, RTOL)
+
+
+def _static_effects(L, x, loads, positions):
+    """M(x), V(x-) con cargas P en posiciones a (viga simple); se omiten las cargas fuera de la viga."""
+    on = [(P, a) for P, a in zip(loads, positions) if 0.0 <= a <= L]
+    R_left = sum(P * (L - a) / L for P, a in on)
+    M = R_left * x - sum(P * (x - a) for P, a in on if a < x)
+    V_right = R_left - sum(P for P, a in on if a < x)     # eje sobre x: a la derecha del corte
+    V_left = R_left - sum(P for P, a in on if a <= x)     # eje sobre x: a la izquierda (límite a -> x-)
+    return M, V_right, V_left
+
+
+def check_moving_load(records, inputs, reference, stations=21, positions=400):
+    """
+    moving_load_envelope contra estática en las posiciones críticas: M y V
+    son lineales por tramos en la posición del vehículo, con quiebres cuando
+    un eje pasa por la estación o por un apoyo. M_max y V_max son exactos
+    en el motor; V_min se busca en la grilla de posiciones, por lo que su
+    tolerancia es la variación de V en un paso de la grilla.
+    """
+    L = np.array([r["span_ft"] for r in records])
+    x = np.linspace(0.0, 1.0, stations)[None, :] * L[:, None]
+    expected, values, atol = {}, {}, {}
+    for name, vehicle in VEHICLES.items():
+        env = moving_load_envelope(L, x, vehicle, positions)
+        ref = {k: np.zeros(x.shape) for k in ("M_max", "V_max", "V_min")}
+        groups = [vehicle, vehicle.reversed()] if len(vehicle.loads) > 1 else [vehicle]
+        for b in range(len(L)):
+            for s_i, xs in enumerate(x[b]):
+                for group in groups:
+                    # Eje k sobre la estación o sobre un apoyo; el eje k queda exactamente en su lugar
+                    for k, p in ((k, p) for k in range(len(group.loads)) for p in (xs, 0.0, L[b])):
+                        axles = p + (group.offsets[k] - group.offsets)
+                        M, V_right, V_left = _static_effects(L[b], xs, group.loads, axles)
+                        ref["M_max"][b, s_i] = max(ref["M_max"][b, s_i], M)
+                        ref["V_max"][b, s_i] = max(ref["V_max"][b, s_i], V_right, V_left)
+                        ref["V_min"][b, s_i] = min(ref["V_min"][b, s_i], V_right, V_left)
+        grid_step = vehicle.total * (L + vehicle.length) / ((positions - 1) * L)
+        for k in ref:
+            expected[f"{name}/{k}"], values[f"{name}/{k}"] = ref[k], env[k]
+            atol[f"{name}/{k}"] = grid_step[:, None] + ATOL if k == "V_min" else ATOL
+    return _compare(expected, values, RTOL, atol)
+
+
+def check_sweep(records, inputs, reference, chunk=7):
+    """
+    evaluate_chunk en tramos de 'chunk' combinaciones (índices planos que
+    cruzan los ejes) contra el escalar en cada combinación de SweepSpec.
+    """
+    labels = sorted({r["beam_name"] for r in records[:4]})
+    base = {k: v for k, v in records[0].items() if k not in ("beam_name", "span_ft", "fc_ksi", "deck_orientation")}
+    spec = SweepSpec([("beam_name", labels), ("span_ft", [15.0, 27.5, 40.0]), ("fc_ksi", [3.0, 5.5]),
+                      ("deck_orientation", list(DECK_ORIENTATIONS))], base)
+    parts = [evaluate_chunk(spec, start, min(start + chunk, spec.size)) for start in range(0, spec.size, chunk)]
+    values = {k: np.concatenate([p[k] for p in parts]) for k in SWEEP_FIELDS}
+    expected = [scalar_summary(scalar_inputs([spec.parameters(i)])[0]) for i in range(spec.size)]
+    expected = {k: np.array([e[k] for e in expected]) for k in RESULT_FIELDS}
+    expected["max_ratio"] = np.maximum.reduce([expected["ratio_flexure"], expected["ratio_shear"],
+                                               expected["ratio_deflection"]])
+    return _compare(expected, values, RTOL)
+
+
+# Referencias independientes: nombre -> función (records, inputs, referencia escalar) -> (fields, mismatches).
+# Las de costo escalar por diseño se evalúan sobre los primeros CHECK_SIZE diseños
+# (sweep toma de ellos los perfiles y los datos fijos de su barrido).
+CHECKS = {"closed_form": check_closed_form, "gradients": check_gradients, "long_term": check_long_term,
+          "vibration": check_vibration, "moving_load": check_moving_load, "sweep": check_sweep}
+CHECK_SIZE = {"long_term": 100, "vibration": 500, "moving_load": 50, "sweep": 4}
+
+
+def _timed(func, repeat):
+    """Resultado de func() y su mejor tiempo en 'repeat' ejecuciones."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+
+def run_differential(n=2000, seed=0, engines=None, rtol=RTOL, atol=ATOL, repeat=3, checks=None):
+    """
+    Compara cada motor con el escalar sobre n diseños al azar y corre las
+    referencias independientes 'checks' (por defecto todas, ver CHECKS).
+    Retorna:
+      n, seed, scalar_rate (diseños/s)
+      engines: {motor: {fields: {campo: error relativo máximo},
+                        mismatches: [(campo, fila, escalar, motor)], rate, speedup}}
+      checks: {referencia: {n, fields: {campo: error / tolerancia máximo},
+                            mismatches: [(campo, fila, referencia, motor)], elapsed}}
+    Un campo coincide si |motor - escalar| <= atol + rtol |escalar|.
+    """
+    records = random_records(n, seed)
+    inputs = scalar_inputs(records)
+    reference, scalar_time = _timed(lambda: [scalar_summary(inp) for inp in inputs], 1)
+    reference = {k: np.array([r[k] for r in reference], dtype=float) for k in reference[0]}
+    status = np.where(np.maximum.reduce([reference['ratio_flexure'], reference['ratio_shear'],
+                                         reference['ratio_deflection']]) <= 1.0, "OK", "FALLA")
+
+    report = {"n": n, "seed": seed, "scalar_rate": n / scalar_time, "engines": {}}
+    for name in engines or ENGINES:
+        out, elapsed = _timed(lambda: ENGINES[name](records, inputs), repeat)
+        fields, mismatches = {}, []
+        for k in reference:
+            if k not in out:
+                continue
+            value = np.asarray(out[k], dtype=float)
+            error = np.abs(value - reference[k])
+            fields[k] = float(np.max(error / np.maximum(np.abs(reference[k]), atol)))
+            for i in np.flatnonzero(~(error <= atol + rtol * np.abs(reference[k]))):
+                mismatches.append((k, int(i), float(reference[k][i]), float(value[i])))
+        if "status" in out:
+            mismatches += [("status", int(i), status[i], out["status"][i])
+                           for i in np.flatnonzero(out["status"] != status)]
+        report["engines"][name] = {"fields": fields, "mismatches": mismatches,
+                                   "rate": n / elapsed, "speedup": scalar_time / elapsed}
+
+    report["checks"] = {}
+    for name in (CHECKS if checks is None else checks):
+        m = min(n, CHECK_SIZE.get(name, n))
+        start = time.perf_counter()
+        fields, mismatches = CHECKS[name](records[:m], inputs[:m], {k: v[:m] for k, v in reference.items()})
+        report["checks"][name] = {"n": m, "fields": fields, "mismatches": mismatches,
+                                  "elapsed": time.perf_counter() - start}
+    report["records"] = records
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verificación diferencial de los motores rápidos")
+    parser.add_argument("--n", type=int, default=2000, help="Número de diseños al azar")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--rtol", type=float, default=RTOL)
+    parser.add_argument("--atol", type=float, default=ATOL)
+    parser.add_argument("--min-speedup", type=float, default=1.0,
+                        help="Aceleración mínima de cada motor respecto del escalar")
+    parser.add_argument("--checks", nargs="*", choices=list(CHECKS), default=list(CHECKS),
+                        help="Referencias independientes a correr (ninguna con --checks sin valores)")
+    args = parser.parse_args(argv)
+
+    report = run_differential(args.n, args.seed, args.engines, args.rtol, args.atol, checks=args.checks)
+    print(f"{report['n']} diseños (semilla {report['seed']}), escalar: {report['scalar_rate']:.0f} diseños/s")
+    failed = False
+    for name, res in report["engines"].items():
+        worst = max(res["fields"], key=res["fields"].get)
+        ok = not res["mismatches"] and res["speedup"] >= args.min_speedup
+        failed |= not ok
+        print(f"  {name:8s} {res['rate']:10.0f} diseños/s  x{res['speedup']:7.1f}  "
+              f"{len(res['fields'])} campos, error máx. {res['fields'][worst]:.1e} ({worst})  "
+              f"{'OK' if ok else 'FALLA'}")
+        for k, i, ref, value in res["mismatches"][:10]:
+            record = report["records"][i]
+            print(f"    {k} fila {i} ({record['beam_name']}, {record['deck_orientation']}, "
+                  f"{record['connector_type']}): escalar {ref}, {name} {value}")
+        if res["speedup"] < args.min_speedup:
+            print(f"    aceleración x{res['speedup']:.1f} menor que x{args.min_speedup}")
+    for name, res in report["checks"].items():
+        worst = max(res["fields"], key=res["fields"].get)
+        failed |= bool(res["mismatches"])
+        print(f"  {name:12s} {res['n']:6d} diseños  {len(res['fields'])} campos, error/tolerancia máx. "
+              f"{res['fields'][worst]:.2f} ({worst})  {'FALLA' if res['mismatches'] else 'OK'}  ({res['elapsed']:.2f} s)")
+        for k, i, ref, value in res["mismatches"][:10]:
+            record = report["records"][i]
+            print(f"    {k} fila {i} ({record['beam_name']}, {record['deck_orientation']}, "
+                  f"{record['connector_type']}): referencia {ref}, motor {value}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
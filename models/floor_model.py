@@ -0,0 +1,296 @@
+import numpy as np
+from models.batch_calculator import BatchCompositeBeamDesign, CONNECTOR_DEFAULTS
+from models.long_term import DEFAULT_AGES
+from models.section_database import SteelSectionDatabase
+from models.vibration import walking_vibration
+
+
+def point_load_effects(L, a, P, P_service=None):
+    """
+    Efectos de cargas puntuales en vigas simplemente apoyadas, vectorizado.
+    L: luces (G,) en ft; a: posiciones (G, K) en ft; P: cargas (G, K) en kips
+    (rellenar con ceros las filas con menos cargas).
+    Retorna (M_max k-ft, V_max kips, delta_EI) donde delta_EI es la deflexión
+    a media luz multiplicada por E*I (kip-in³), calculada con P_service si se da:
+        Δ = Σ P a (3L² - 4a²) / (48 E I),  a = distancia al apoyo más cercano
+    """
+    L = np.asarray(L, dtype=float)[:, None]
+    a = np.asarray(a, dtype=float)
+    P = np.asarray(P, dtype=float)
+    R_left = np.sum(P * (L - a), axis=1) / L[:, 0]
+    R_right = np.sum(P, axis=1) - R_left
+
+    # Momento bajo cada carga: M(x_i) = R_A x_i - Σ P_j <x_i - a_j>
+    lever = np.maximum(a[:, :, None] - a[:, None, :], 0.0)
+    M_points = R_left[:, None] * a - np.sum(P[:, None, :] * lever, axis=2)
+    M_max = np.max(M_points, axis=1, initial=0.0)
+    V_max = np.maximum(R_left, R_right)
+
+    Ps = P if P_service is None else np.asarray(P_service, dtype=float)
+    L_in = L * 12.0
+    a_in = np.minimum(a, L - a) * 12.0
+    delta_EI = np.sum(Ps * a_in * (3 * L_in**2 - 4 * a_in**2), axis=1) / 48.0
+    return M_max, V_max, delta_EI
+
+
+def point_load_moments(L, a, P, x):
+    """
+    Diagrama de momentos (G, S) en las estaciones x (G, S) para cargas
+    puntuales a, P (G, K) en vigas simplemente apoyadas de luz L (G,).
+    """
+    L = np.asarray(L, dtype=float)
+    R_left = np.sum(P * (L[:, None] - a), axis=1) / L
+    lever = np.maximum(x[:, :, None] - a[:, None, :], 0.0)
+    return R_left[:, None] * x - np.sum(P[:, None, :] * lever, axis=2)
+
+
+class FloorLayout:
+    """
+    Planta de entrepiso sobre una grilla de columnas.
+      x_spans: luces de las vigas principales (girders) entre columnas, en ft
+      y_spans: luces de las vigas secundarias (infill) entre girders, en ft
+      beam_spacing: separación nominal de vigas secundarias dentro de cada paño
+    Las vigas secundarias corren en dirección Y con deck perpendicular y
+    descargan en los girders, que corren en dirección X con deck paralelo.
+    design_inputs contiene los datos comunes de CompositeBeamDesign (losa,
+    materiales, cargas, deck y conectores); girder_inputs permite sobrescribir
+    algunos de ellos para los girders.
+    """
+    def __init__(self, x_spans, y_spans, beam_spacing, design_inputs,
+                 beam_section, girder_section, girder_inputs=None):
+        self.x_spans = [float(v) for v in x_spans]
+        self.y_spans = [float(v) for v in y_spans]
+        self.beam_spacing = float(beam_spacing)
+        self.design_inputs = design_inputs
+        self.beam_section = beam_section
+        self.girder_section = girder_section
+        self.girder_inputs = girder_inputs or {}
+
+    def beam_positions(self, Lx):
+        """Posiciones de vigas secundarias dentro de un paño y su ancho tributario."""
+        n = max(1, int(round(Lx / self.beam_spacing)))
+        x = np.linspace(0.0, Lx, n + 1)
+        trib = (x[2:] - x[:-2]) / 2.0
+        return x[1:-1], trib
+
+    def members(self):
+        """
+        Lista de vigas secundarias y girders de la planta. Cada viga indica su
+        paño (i, j), posición y luz; cada girder su línea j, paño i y las
+        posiciones de las vigas que recibe desde cada lado.
+        """
+        beams = []
+        girders = []
+        for i, Lx in enumerate(self.x_spans):
+            x_pos, trib = self.beam_positions(Lx)
+            for j, Ly in enumerate(self.y_spans):
+                for k, (x, t) in enumerate(zip(x_pos, trib)):
+                    beams.append({"id": f"B{i + 1}.{j + 1}.{k + 1}", "bay": (i, j), "x": float(x),
+                                  "span_ft": Ly, "spacing_ft": float(t), "section": self.beam_section})
+            for j in range(len(self.y_spans) + 1):
+                sides = [jj for jj in (j - 1, j) if 0 <= jj < len(self.y_spans)]
+                girders.append({"id": f"G{j + 1}.{i + 1}", "line": j, "bay": i, "span_ft": Lx,
+                                "spacing_ft": sum(self.y_spans[jj] for jj in sides) / 2.0,
+                                "bays_supported": [(i, jj) for jj in sides], "section": self.girder_section})
+        return beams, girders
+
+
+class FloorDesign:
+    """
+    Diseña una planta completa como lote: agrupa las vigas idénticas para
+    calcular cada diseño único una sola vez, transmite sus reacciones a los
+    girders como cargas puntuales y diseña los girders únicos en un segundo
+    lote. El costo crece con el número de diseños únicos, no con el total.
+    """
+    STATIONS = 201   # Estaciones por girder para la distribución de pernos
+
+    def __init__(self, layout, table=None, vibration_live_psf=11.0, damping=0.03):
+        self.layout = layout
+        self.table = table or SteelSectionDatabase.get_table()
+        self.vibration_live_psf = vibration_live_psf
+        self.damping = damping
+
+    @staticmethod
+    def _group(keys):
+        groups = {}
+        index = [groups.setdefault(k, len(groups)) for k in keys]
+        return list(groups), np.array(index, dtype=np.intp)
+
+    def _common_inputs(self, overrides, n):
+        base = dict(self.layout.design_inputs)
+        base.update(overrides)
+        inputs = {k: base[k] for k in ('slab_thickness', 'fc_ksi', 'fy_ksi', 'dl_psf', 'll_psf',
+                                       'rib_height', 'rib_width')}
+        inputs['connector_spacing'] = base.get('connector_spacing', 12.0)
+        inputs['connector_type'] = base.get('connector_type', 'Stud')
+        inputs['deck_orientation'] = base.get('deck_orientation', 'Perpendicular')
+        conn = dict(base.get('connector_props', {}))
+        inputs['connector_props'] = {k: conn.get(k, v) for k, v in CONNECTOR_DEFAULTS.items()}
+        if conn.get('label'):
+            inputs['connector_props']['label'] = np.full(n, conn['label'])
+        inputs['section_table'] = self.table
+        return inputs
+
+    def _beam_model(self, beams):
+        keys = [(round(b['span_ft'], 6), round(b['spacing_ft'], 6), b['section']) for b in beams]
+        unique, group_of = self._group(keys)
+
+        inputs = self._common_inputs({'deck_orientation': 'Perpendicular'}, len(unique))
+        inputs['span_ft'] = np.array([k[0] for k in unique])
+        inputs['spacing_ft'] = np.array([k[1] for k in unique])
+        inputs['section_rows'] = self.table.rows([k[2] for k in unique])
+        return unique, group_of, BatchCompositeBeamDesign(inputs)
+
+    def design_beams(self, beams):
+        unique, group_of, model = self._beam_model(beams)
+        res = model.run()
+        loads = model.calculate_loads()
+        res['R_u'] = loads['w_u'] * model.L / 2.0
+        res['R_service'] = loads['w_service'] * model.L / 2.0
+        self._dynamic_section(model, res)
+        return unique, group_of, res
+
+    @staticmethod
+    def _dynamic_section(model, res):
+        # Inercia transformada dinámica (1.35Ec, acción compuesta total) para DG11
+        conn = model.calculate_connectors()
+        trans = model.calculate_transformed_section(dict(conn, percent=np.full(model.n, 100.0)), ec_factor=1.35)
+        res['I_dyn'] = trans['I_tr']
+        res['n_dyn'] = trans['n']
+        res['de'] = model.tc + model.hr / 2.0
+        res['dl_psf'] = model.DL
+
+    def design_girders(self, girders, beams, beam_group, beam_res):
+        # Reacciones de vigas por paño: {(i, j): [(x, Ru, Rs), ...]}
+        by_bay = {}
+        for b, g in zip(beams, beam_group):
+            by_bay.setdefault(b['bay'], []).append((b['x'], beam_res['R_u'][g], beam_res['R_service'][g]))
+
+        loads = []
+        for g in girders:
+            acc = {}
+            for bay in g['bays_supported']:
+                for x, Ru, Rs in by_bay.get(bay, []):
+                    key = round(x, 6)
+                    pu, ps = acc.get(key, (0.0, 0.0))
+                    acc[key] = (pu + Ru, ps + Rs)
+            loads.append(tuple(sorted((x, round(pu, 6), round(ps, 6)) for x, (pu, ps) in acc.items())))
+
+        keys = [(round(g['span_ft'], 6), round(g['spacing_ft'], 6), g['section'], pl) for g, pl in zip(girders, loads)]
+        unique, group_of = self._group(keys)
+        n = len(unique)
+        K = max(1, max(len(k[3]) for k in unique))
+        a = np.zeros((n, K))
+        Pu = np.zeros((n, K))
+        Ps = np.zeros((n, K))
+        for r, k in enumerate(unique):
+            for c, (x, pu, ps) in enumerate(k[3]):
+                a[r, c], Pu[r, c], Ps[r, c] = x, pu, ps
+
+        # Girder: sin carga distribuida (la losa descarga en las vigas), deck paralelo
+        overrides = {'dl_psf': 0.0, 'll_psf': 0.0, 'deck_orientation': 'Parallel'}
+        overrides.update(self.layout.girder_inputs)
+        inputs = self._common_inputs(overrides, n)
+        inputs['span_ft'] = np.array([k[0] for k in unique])
+        inputs['spacing_ft'] = np.array([k[1] for k in unique])
+        inputs['section_rows'] = self.table.rows([k[2] for k in unique])
+        model = BatchCompositeBeamDesign(inputs)
+
+        M_u, V_u, delta_EI = point_load_effects(model.L, a, Pu, Ps)
+        conn = model.calculate_connectors()
+        strength = model.check_composite_strength(M_u, conn)
+        shear = model.check_shear_strength(V_u)
+        # Distribución de pernos para las cargas puntuales (no uniforme)
+        x = model.L[:, None] * np.linspace(0.0, 1.0, self.STATIONS)[None, :]
+        studs = model.solve_stud_layout(x, point_load_moments(model.L, a, Pu, x), conn)
+
+        I_short = model.calculate_transformed_section(conn, long_term=False)['I_eff']
+        I_long = model.calculate_transformed_section(conn, long_term=True)['I_eff']
+        L_in = model.L * 12
+        delta_short = delta_EI / (model.Es * I_short)
+        delta_long = delta_EI / (model.Es * I_long)
+
+        res = {
+            "M_u": M_u, "V_u": V_u, "N_half": conn['N_half'], "percent": conn['percent'],
+            "phi_Mn": strength['phi_Mn'], "ratio_flexure": strength['ratio'],
+            "PhiVn": shear['PhiVn'], "ratio_shear": shear['ratio'],
+            "delta_short": delta_short, "delta_long": delta_long,
+            "ratio_deflection": np.maximum(delta_short / (L_in / 360.0), delta_long / (L_in / 240.0)),
+            "n_point_loads": np.array([len(k[3]) for k in unique]),
+            "n_studs_layout": studs['total'], "stud_positions": studs['positions'],
+            "stud_layout_ok": studs['feasible'],
+        }
+        self._dynamic_section(model, res)
+        return unique, group_of, res
+
+    def check_vibration(self, beams, beam_group, beam_res, girders, girder_group, girder_res):
+        """
+        Vibración por caminata (DG11) por viga secundaria, combinando la viga
+        con el girder de apoyo más flexible de su paño. Retorna arrays por viga.
+        """
+        girder_of = {(g['line'], g['bay']): gg for g, gg in zip(girders, girder_group)}
+        Ig_dyn = girder_res['I_dyn']
+        support = np.array([min((girder_of[(j, i)], girder_of[(j + 1, i)]), key=lambda gg: Ig_dyn[gg])
+                            for i, j in (b['bay'] for b in beams)], dtype=np.intp)
+        Lg = np.array([self.layout.x_spans[b['bay'][0]] for b in beams])
+
+        g = beam_group
+        sj = np.array([b['spacing_ft'] for b in beams])
+        Lj = np.array([b['span_ft'] for b in beams])
+        wj = sj * (beam_res['dl_psf'][g] + self.vibration_live_psf) / 1000.0
+        return walking_vibration(Lj, sj, wj, beam_res['I_dyn'][g], beam_res['de'][g], beam_res['n_dyn'][g],
+                                 Lg, Ig_dyn[support], beta=self.damping,
+                                 floor_width=sum(self.layout.x_spans), floor_length=sum(self.layout.y_spans))
+
+    def run(self):
+        beams, girders = self.layout.members()
+        beam_keys, beam_group, beam_res = self.design_beams(beams)
+        girder_keys, girder_group, girder_res = self.design_girders(girders, beams, beam_group, beam_res)
+
+        for res in (beam_res, girder_res):
+            res['max_ratio'] = np.maximum.reduce([res['ratio_flexure'], res['ratio_shear'], res['ratio_deflection']])
+        vibration = self.check_vibration(beams, beam_group, beam_res, girders, girder_group, girder_res)
+        return {
+            "beams": beams, "beam_group": beam_group, "beam_results": beam_res, "beam_vibration": vibration,
+            "girders": girders, "girder_group": girder_group, "girder_results": girder_res,
+            "summary": {
+                "beams": len(beams), "unique_beams": len(beam_keys),
+                "girders": len(girders), "unique_girders": len(girder_keys),
+                "beams_ok": int(np.sum(beam_res['max_ratio'][beam_group] <= 1.0)),
+                "girders_ok": int(np.sum(girder_res['max_ratio'][girder_group] <= 1.0)),
+                "vibration_ok": int(np.sum(vibration['ratio'] <= 1.0)),
+                "f_n_min": float(np.min(vibration['fn'])),
+            },
+        }
+
+    def deflection_history(self, ages=DEFAULT_AGES, **options):
+        """
+        Curvas de deflexión diferida vs edad del concreto (flujo plástico y
+        retracción, ver BatchCompositeBeamDesign.check_long_term) de todas las
+        vigas de la planta en una sola llamada: arrays (vigas, edades)
+        expandidos desde los diseños únicos.
+        """
+        beams, _ = self.layout.members()
+        unique, group_of, model = self._beam_model(beams)
+        lt = model.check_long_term(ages=ages, **options)
+        out = {k: v[group_of] for k, v in lt.items() if k not in ('ages', 'phi', 'eps_sh')}
+        out.update({"ages": lt['ages'], "phi": lt['phi'], "eps_sh": lt['eps_sh'],
+                    "ids": [b['id'] for b in beams], "beam_group": group_of})
+        return out
+
+    def member_results(self, result):
+        """Resultados por miembro (una fila por viga/girder) a partir de los grupos únicos."""
+        rows = []
+        vib = result['beam_vibration']
+        for kind, members, groups, res in (("beam", result['beams'], result['beam_group'], result['beam_results']),
+                                           ("girder", result['girders'], result['girder_group'], result['girder_results'])):
+            for idx, (m, g) in enumerate(zip(members, groups)):
+                rows.append({"id": m['id'], "type": kind, "section": m['section'], "group": int(g),
+                             "ratio_flexure": float(res['ratio_flexure'][g]),
+                             "ratio_shear": float(res['ratio_shear'][g]),
+                             "ratio_deflection": float(res['ratio_deflection'][g]),
+                             "status": "OK" if res['max_ratio'][g] <= 1.0 else "FALLA"})
+                if kind == "beam":
+                    rows[-1].update({"f_n": float(vib['fn'][idx]), "ap_g": float(vib['ap_g'][idx]),
+                                     "ratio_vibration": float(vib['ratio'][idx])})
+        return rows
@@ -0,0 +1,109 @@
+import numpy as np
+from models.section_table import ES_KSI
+
+# Valores últimos de ACI 209R-92 en condiciones estándar (curado húmedo, HR 40%);
+# se corrigen por la humedad relativa con humidity_factors
+PHI_U = 2.35            # Coeficiente último de flujo plástico
+EPS_SH_U = 780e-6       # Retracción última (in/in)
+HUMIDITY = 70.0         # Humedad relativa ambiente por defecto (%)
+AGING_COEFFICIENT = 0.8 # χ del módulo efectivo ajustado por edad (Trost-Bažant)
+
+# Edades del concreto por defecto (días): desde la carga a los 28 días hasta 50 años
+DEFAULT_AGES = np.geomspace(28.0, 50 * 365.0, 40)
+
+
+def humidity_factors(humidity=HUMIDITY):
+    """Factores de corrección por humedad relativa (ACI 209R-92 Ec. 2-14 y 2-22): (γc, γsh)."""
+    return 1.27 - 0.0067 * humidity, np.where(humidity <= 80.0, 1.40 - 0.0102 * humidity, 3.00 - 0.030 * humidity)
+
+
+def creep_coefficient(t, t0, phi_u=PHI_U):
+    """φ(t, t0) = (t - t0)^0.6 / (10 + (t - t0)^0.6) φu (ACI 209R-92 Ec. 2-8); t, t0 en días."""
+    tau = np.maximum(np.asarray(t, dtype=float) - t0, 0.0)**0.6
+    return tau / (10.0 + tau) * phi_u
+
+
+def shrinkage_strain(t, t_dry=7.0, eps_u=EPS_SH_U):
+    """εsh(t) = (t - t_dry) / (35 + t - t_dry) εsh,u (ACI 209R-92 Ec. 2-10, curado húmedo)."""
+    tau = np.maximum(np.asarray(t, dtype=float) - t_dry, 0.0)
+    return tau / (35.0 + tau) * eps_u
+
+
+def transformed_section(As, d, Ix, b_eff, tc, hr, wr, parallel, n):
+    """
+    Sección transformada (mismas partes que calculate_transformed_section:
+    acero, losa y nervios con deck paralelo) para relaciones modulares n de
+    cualquier forma compatible por broadcasting. Retorna A_c y y_c del
+    concreto, Y_bar e I_tr (in, in², in⁴; y desde la base del acero).
+    """
+    b_tr = b_eff / n
+    A_slab, y_slab = b_tr * tc, d + hr + tc / 2.0
+    b_ribs = np.where(parallel, b_tr * wr / 12.0, 0.0)
+    A_ribs, y_ribs = b_ribs * hr, d + hr / 2.0
+
+    A_c = A_slab + A_ribs
+    y_c = (A_slab * y_slab + A_ribs * y_ribs) / A_c
+    Y_bar = (As * d / 2.0 + A_c * y_c) / (As + A_c)
+    I_tr = (Ix + As * (Y_bar - d / 2.0)**2
+            + b_tr * tc**3 / 12.0 + A_slab * (y_slab - Y_bar)**2
+            + b_ribs * hr**3 / 12.0 + A_ribs * (y_ribs - Y_bar)**2)
+    return {"A_c": A_c * n, "y_c": y_c, "Y_bar": Y_bar, "I_tr": I_tr}
+
+
+def long_term_deflection(L, w_sustained, w_transient, section, Ec, percent, ages=DEFAULT_AGES, t0=28.0,
+                         t_dry=7.0, humidity=HUMIDITY, phi_u=PHI_U, eps_u=EPS_SH_U, chi=AGING_COEFFICIENT,
+                         Es=ES_KSI):
+    """
+    Deflexión al centro de la luz en el tiempo por flujo plástico y
+    retracción, vectorizada sobre N vigas y T edades (arrays (N, T)).
+      L: luz (ft); w_sustained / w_transient: cargas de servicio (klf)
+      section: dict con As, d, Ix, b_eff, tc, hr, wr, parallel (arrays (N,))
+      Ec: módulo del concreto (ksi); percent: % de acción compuesta
+      ages: edades del concreto (días); t0: edad de carga; t_dry: fin del curado
+      humidity: humedad relativa (%) que corrige φu y εsh,u (humidity_factors)
+    Método del módulo efectivo ajustado por edad (AAEM):
+        Ee(t) = Ec / (1 + χ φ(t, t0)),  n(t) = Es / Ee(t)
+        Δsus(t) = 5 ws L⁴ / (384 Es Ieff(t)),  Δtr = 5 wt L⁴ / (384 Es Ieff(t0))
+        Δsh(t) = κ L² / 8,  κ = εsh(t) Esh(t) Ac e / (Es Ieff),  Esh = Ec / (1 + χ φ(t, t_dry))
+    con Ieff = Ix + √(%/100)(Itr - Ix) como en calculate_transformed_section y
+    e la distancia del centroide del concreto al de la sección transformada
+    con Esh. La carga sostenida actúa desde t0 y la retracción desde t_dry,
+    por lo que su flujo plástico se mide desde t_dry.
+    """
+    col = lambda v: np.asarray(v, dtype=float)[:, None]
+    ages = np.asarray(ages, dtype=float)[None, :]
+    L_in = col(L) * 12.0
+    Ec = col(Ec)
+    k = np.sqrt(col(percent) / 100.0)
+    sec = {key: np.asarray(v)[:, None] for key, v in section.items()}
+    args = (sec['As'], sec['d'], sec['Ix'], sec['b_eff'], sec['tc'], sec['hr'], sec['wr'], sec['parallel'])
+
+    gamma_c, gamma_sh = humidity_factors(humidity)
+    phi = creep_coefficient(ages, t0, phi_u * gamma_c)
+    eps_sh = shrinkage_strain(ages, t_dry, eps_u * gamma_sh)
+    E_e = Ec / (1.0 + chi * phi)
+    E_sh = Ec / (1.0 + chi * creep_coefficient(ages, t_dry, phi_u * gamma_c))
+
+    effective = lambda s: sec['Ix'] + k * (s['I_tr'] - sec['Ix'])
+    sec_sh = transformed_section(*args, Es / E_sh)
+    I_eff0 = effective(transformed_section(*args, Es / Ec))
+    I_eff = effective(transformed_section(*args, Es / E_e))
+
+    loaded = ages >= t0
+    K = 5.0 * L_in**4 / (384.0 * Es)
+    delta_inst = K * (col(w_sustained) / 12.0) / I_eff0
+    delta_sustained = np.where(loaded, K * (col(w_sustained) / 12.0) / I_eff, 0.0)
+    delta_transient = np.where(loaded, K * (col(w_transient) / 12.0) / I_eff0, 0.0)
+
+    e = sec_sh['y_c'] - sec_sh['Y_bar']
+    curvature = eps_sh * E_sh * sec_sh['A_c'] * e / (Es * effective(sec_sh))
+    delta_shrinkage = curvature * L_in**2 / 8.0
+
+    delta_total = delta_sustained + delta_transient + delta_shrinkage
+    limit = L_in / 240.0
+    return {
+        "ages": ages[0], "phi": phi[0], "eps_sh": eps_sh[0], "n": Es / E_e, "I_eff": I_eff,
+        "delta_sustained": delta_sustained, "delta_creep": np.where(loaded, delta_sustained - delta_inst, 0.0),
+        "delta_transient": delta_transient, "delta_shrinkage": delta_shrinkage, "delta_total": delta_total,
+        "delta_final": delta_total[:, -1], "limit": limit[:, 0], "ratio": np.max(delta_total, axis=1) / limit[:, 0],
+    }
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class Vehicle:
+    """
+    Grupo de ejes móviles: cargas por eje (kips) y separaciones entre ejes
+    consecutivos (ft), en el orden de avance. Las posiciones de los ejes se
+    miden hacia atrás desde el eje delantero.
+    """
+    def __init__(self, name, axle_loads, axle_spacings=()):
+        self.name = name
+        self.loads = np.asarray(axle_loads, dtype=float)
+        spacings = np.asarray(axle_spacings, dtype=float)
+        if len(spacings) != len(self.loads) - 1:
+            raise ValueError("Se requiere una separación menos que el número de ejes")
+        self.offsets = np.concatenate(([0.0], np.cumsum(spacings)))
+
+    @property
+    def length(self):
+        return float(self.offsets[-1])
+
+    @property
+    def total(self):
+        return float(np.sum(self.loads))
+
+    def reversed(self):
+        """El mismo vehículo circulando en sentido contrario."""
+        return Vehicle(self.name, self.loads[::-1], np.diff(self.offsets)[::-1])
+
+
+# Vehículos de referencia (AASHTO H20 y HS20 con el eje variable en 14 ft;
+# cargas por eje completo, ambas ruedas)
+VEHICLES = {
+    "H20": Vehicle("H20", (8.0, 32.0), (14.0,)),
+    "HS20": Vehicle("HS20", (8.0, 32.0, 32.0), (14.0, 14.0)),
+}
+
+
+def moving_load_envelope(L, x, vehicle, positions=400, both_directions=True):
+    """
+    Envolventes de momento y cortante de un grupo de ejes que recorre vigas
+    simplemente apoyadas, vectorizado sobre vigas x posiciones x estaciones.
+      L: luces (B,) en ft; x: estaciones (S,) o (B, S) en ft
+      positions: número de posiciones del eje delantero entre la entrada del
+         primer eje y la salida del último (0 <= p <= L + longitud del vehículo)
+    Con la carga unitaria en a (línea de influencia de viga simple):
+        M(x) = P (L - a) x / L  si a >= x,   P a (L - x) / L  si a < x
+        V(x) = P (L - a) / L    si a >= x,  -P a / L         si a < x
+    Los ejes fuera de la viga no aportan. Retorna dict con las estaciones y
+    las envolventes M_max, V_max y V_min (B, S); V es el cortante justo a la
+    izquierda de la estación. La memoria intermedia es B x (positions + S K)
+    x S por sentido de circulación (K = número de ejes).
+    """
+    L = np.atleast_1d(np.asarray(L, dtype=float))
+    x = np.broadcast_to(np.atleast_2d(np.asarray(x, dtype=float)), (len(L), np.shape(x)[-1]))
+    groups = [vehicle, vehicle.reversed()] if both_directions and len(vehicle.loads) > 1 else [vehicle]
+
+    M_max = np.zeros(x.shape)
+    V_max = np.zeros(x.shape)
+    V_min = np.zeros(x.shape)
+    Lb = L[:, None, None]
+    xx = x[:, None, :]                                                      # (B, 1, S)
+    for group in groups:
+        # Grilla uniforme más las posiciones con un eje sobre cada estación,
+        # que contienen el máximo exacto de M y V en las estaciones
+        t = np.linspace(0.0, 1.0, positions)
+        p = np.concatenate([t[None, :] * (L[:, None] + group.length),
+                            (x[:, :, None] + group.offsets[None, None, :]).reshape(len(L), -1)], axis=1)
+        M = np.zeros(p.shape + (x.shape[1],))
+        V = np.zeros_like(M)
+        # Suma sobre los ejes (pocos); todas las posiciones a la vez
+        for P, offset in zip(group.loads, group.offsets):
+            a = (p - offset)[:, :, None]                                    # (B, Np, 1)
+            on = (a >= 0.0) & (a <= Lb)
+            # (x + offset) - offset puede quedar un ulp antes de x: el eje sobre
+            # la estación se cuenta a la derecha con una tolerancia relativa a L
+            right = a >= xx - 1e-9 * Lb
+            M += np.where(on, P * np.where(right, (Lb - a) * xx, a * (Lb - xx)), 0.0)
+            V += np.where(on, P * np.where(right, Lb - a, -a), 0.0)
+        M_max = np.maximum(M_max, np.max(M, axis=1) / L[:, None])
+        V_max = np.maximum(V_max, np.max(V, axis=1) / L[:, None])
+        V_min = np.minimum(V_min, np.min(V, axis=1) / L[:, None])
+    return {"x": x, "M_max": M_max, "V_max": V_max, "V_min": V_min}
@@ -0,0 +1,165 @@
+import numpy as np
+from models.batch_calculator import BatchCompositeBeamDesign, CONNECTOR_DEFAULTS
+from models.section_database import SteelSectionDatabase
+
+
+class CostModel:
+    """
+    Modelo de costo unitario configurable:
+        costo = steel_per_lb * peso del perfil + costo por perno * número de pernos
+    stud_cost permite fijar el costo instalado por diámetro {diámetro: costo};
+    los diámetros sin precio usan stud_default.
+    """
+    def __init__(self, steel_per_lb=1.50, stud_default=4.00, stud_cost=None):
+        self.steel_per_lb = steel_per_lb
+        self.stud_default = stud_default
+        self.stud_cost = dict(stud_cost or {})
+
+    def stud_unit_cost(self, diameter):
+        diameter = np.asarray(diameter, dtype=float)
+        cost = np.full(diameter.shape, self.stud_default)
+        for d, c in self.stud_cost.items():
+            cost = np.where(np.isclose(diameter, d), c, cost)
+        return cost
+
+    def cost(self, weight_lb, n_studs, diameter):
+        return self.steel_per_lb * weight_lb + self.stud_unit_cost(diameter) * n_studs
+
+
+def pareto_front(weight, studs, cost):
+    """
+    Índices del frente de Pareto de tres objetivos (mínimo peso, mínimo
+    número de pernos y mínimo costo): diseños que ningún otro iguala o mejora
+    en los tres. De los diseños idénticos en los tres se conserva uno.
+    Barrido por grupos de igual peso en orden creciente: best[k] guarda el
+    menor costo de los grupos anteriores con a lo sumo el k-ésimo número de
+    pernos distinto.
+    """
+    order = np.lexsort((cost, studs, weight))
+    w, s, c = weight[order], studs[order], cost[order]
+    levels, rank = np.unique(s, return_inverse=True)
+    best = np.full(len(levels), np.inf)
+    keep = np.zeros(len(order), dtype=bool)
+    bounds = np.flatnonzero(np.concatenate(([True], w[1:] != w[:-1], [True])))
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        g_rank, g_cost = rank[start:stop], c[start:stop]
+        # Dentro del grupo, ordenado por (pernos, costo), domina cualquier diseño anterior
+        within = np.minimum.accumulate(np.concatenate(([np.inf], g_cost[:-1])))
+        keep[start:stop] = g_cost < np.minimum(np.minimum.accumulate(best)[g_rank], within)
+        np.minimum.at(best, g_rank, g_cost)
+    return order[keep]
+
+
+class CompositeBeamOptimizer:
+    """
+    Barrido vectorizado perfil x separación de conectores x diámetro de perno
+    para una viga. Antes de expandir las combinaciones se descartan los perfiles
+    que no pueden cumplir con ningún conector: cortante (no depende de los
+    pernos) y flexión/deflexión con acción compuesta total, que acota por
+    arriba a cualquier configuración de pernos.
+    """
+    def __init__(self, inputs, cost_model=None, table=None):
+        # inputs: formato de CompositeBeamDesign sin 'beam_properties'
+        self.inputs = inputs
+        self.cost_model = cost_model or CostModel()
+        self.table = table or SteelSectionDatabase.get_table()
+
+    def _model(self, rows, spacing=None, diameter=None):
+        inputs = {k: v for k, v in self.inputs.items() if k not in ('beam_properties', 'beam_name')}
+        conn = dict(inputs.get('connector_props') or {})
+        inputs['connector_props'] = {k: conn.get(k) if conn.get(k) is not None else v
+                                     for k, v in CONNECTOR_DEFAULTS.items()}
+        if spacing is not None:
+            inputs['connector_spacing'] = spacing
+        if diameter is not None:
+            inputs['connector_props']['diameter'] = diameter
+        inputs['connector_type'] = 'Stud'
+        inputs['section_rows'] = rows
+        inputs['section_table'] = self.table
+        return BatchCompositeBeamDesign(inputs)
+
+    def prune_sections(self, rows, check_vibration=False):
+        """
+        Filas de perfiles que pueden cumplir con acción compuesta total. La
+        vibración (DG11) usa siempre acción compuesta total, por lo que se
+        decide aquí por perfil, antes de expandir los conectores.
+        """
+        model = self._model(rows)
+        loads = model.calculate_loads()
+        conn = model.calculate_connectors()
+        full = dict(conn, Sum_Qn=conn['Vh_req'], percent=np.full(model.n, 100.0))
+
+        ok = model.check_shear_strength(loads['V_u'])['ratio'] <= 1.0
+        ok &= model.check_composite_strength(loads['M_u'], full)['ratio'] <= 1.0
+        defs = model.calculate_deflections(full, loads)
+        ok &= np.maximum(defs['short']['ratio'], defs['long']['ratio']) <= 1.0
+        if check_vibration:
+            ok &= model.check_vibration(conn)['ratio'] <= 1.0
+        return rows[ok]
+
+    def run(self, labels=None, spacings=(6.0, 9.0, 12.0, 18.0, 24.0), diameters=(0.5, 0.625, 0.75),
+            check_vibration=False, gradients=False):
+        """
+        Evalúa todas las combinaciones y retorna un dict con el frente de Pareto
+        (peso, pernos, costo) de los diseños que cumplen, ordenado por peso, y el
+        conteo de combinaciones evaluadas y descartadas. Con check_vibration
+        también se exige el chequeo de caminata de DG11 (solo viga). Con
+        gradients el frente incluye 'gradients', las derivadas de sus
+        relaciones (ver BatchCompositeBeamDesign.gradients).
+        """
+        labels = list(labels) if labels is not None else self.table.labels
+        rows = self.table.rows(labels)
+        spacings = np.asarray(spacings, dtype=float)
+        diameters = np.asarray(diameters, dtype=float)
+        total = len(rows) * len(spacings) * len(diameters)
+
+        rows = self.prune_sections(rows, check_vibration)
+        n_sec, n_sp, n_d = len(rows), len(spacings), len(diameters)
+        result = {"combinations": total, "evaluated": n_sec * n_sp * n_d, "passing": 0}
+        if n_sec == 0:
+            result["front"] = {}
+            return result
+
+        # Producto cartesiano perfil x separación x diámetro
+        r = np.repeat(rows, n_sp * n_d)
+        sp = np.tile(np.repeat(spacings, n_d), n_sec)
+        dia = np.tile(diameters, n_sec * n_sp)
+
+        model = self._model(r, sp, dia)
+        res = model.run()
+        ok = np.maximum.reduce([res['ratio_flexure'], res['ratio_shear'], res['ratio_deflection']]) <= 1.0
+        result["passing"] = int(np.sum(ok))
+        if not np.any(ok):
+            result["front"] = {}
+            return result
+
+        idx = np.flatnonzero(ok)
+        weight = self.table.columns['W'][r[idx]] * model.L[idx]
+        studs = 2 * res['N_half'][idx]
+        cost = self.cost_model.cost(weight, studs, dia[idx])
+        front = idx[pareto_front(weight, studs, cost)]
+
+        W = self.table.columns['W'][r[front]] * model.L[front]
+        n_studs = 2 * res['N_half'][front]
+        result["front"] = {
+            "section": [self.table.labels[i] for i in r[front]],
+            "connector_spacing": sp[front], "diameter": dia[front],
+            "weight_lb": W, "n_studs": n_studs,
+            "cost": self.cost_model.cost(W, n_studs, dia[front]),
+            "percent": res['percent'][front],
+            "ratio_flexure": res['ratio_flexure'][front],
+            "ratio_shear": res['ratio_shear'][front],
+            "ratio_deflection": res['ratio_deflection'][front],
+        }
+        if gradients:
+            result["front"]["gradients"] = self._model(r[front], sp[front], dia[front]).run(
+                include_gradients=True)['gradients']
+        return result
+
+    @staticmethod
+    def cheapest(result):
+        """Índice del diseño de menor costo dentro del frente (None si no hay)."""
+        front = result.get("front") or {}
+        if not front:
+            return None
+        return int(np.argmin(front["cost"]))
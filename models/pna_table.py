@@ -0,0 +1,136 @@
+import numpy as np
+
+
+class PlasticMomentTable:
+    """
+    Resistencia plástica de secciones compuestas con el eje neutro plástico
+    (PNA) en cualquier posición (AISC Manual Tabla 3-19, posiciones 1 a 7).
+
+    Con C = fuerza en el concreto y Asc = (As - C/Fy)/2 el área de acero en
+    compresión (tomada desde el ala superior), el momento respecto al borde
+    superior del acero es
+        Mn = C Y2 + Fy [As d/2 - 2 g(Asc)],   g = momento estático de Asc
+    donde Y2 = hr + tc - a/2. El término entre corchetes, h(r), depende solo
+    del perfil y de r = C/(As Fy), por lo que se tabula una vez por perfil:
+    posiciones 1-5 en el ala (0, tf/4, tf/2, 3tf/4, tf), 7 donde
+    C = 0.25 As Fy, 6 a mitad de 5 y 7 en fuerza, más r = 0 (perfil solo),
+    subdividiendo cada intervalo. El alma usa un espesor equivalente que
+    reproduce el área tabulada As (incluye los filetes).
+    """
+    SUBDIVISIONS = 8
+
+    def __init__(self, columns):
+        As = np.atleast_1d(np.asarray(columns['A'], dtype=float))
+        d = np.atleast_1d(np.asarray(columns['d'], dtype=float))
+        bf = np.atleast_1d(np.asarray(columns['bf'], dtype=float))
+        tf = np.atleast_1d(np.asarray(columns['tf'], dtype=float))
+        self.As, self.d, self.bf, self.tf = As, d, bf, tf
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.tw_eff = np.maximum((As - 2 * bf * tf) / (d - 2 * tf), 1e-6)
+
+        # Posiciones de la Tabla 3-19 en términos de r = C/(As Fy)
+        r_flange = 1.0 - 2.0 * bf[:, None] * tf[:, None] * np.arange(5)[None, :] / 4.0 / As[:, None]
+        r7 = np.full(len(As), 0.25)
+        r6 = (r_flange[:, 4] + r7) / 2.0
+        knots = np.column_stack([r_flange, r6, r7, np.zeros(len(As))])
+        self.positions = knots[:, :7]
+        knots = np.sort(np.clip(knots, 0.0, 1.0), axis=1)
+
+        # Subdivisión uniforme de cada intervalo entre posiciones
+        t = np.arange(self.SUBDIVISIONS) / self.SUBDIVISIONS
+        left, right = knots[:, :-1], knots[:, 1:]
+        grid = (left[:, :, None] + (right - left)[:, :, None] * t[None, None, :]).reshape(len(As), -1)
+        self.r_grid = np.column_stack([grid, knots[:, -1]])
+        self.h_grid = self._steel_term(self.r_grid)
+        self._offset = np.arange(len(As))[:, None] * 2.0
+
+    @classmethod
+    def from_properties(cls, props):
+        """
+        Tabla de una fila para un perfil dado como dict (modelo escalar). Las
+        propiedades de una SectionGeometry traen su propia tabla ('geometry').
+        """
+        if props.get('geometry') is not None:
+            return props['geometry'].moment_table()
+        return cls({k: [props[k]] for k in ('A', 'd', 'bf', 'tf')})
+
+    def pna_depth(self, r, rows=slice(None)):
+        """Profundidad del PNA bajo el borde superior del acero (in); 0 si está en la losa."""
+        As, bf, tf, tw = self.As[rows], self.bf[rows], self.tf[rows], self.tw_eff[rows]
+        Asc = As * (1.0 - np.clip(r, 0.0, 1.0)) / 2.0
+        return np.where(Asc <= bf * tf, Asc / bf, tf + (Asc - bf * tf) / tw)
+
+    def _steel_term(self, r, rows=slice(None)):
+        # h(r) = As d/2 - 2 g(Asc)   (in³)
+        As, d, bf, tf, tw = (v[rows] for v in (self.As, self.d, self.bf, self.tf, self.tw_eff))
+        if np.ndim(r) == 2 and np.ndim(As) == 1:
+            As, d, bf, tf, tw = (v[:, None] for v in (As, d, bf, tf, tw))
+        Asc = As * (1.0 - r) / 2.0
+        y = np.where(Asc <= bf * tf, Asc / bf, tf + (Asc - bf * tf) / tw)
+        g = np.where(Asc <= bf * tf, Asc**2 / (2.0 * bf),
+                     bf * tf**2 / 2.0 + tw * (y - tf) * (tf + (y - tf) / 2.0))
+        return As * d / 2.0 - 2.0 * g
+
+    def _segment(self, rows, r):
+        # Tramo de la tabla del perfil que contiene cada r: (forma, r, r0, r1, h0, h1)
+        rows, r = np.broadcast_arrays(np.asarray(rows, dtype=np.intp), np.clip(np.asarray(r, dtype=float), 0.0, 1.0))
+        flat_rows, flat_r = rows.ravel(), r.ravel()
+        grid = (self.r_grid + self._offset).ravel()
+        K = self.r_grid.shape[1]
+        pos = np.searchsorted(grid, flat_r + self._offset[flat_rows, 0], side='right') - 1
+        i = np.clip(pos - flat_rows * K, 0, K - 2)
+        r0, r1 = self.r_grid[flat_rows, i], self.r_grid[flat_rows, i + 1]
+        h0, h1 = self.h_grid[flat_rows, i], self.h_grid[flat_rows, i + 1]
+        return rows.shape, flat_r, r0, r1, h0, h1
+
+    def steel_term(self, rows, r):
+        """h(r) interpolado en la tabla del perfil; rows y r con cualquier forma (se difunden)."""
+        shape, r, r0, r1, h0, h1 = self._segment(rows, r)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = np.where(r1 > r0, (r - r0) / (r1 - r0), 0.0)
+        return (h0 + w * (h1 - h0)).reshape(shape)
+
+    def steel_slope(self, rows, r):
+        """
+        dh/dr del valor interpolado (pendiente del tramo activo, in³). Es la
+        derivada consistente con steel_term; la exacta es As y_pna.
+        """
+        shape, r, r0, r1, h0, h1 = self._segment(rows, r)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(r1 > r0, (h1 - h0) / (r1 - r0), 0.0).reshape(shape)
+
+    def flexural_strength(self, rows, C, fy, Y_con, fc, b_eff, phi=0.9):
+        """
+        phi Mn (k-ft), a, Y2 y profundidad del PNA para una fuerza en el
+        concreto C (ya limitada a min(ΣQn, 0.85 f'c Ac, As Fy)).
+        Y_con = hr + tc (distancia del borde superior del acero al de la losa).
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        As = self.As[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a = np.where(b_eff > 0, C / (0.85 * fc * b_eff), 0.0)
+            r = np.where(As * fy > 0, C / (As * fy), 0.0)
+        Y2 = Y_con - a / 2.0
+        Mn = C * Y2 + fy * self.steel_term(rows, r)
+        return {"phi_Mn": phi * Mn / 12.0, "Mn": Mn / 12.0, "a": a, "Y2": Y2, "r": r,
+                "y_pna": self.pna_depth(r, rows)}
+
+    def required_force(self, rows, M, fy, Y_con, fc, b_eff, C_max, phi=0.9, iterations=40):
+        """
+        Fuerza en el concreto C necesaria para phi Mn = M (k-ft), por bisección
+        vectorizada (phi Mn crece con C). Retorna inf donde ni C_max alcanza y 0
+        donde el perfil solo basta (M <= phi Mn con C = 0).
+        """
+        rows, M, fy, Y_con, fc, b_eff, C_max = np.broadcast_arrays(
+            np.asarray(rows, dtype=np.intp), *(np.asarray(v, dtype=float) for v in (M, fy, Y_con, fc, b_eff, C_max)))
+        cap = lambda C: self.flexural_strength(rows, C, fy, Y_con, fc, b_eff, phi)['phi_Mn']
+        lo = np.zeros(M.shape)
+        hi = C_max.astype(float).copy()
+        for _ in range(iterations):
+            mid = (lo + hi) / 2.0
+            ok = cap(mid) >= M
+            hi = np.where(ok, mid, hi)
+            lo = np.where(ok, lo, mid)
+        C = np.where(cap(lo) >= M, lo, hi)
+        C = np.where(cap(C_max) >= M, C, np.inf)
+        return np.where(M > 0, C, 0.0)
@@ -1,11 +1,20 @@
 import csv
+import hashlib
+import json
 import os
+from models.section_index import SectionIndex
+from models.section_table import SectionTable
 
 class SteelSectionDatabase:
     """
-    Maneja la carga de la base de datos de perfiles W del AISC desde un archivo CSV.
+    Maneja la carga de la base de datos de perfiles W y C del AISC desde archivos CSV.
     """
     _sections = {}
+    _channels = {}
+    _index = None
+    _table = None
+    _fingerprints = {}
+    _channel_fingerprints = {}
 
     @staticmethod
     def get_sections(csv_filename="w_sections.csv"):
@@ -17,6 +26,76 @@ class SteelSectionDatabase:
         if SteelSectionDatabase._sections:
             return SteelSectionDatabase._sections
 
+        csv_path = SteelSectionDatabase._locate_csv(csv_filename)
+        if csv_path is None:
+            return {
+                "W18X35": {"d": 17.7, "tw": 0.3, "bf": 6.0, "tf": 0.425, "A": 10.3, "Ix": 510, "Zx": 66.5, "W": 35.0,
+                           "h_tw": 53.5, "Sx": 57.6, "ry": 1.22, "J": 0.506, "Cw": 1140}
+            }
+
+        current_sections = SteelSectionDatabase._read_shapes(csv_path, 'W', SteelSectionDatabase._parse_w_row)
+        if current_sections is None:
+            return {}
+        SteelSectionDatabase._sections = current_sections
+        return current_sections
+
+    @staticmethod
+    def get_channels(csv_filename="c_sections.csv"):
+        """
+        Lee el archivo CSV de perfiles C (canales) y retorna un diccionario con
+        sus propiedades. Se carga una sola vez, igual que la tabla W.
+        """
+        if SteelSectionDatabase._channels:
+            return SteelSectionDatabase._channels
+
+        csv_path = SteelSectionDatabase._locate_csv(csv_filename)
+        if csv_path is None:
+            return {}
+
+        channels = SteelSectionDatabase._read_shapes(csv_path, 'C', SteelSectionDatabase._parse_c_row)
+        if channels is None:
+            return {}
+        SteelSectionDatabase._channels = channels
+        return channels
+
+    @staticmethod
+    def _parse_w_row(row):
+        # Mapeo de columnas del CSV AISC estándar a las propiedades internas
+        return {
+            "A": float(row['A']),   # Area
+            "d": float(row['d']),   # Depth
+            "tw": float(row['tw']), # Web thickness
+            "bf": float(row['bf']), # Flange width
+            "tf": float(row['tf']), # Flange thickness
+            "Ix": float(row['Ix']), # Moment of Inertia (x-axis)
+            "Zx": float(row['Zx']), # Plastic Modulus (x-axis)
+            "W": float(row['W']),   # Nominal weight (lb/ft)
+            "h_tw": float(row['h/tw']), # Web slenderness (shear, G2.1)
+            "Sx": float(row['Sx']), # Elastic Modulus (x-axis)
+            "ry": float(row['ry']), # Radius of gyration (y-axis)
+            "J": float(row['J']),   # Torsional constant
+            "Cw": float(row['Cw']), # Warping constant
+            "rts": float(row['rts']), # Effective radius of gyration (LTB, F2)
+            "ho": float(row['ho'])  # Distance between flange centroids
+        }
+
+    @staticmethod
+    def _parse_c_row(row):
+        # Propiedades necesarias para conectores tipo canal (AISC I8.2b)
+        return {
+            "A": float(row['A']),   # Area
+            "d": float(row['d']),   # Depth
+            "bf": float(row['bf']), # Flange width
+            "tf": float(row['tf']), # Flange thickness (promedio)
+            "tw": float(row['tw']), # Web thickness
+            "W": float(row['W'])    # Nominal weight (lb/ft)
+        }
+
+    @staticmethod
+    def _locate_csv(csv_filename):
+        """
+        Resuelve la ruta del CSV dentro de 'assets'. Retorna None si no existe.
+        """
         # --- SOLUCIÓN ROBUSTA PARA RUTAS (WINDOWS/LINUX/MAC) ---
         # 1. Ruta absoluta de ESTE archivo script (models/section_database.py)
         current_file_path = os.path.abspath(__file__)
@@ -44,27 +123,39 @@ class SteelSectionDatabase:
                  csv_path = fallback_path
             else:
                 print("Error Crítico: No se pudo localizar el archivo CSV.")
-                return {
-                    "W18X35": {"d": 17.7, "tw": 0.3, "bf": 6.0, "tf": 0.425, "A": 10.3, "Ix": 510, "Zx": 66.5}
-                }
+                return None
+        return csv_path
 
+    @staticmethod
+    def _read_shapes(csv_path, shape_type, parse_row):
+        """
+        Lee las filas del tipo de perfil indicado y retorna {etiqueta: props}.
+        Si el encabezado repite nombres de columna (c_sections.csv trae las
+        columnas imperiales seguidas de las métricas) se usa la primera aparición.
+        Retorna None si no se pudo leer con ningún encoding.
+        """
         # --- MANEJO DE ENCODING INTELIGENTE ---
         # Probamos varios encodings comunes porque Excel en Windows suele usar cp1252
         encodings_to_try = ['utf-8-sig', 'cp1252', 'latin-1']
         
         for encoding in encodings_to_try:
             try:
-                current_sections = {}
+                shapes = {}
                 print(f"DEBUG: Intentando leer con encoding: {encoding}")
                 
                 with open(csv_path, mode='r', encoding=encoding) as f:
-                    reader = csv.DictReader(f)
+                    reader = csv.reader(f)
+                    header = next(reader)
+                    first_col = {}
+                    for i, name in enumerate(header):
+                        first_col.setdefault(name, i)
                     
-                    for row in reader:
-                        # Validar que sea un perfil W
-                        type_val = row.get('Type', 'W')
+                    for values in reader:
+                        row = {name: values[i] for name, i in first_col.items() if i < len(values)}
+                        # Validar el tipo de perfil
+                        type_val = row.get('Type', shape_type)
                         # Algunos CSVs pueden tener espacios o mayúsculas diferentes
-                        if type_val and type_val.strip().upper() != 'W':
+                        if type_val and type_val.strip().upper() != shape_type:
                             continue
                         
                         label = row.get('AISC_Manual_Label')
@@ -72,25 +163,14 @@ class SteelSectionDatabase:
                             continue
 
                         try:
-                            # Mapeo de columnas del CSV AISC estándar a las propiedades internas
-                            props = {
-                                "A": float(row['A']),   # Area
-                                "d": float(row['d']),   # Depth
-                                "tw": float(row['tw']), # Web thickness
-                                "bf": float(row['bf']), # Flange width
-                                "tf": float(row['tf']), # Flange thickness
-                                "Ix": float(row['Ix']), # Moment of Inertia (x-axis)
-                                "Zx": float(row['Zx'])  # Plastic Modulus (x-axis)
-                            }
-                            current_sections[label] = props
+                            shapes[label] = parse_row(row)
                         except (ValueError, KeyError):
                             # Si alguna celda está vacía o dañada, saltar fila
                             continue
                 
                 # Si llegamos aquí, la lectura fue exitosa
-                SteelSectionDatabase._sections = current_sections
-                print(f"Éxito: {len(current_sections)} perfiles cargados usando {encoding}.")
-                return current_sections
+                print(f"Éxito: {len(shapes)} perfiles cargados usando {encoding}.")
+                return shapes
 
             except UnicodeDecodeError:
                 print(f"Advertencia: Falló encoding {encoding}, intentando siguiente...")
@@ -101,4 +181,73 @@ class SteelSectionDatabase:
                 continue
 
         print("Error Crítico: No se pudo leer el archivo con ningún encoding estándar.")
-        return {}
\ No newline at end of file
+        return None
+
+    @staticmethod
+    def get_table():
+        """
+        Retorna la tabla columnar (SectionTable) con las propiedades y sus
+        derivadas precalculadas como arrays contiguos. Se construye una sola vez.
+        """
+        if SteelSectionDatabase._table is None:
+            SteelSectionDatabase._table = SectionTable(SteelSectionDatabase.get_sections())
+        return SteelSectionDatabase._table
+
+    @staticmethod
+    def get_fingerprints():
+        """
+        Huella (SHA-1) de la fila de cada perfil W: cambia solo si cambia
+        alguna propiedad de ese perfil en el CSV. Se calcula una sola vez.
+        """
+        if not SteelSectionDatabase._fingerprints:
+            SteelSectionDatabase._fingerprints = SteelSectionDatabase._hash_shapes(SteelSectionDatabase.get_sections())
+        return SteelSectionDatabase._fingerprints
+
+    @staticmethod
+    def get_channel_fingerprints():
+        """Huella (SHA-1) de la fila de cada perfil C, igual que get_fingerprints."""
+        if not SteelSectionDatabase._channel_fingerprints:
+            SteelSectionDatabase._channel_fingerprints = SteelSectionDatabase._hash_shapes(
+                SteelSectionDatabase.get_channels())
+        return SteelSectionDatabase._channel_fingerprints
+
+    @staticmethod
+    def _hash_shapes(shapes):
+        return {label: hashlib.sha1(json.dumps(props, sort_keys=True).encode("utf-8")).hexdigest()
+                for label, props in shapes.items()}
+
+    @staticmethod
+    def get_index():
+        """
+        Retorna el índice de consulta (SectionIndex) sobre la tabla cargada.
+        Se construye una sola vez junto con la tabla.
+        """
+        if SteelSectionDatabase._index is None:
+            SteelSectionDatabase._index = SectionIndex(SteelSectionDatabase.get_sections())
+        return SteelSectionDatabase._index
+
+    @staticmethod
+    def get_depth_families():
+        """
+        Retorna las familias de peralte nominal (ej. 'W18') ordenadas por peralte.
+        """
+        families = []
+        for label in SteelSectionDatabase.get_index().labels:
+            family = label.split('X')[0]
+            if family not in families:
+                families.append(family)
+        return families
+
+    @staticmethod
+    def filter_sections(family=None, weight_min=None, weight_max=None):
+        """
+        Retorna las etiquetas de perfiles que pertenecen a la familia de peralte
+        indicada y/o cuyo peso (lb/ft) está dentro del rango, ordenadas por peso.
+        """
+        ranges = {}
+        if weight_min is not None or weight_max is not None:
+            ranges['W'] = (weight_min, weight_max)
+        prefix = f"{family}X" if family else None
+        labels = SteelSectionDatabase.get_index().query(prefix=prefix, **ranges)
+        sections = SteelSectionDatabase.get_sections()
+        return sorted(labels, key=lambda l: sections[l].get('W', 0.0))
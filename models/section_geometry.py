@@ -0,0 +1,285 @@
+import hashlib
+import numpy as np
+from models.pna_table import PlasticMomentTable
+
+STEEL_LB_PER_IN2_FT = 490.0 / 144.0   # Peso del acero por pie y por in² de área (lb/ft)
+
+
+def rectangle(b, h, x0=0.0, y0=0.0):
+    """Vértices (4, 2) antihorarios de un rectángulo b x h con esquina inferior izquierda en (x0, y0)."""
+    return np.array([[x0, y0], [x0 + b, y0], [x0 + b, y0 + h], [x0, y0 + h]], dtype=float)
+
+
+def trapezoid(b_bottom, b_top, h, y0=0.0):
+    """Vértices de un trapecio simétrico respecto de x = 0 (p. ej. un acartelamiento)."""
+    return np.array([[-b_bottom / 2, y0], [b_bottom / 2, y0], [b_top / 2, y0 + h], [-b_top / 2, y0 + h]],
+                    dtype=float)
+
+
+def _flange_torsion(b, t):
+    return b * t**3 / 3.0
+
+
+def plate_girder(d, tw, bf, tf, bf_bottom=None, tf_bottom=None):
+    """
+    Perfil soldado de alas desiguales (d altura total; alas inferiores iguales
+    a la superior si no se indican). J = Σ b t³/3 y Cw de AISC Comentario F4
+    para secciones monosimétricas.
+    """
+    bf_bottom = bf if bf_bottom is None else bf_bottom
+    tf_bottom = tf if tf_bottom is None else tf_bottom
+    h = d - tf - tf_bottom
+    parts = [(rectangle(bf_bottom, tf_bottom, -bf_bottom / 2.0, 0.0), 1.0),
+             (rectangle(tw, h, -tw / 2.0, tf_bottom), 1.0),
+             (rectangle(bf, tf, -bf / 2.0, d - tf), 1.0)]
+    ho = d - (tf + tf_bottom) / 2.0
+    Iyc, Iyt = tf * bf**3 / 12.0, tf_bottom * bf_bottom**3 / 12.0
+    meta = {"tw": tw, "bf": bf, "tf": tf, "h": h, "ho": ho,
+            "J": _flange_torsion(bf, tf) + _flange_torsion(bf_bottom, tf_bottom) + _flange_torsion(h, tw),
+            "Cw": ho**2 * Iyc * Iyt / (Iyc + Iyt)}
+    return SectionGeometry(parts, meta)
+
+
+def cover_plated(props, plate_width, plate_thickness, top=False, bottom=True):
+    """
+    Perfil W (props de SteelSectionDatabase) con cubreplacas soldadas. El
+    alma usa el espesor equivalente que reproduce el área tabulada (como
+    PlasticMomentTable), de modo que A incluye los filetes.
+    """
+    d, bf, tf = props['d'], props['bf'], props['tf']
+    tw_eff = (props['A'] - 2.0 * bf * tf) / (d - 2.0 * tf)
+    y0 = plate_thickness if bottom else 0.0
+    parts = [(rectangle(bf, tf, -bf / 2.0, y0), 1.0),
+             (rectangle(tw_eff, d - 2.0 * tf, -tw_eff / 2.0, y0 + tf), 1.0),
+             (rectangle(bf, tf, -bf / 2.0, y0 + d - tf), 1.0)]
+    if bottom:
+        parts.append((rectangle(plate_width, plate_thickness, -plate_width / 2.0, 0.0), 1.0))
+    if top:
+        parts.append((rectangle(plate_width, plate_thickness, -plate_width / 2.0, y0 + d), 1.0))
+    n_plates = int(top) + int(bottom)
+    meta = {"tw": props['tw'], "bf": plate_width if top else bf, "tf": tf + (plate_thickness if top else 0.0),
+            "h": d - 2.0 * tf, "ho": props.get('ho', d - tf) + n_plates * plate_thickness / 2.0,
+            "J": props.get('J', 0.0) + n_plates * _flange_torsion(plate_width, plate_thickness)}
+    return SectionGeometry(parts, meta)
+
+
+class SectionGeometry:
+    """
+    Propiedades de secciones armadas a partir de polígonos con relación de
+    material (E/E_acero; 1/n para concreto transformado, negativa para huecos).
+    Perfiles soldados, W con cubreplacas y losas acarteladas se describen
+    como listas de partes (vértices (k, 2), relación) con y hacia arriba.
+
+    Las propiedades elásticas salen de las fórmulas de shoelace evaluadas
+    sobre todas las aristas de todas las partes a la vez. Las plásticas
+    usan el perfil de anchos b(y), lineal entre niveles de vértices, sobre
+    el que el área y el momento estático acumulados desde arriba son exactos.
+    Los resultados se guardan por hash de la geometría en _cache.
+    """
+    _cache = {}
+    PROFILE_SUBDIVISIONS = 16
+
+    def __init__(self, parts, meta=None):
+        self.parts = [(np.asarray(v, dtype=float), float(ratio)) for v, ratio in parts]
+        self.meta = dict(meta or {})
+        vertices = np.concatenate([v for v, _ in self.parts])
+        self.y_bottom, self.y_top = float(vertices[:, 1].min()), float(vertices[:, 1].max())
+        self.key = self.geometry_key(self.parts)
+
+    @staticmethod
+    def geometry_key(parts):
+        """Hash de vértices (redondeados a 1e-9 in) y relaciones de material."""
+        h = hashlib.sha1()
+        for v, ratio in parts:
+            h.update(np.round(np.asarray(v, dtype=float), 9).tobytes())
+            h.update(np.float64(ratio).tobytes())
+        return h.hexdigest()
+
+    def _cached(self, name, compute):
+        entry = SectionGeometry._cache.setdefault(self.key, {})
+        if name not in entry:
+            entry[name] = compute()
+        return entry[name]
+
+    def _edges(self):
+        # Aristas (xi, yi) -> (xj, yj) de todas las partes y su peso (relación x orientación)
+        xi, yi, xj, yj, w = [], [], [], [], []
+        for v, ratio in self.parts:
+            nxt = np.roll(v, -1, axis=0)
+            orientation = np.sign(np.sum(v[:, 0] * nxt[:, 1] - nxt[:, 0] * v[:, 1]))
+            xi.append(v[:, 0]); yi.append(v[:, 1]); xj.append(nxt[:, 0]); yj.append(nxt[:, 1])
+            w.append(np.full(len(v), ratio * orientation))
+        return [np.concatenate(a) for a in (xi, yi, xj, yj, w)]
+
+    # --- Propiedades elásticas (shoelace) ---
+    def properties(self):
+        """A, centroide, Ix, Iy y módulos elásticos de la sección transformada (in, in², in⁴)."""
+        return self._cached("elastic", self._elastic)
+
+    def _elastic(self):
+        xi, yi, xj, yj, w = self._edges()
+        cross = (xi * yj - xj * yi) * w
+        A = np.sum(cross) / 2.0
+        Qx = np.sum((yi + yj) * cross) / 6.0
+        Qy = np.sum((xi + xj) * cross) / 6.0
+        Ixx = np.sum((yi**2 + yi * yj + yj**2) * cross) / 12.0
+        Iyy = np.sum((xi**2 + xi * xj + xj**2) * cross) / 12.0
+        y_bar, x_bar = Qx / A, Qy / A
+        Ix, Iy = Ixx - A * y_bar**2, Iyy - A * x_bar**2
+        return {"A": A, "x_bar": x_bar, "y_bar": y_bar, "Ix": Ix, "Iy": Iy,
+                "S_top": Ix / (self.y_top - y_bar), "S_bottom": Ix / (y_bar - self.y_bottom)}
+
+    # --- Perfil de anchos y propiedades plásticas ---
+    def width_profile(self):
+        """
+        Niveles z (profundidad desde el borde superior) y anchos ponderados
+        b(z) en cada extremo de las franjas entre vértices: arrays (K, 2).
+        """
+        return self._cached("profile", self._width_profile)
+
+    def _width_profile(self):
+        xi, yi, xj, yj, w = self._edges()
+        levels = np.unique(np.concatenate([yi, yj]))
+        y0, y1 = levels[:-1], levels[1:]
+        # b(y) es lineal dentro de cada franja: se evalúa en dos puntos interiores y se extrapola
+        probes = np.stack([y0 + (y1 - y0) / 3.0, y0 + 2.0 * (y1 - y0) / 3.0])[..., None]   # (2, K, 1)
+        dy = yj - yi
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (probes - yi) / dy
+            crosses = (dy != 0) & (t >= 0) & (t < 1)
+            x_cut = xi + t * (xj - xi)
+            # Aristas que suben quedan a la derecha en polígonos antihorarios
+            b = np.sum(np.where(crosses, np.sign(dy) * w * x_cut, 0.0), axis=-1)   # (2, K)
+        slope = (b[1] - b[0]) * 3.0
+        b_y0, b_y1 = b[0] - slope / 3.0, b[1] + slope / 3.0
+        # Profundidades desde arriba (franjas de arriba hacia abajo)
+        z = np.column_stack([self.y_top - y1, self.y_top - y0])[::-1]
+        widths = np.column_stack([b_y1, b_y0])[::-1]
+        return z, widths
+
+    def _cumulative(self, depths):
+        """Área y momento estático respecto del borde superior acumulados hasta cada profundidad."""
+        z, b = self.width_profile()
+        z0, z1 = z[:, 0], z[:, 1]
+        h = z1 - z0
+        slope = np.where(h > 0, (b[:, 1] - b[:, 0]) / np.where(h > 0, h, 1.0), 0.0)
+        A_band = (b[:, 0] + b[:, 1]) / 2.0 * h
+        G_band = h / 6.0 * (b[:, 0] * (2 * z0 + z1) + b[:, 1] * (z0 + 2 * z1))
+        A_start = np.concatenate([[0.0], np.cumsum(A_band)[:-1]])
+        G_start = np.concatenate([[0.0], np.cumsum(G_band)[:-1]])
+
+        depths = np.asarray(depths, dtype=float)
+        k = np.clip(np.searchsorted(z0, depths, side='right') - 1, 0, len(z0) - 1)
+        s = np.clip(depths - z0[k], 0.0, h[k])
+        b0, m = b[k, 0], slope[k]
+        A = A_start[k] + b0 * s + m * s**2 / 2.0
+        G = G_start[k] + b0 * (z0[k] * s + s**2 / 2.0) + m * (z0[k] * s**2 / 2.0 + s**3 / 3.0)
+        return A, G
+
+    def plastic(self):
+        """
+        Eje neutro plástico del perfil solo (profundidad desde el borde
+        superior) y módulo plástico Zx = Σ|y - y_pna| dA.
+        """
+        return self._cached("plastic", self._plastic)
+
+    def _plastic(self):
+        table = self.moment_table()
+        z_pna = float(table.pna_depth(0.0))
+        A = self.properties()['A']
+        depth_c = self.y_top - self.properties()['y_bar']
+        _, G = self._cumulative(z_pna)
+        return {"z_pna": z_pna, "y_pna": self.y_top - z_pna, "Zx": float(A * depth_c - 2.0 * G)}
+
+    def moment_table(self):
+        """PlasticMomentTable equivalente de una fila para el motor compuesto (ver GeometryMomentTable)."""
+        return self._cached("moment_table", lambda: GeometryMomentTable(self))
+
+    # --- Sección compuesta y propiedades de perfil ---
+    def with_parts(self, parts):
+        """Nueva geometría con partes adicionales (p. ej. losa transformada)."""
+        return SectionGeometry(self.parts + list(parts), self.meta)
+
+    def transformed(self, b_eff, tc, hr, n, wr=0.0, parallel=False, haunch=None):
+        """
+        Sección transformada con la losa de ancho b_eff sobre el deck (relación
+        1/n), los nervios si el deck es paralelo (wr/12 del ancho, como en
+        calculate_transformed_section) y un acartelamiento opcional
+        haunch = (ancho inferior, ancho superior, altura) bajo el deck.
+        """
+        top = self.y_top
+        parts = []
+        if haunch is not None:
+            b_bottom, b_top, h_haunch = haunch
+            parts.append((trapezoid(b_bottom, b_top, h_haunch, top), 1.0 / n))
+            top += h_haunch
+        parts.append((rectangle(b_eff, tc, -b_eff / 2.0, top + hr), 1.0 / n))
+        if parallel:
+            b_ribs = b_eff * wr / 12.0
+            parts.append((rectangle(b_ribs, hr, -b_ribs / 2.0, top), 1.0 / n))
+        return self.with_parts(parts)
+
+    def beam_properties(self):
+        """
+        Propiedades en el formato de SteelSectionDatabase (A, d, tw, bf, tf,
+        Ix, Zx, Sx, ry, W, h_tw y las de la etapa constructiva) para usar la
+        geometría como 'beam_properties' de CompositeBeamDesign. bf y tf son
+        los del ala superior; sin metadatos del constructor se estiman del
+        perfil de anchos. 'geometry' lleva la geometría para que la resistencia
+        plástica use su propio perfil (ver PlasticMomentTable.from_properties).
+        """
+        return self._cached("beam_properties", self._beam_properties)
+
+    def _beam_properties(self):
+        p = self.properties()
+        d = self.y_top - self.y_bottom
+        z, b = self.width_profile()
+        meta = dict(self.meta)
+        meta.setdefault("bf", float(np.max(b)))
+        mid = np.clip(np.searchsorted(z[:, 0], d / 2.0, side='right') - 1, 0, len(z) - 1)
+        meta.setdefault("tw", float(np.mean(b[mid])))
+        meta.setdefault("tf", float(max((p['A'] - meta['tw'] * d) / (2.0 * (meta['bf'] - meta['tw'])), 0.0)))
+        meta.setdefault("h", d - 2.0 * meta['tf'])
+        meta.setdefault("ho", d - meta['tf'])
+        meta.setdefault("J", 0.0)
+        meta.setdefault("Cw", p['Iy'] * meta['ho']**2 / 4.0)
+        Sx = min(p['S_top'], p['S_bottom'])
+        props = {
+            "A": p['A'], "d": d, "tw": meta['tw'], "bf": meta['bf'], "tf": meta['tf'],
+            "Ix": p['Ix'], "Iy": p['Iy'], "Sx": Sx, "Zx": self.plastic()['Zx'],
+            "ry": float(np.sqrt(p['Iy'] / p['A'])), "W": p['A'] * STEEL_LB_PER_IN2_FT,
+            "h_tw": meta['h'] / meta['tw'], "ho": meta['ho'], "J": meta['J'], "Cw": meta['Cw'],
+            "rts": float(np.sqrt(np.sqrt(p['Iy'] * meta['Cw']) / Sx)), "geometry": self,
+        }
+        return props
+
+
+class GeometryMomentTable(PlasticMomentTable):
+    """
+    PlasticMomentTable de una sola fila construida desde el perfil de anchos
+    de una SectionGeometry: h(r) = As d/2 - 2 g(Asc) con g exacto sobre una
+    grilla fina de profundidades (PROFILE_SUBDIVISIONS por franja). Sirve
+    para secciones no simétricas, donde la tabla de perfiles W no aplica.
+    """
+    def __init__(self, geometry):
+        z, _ = geometry.width_profile()
+        As = geometry.properties()['A']
+        d = geometry.y_top - geometry.y_bottom
+        t = np.arange(geometry.PROFILE_SUBDIVISIONS) / geometry.PROFILE_SUBDIVISIONS
+        depths = np.append((z[:, :1] + (z[:, 1:] - z[:, :1]) * t[None, :]).ravel(), z[-1, 1])
+        A_top, G = geometry._cumulative(depths)
+
+        # Solo la mitad superior del área puede estar en compresión (r >= 0)
+        r = 1.0 - 2.0 * A_top / As
+        keep = r >= 0
+        z_half = np.interp(0.0, -r, depths)
+        _, G_half = geometry._cumulative(z_half)
+        self.z_grid = np.append(depths[keep], z_half)[::-1]
+        self.r_grid = np.append(r[keep], 0.0)[::-1][None, :]
+        self.h_grid = (As * d / 2.0 - 2.0 * np.append(G[keep], G_half)[::-1])[None, :]
+        self.As, self.d = np.array([As]), np.array([d])
+        self._offset = np.zeros((1, 1))
+
+    def pna_depth(self, r, rows=slice(None)):
+        """Profundidad del PNA bajo el borde superior del acero (in); 0 si está en la losa."""
+        return np.interp(np.clip(r, 0.0, 1.0), self.r_grid[0], self.z_grid)
@@ -0,0 +1,114 @@
+import bisect
+import re
+
+# Propiedades indexadas (arrays ordenados + bisect)
+INDEXED_FIELDS = ("d", "W", "Ix", "Zx", "bf")
+
+# Filtros de texto del tipo "d>=16", "Ix<900" o "d=16..21"
+_FILTER_RE = re.compile(r"^(?P<field>[A-Za-z]+)\s*(?P<op><=|>=|<|>|=)\s*(?P<lo>\d+(?:\.\d+)?)(?:\.\.(?P<hi>\d+(?:\.\d+)?))?$")
+
+
+class SectionIndex:
+    """
+    Índice de consulta sobre la tabla de perfiles.
+    Mantiene, para cada propiedad de INDEXED_FIELDS, los valores ordenados y
+    la permutación de filas correspondiente, de modo que las consultas de rango
+    y umbral se resuelven con bisect. Las etiquetas tienen un índice de prefijo
+    (lista ordenada en mayúsculas) para la búsqueda mientras se escribe.
+    """
+    def __init__(self, sections):
+        # Orden de presentación: peralte nominal y luego peso
+        self.labels = sorted(sections, key=lambda l: (self._nominal_depth(l), sections[l].get('W', 0.0), l))
+        self.rows = [sections[l] for l in self.labels]
+
+        self._sorted_values = {}
+        self._sorted_rows = {}
+        for field in INDEXED_FIELDS:
+            order = sorted(range(len(self.rows)), key=lambda i: self.rows[i].get(field, 0.0))
+            self._sorted_rows[field] = order
+            self._sorted_values[field] = [self.rows[i].get(field, 0.0) for i in order]
+
+        prefix_order = sorted(range(len(self.labels)), key=lambda i: self.labels[i].upper())
+        self._prefix_keys = [self.labels[i].upper() for i in prefix_order]
+        self._prefix_rows = prefix_order
+
+    @staticmethod
+    def _nominal_depth(label):
+        try:
+            return float(label.split('X')[0][1:])
+        except ValueError:
+            return 0.0
+
+    def _range_rows(self, field, lo=None, hi=None):
+        """Filas (en orden del índice) con lo <= valor <= hi."""
+        values = self._sorted_values[field]
+        start = 0 if lo is None else bisect.bisect_left(values, lo)
+        stop = len(values) if hi is None else bisect.bisect_right(values, hi)
+        return self._sorted_rows[field][start:stop]
+
+    def _prefix_rows_for(self, prefix):
+        key = prefix.upper()
+        start = bisect.bisect_left(self._prefix_keys, key)
+        stop = bisect.bisect_left(self._prefix_keys, key + "\uffff")
+        return self._prefix_rows[start:stop]
+
+    def prefix(self, text):
+        """Etiquetas que comienzan con el texto dado, en orden de presentación."""
+        return [self.labels[i] for i in sorted(self._prefix_rows_for(text))]
+
+    def query(self, prefix=None, **ranges):
+        """
+        Consulta combinada. Cada rango se indica como campo=(mín, máx), con
+        None para un extremo abierto. Ejemplo:
+            index.query(d=(16, 21), Ix=(800, None))
+        Se parte del criterio más selectivo (resuelto con bisect) y los
+        restantes se verifican directamente sobre esas filas.
+        """
+        candidates = []
+        if prefix:
+            candidates.append(self._prefix_rows_for(prefix))
+        for field, (lo, hi) in ranges.items():
+            if field not in self._sorted_values:
+                raise KeyError(f"Propiedad no indexada: {field}")
+            candidates.append(self._range_rows(field, lo, hi))
+
+        if not candidates:
+            return list(self.labels)
+
+        candidates.sort(key=len)
+        rows = candidates[0]
+        for other in candidates[1:]:
+            if not rows:
+                break
+            allowed = set(other)
+            rows = [i for i in rows if i in allowed]
+        return [self.labels[i] for i in sorted(rows)]
+
+    def search(self, text):
+        """
+        Búsqueda libre para el selector: admite filtros separados por comas o
+        espacios ("d>=16, Ix>=800", "W=30..50") y trata el resto como prefijo
+        de etiqueta. Los límites son siempre inclusivos.
+        """
+        prefix = None
+        ranges = {}
+        fields = {f.upper(): f for f in INDEXED_FIELDS}
+        for token in re.split(r"[,\s]+", text.strip()):
+            if not token:
+                continue
+            match = _FILTER_RE.match(token)
+            field = fields.get(match.group('field').upper()) if match else None
+            if field is None:
+                prefix = token
+                continue
+            lo_cur, hi_cur = ranges.get(field, (None, None))
+            value = float(match.group('lo'))
+            op = match.group('op')
+            if op == '=':
+                hi = float(match.group('hi')) if match.group('hi') else value
+                ranges[field] = (value, hi)
+            elif op in ('>=', '>'):
+                ranges[field] = (value, hi_cur)
+            else:
+                ranges[field] = (lo_cur, value)
+        return self.query(prefix=prefix, **ranges)
@@ -0,0 +1,89 @@
+import numpy as np
+from models.pna_table import PlasticMomentTable
+
+ES_KSI = 29000.0
+
+# Columnas almacenadas como arrays contiguos (una fila por perfil)
+TABLE_FIELDS = ("A", "d", "tw", "bf", "tf", "Ix", "Zx", "W", "h_tw", "Sx", "ry", "J", "Cw", "rts", "ho")
+
+
+def shear_coefficients(h_tw, fy, Es=ES_KSI):
+    """
+    Coeficientes de cortante para almas de perfiles I laminados (AISC 360-16 G2.1).
+    Acepta escalares o arrays; retorna (phi_v, Cv1).
+      (a) h/tw <= 2.24*sqrt(E/Fy): phi_v = 1.00, Cv1 = 1.0
+      (b) en otro caso phi_v = 0.90 y, con kv = 5.34 (sin rigidizadores):
+          h/tw <= 1.10*sqrt(kv*E/Fy) -> Cv1 = 1.0   (Eq. G2-3)
+          h/tw >  1.10*sqrt(kv*E/Fy) -> Cv1 = 1.10*sqrt(kv*E/Fy)/(h/tw)   (Eq. G2-4)
+    """
+    h_tw = np.asarray(h_tw, dtype=float)
+    root = np.sqrt(Es / np.asarray(fy, dtype=float))
+    compact = h_tw <= 2.24 * root
+    limit_g23 = 1.10 * np.sqrt(5.34) * root
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Cv1 = np.where(compact | (h_tw <= limit_g23), 1.0, limit_g23 / h_tw)
+    phi_v = np.where(compact, 1.0, 0.9)
+    return phi_v, Cv1
+
+
+class SectionTable:
+    """
+    Tabla columnar de perfiles W con propiedades derivadas precalculadas.
+    Cada propiedad es un array contiguo de float64 indexado por fila; las
+    cantidades independientes de Fy (Aw, 0.6*Aw, etc.) se calculan una sola
+    vez al cargar y los coeficientes de cortante se guardan por valor de Fy.
+    """
+    def __init__(self, sections):
+        self.labels = list(sections)
+        self.row_of = {label: i for i, label in enumerate(self.labels)}
+        self.columns = {
+            k: np.ascontiguousarray([sections[l].get(k, np.nan) for l in self.labels], dtype=float)
+            for k in TABLE_FIELDS
+        }
+
+        # Derivadas independientes de Fy
+        self.columns['Aw'] = self.columns['d'] * self.columns['tw']    # Área de alma (G2.1)
+        self.columns['Vn_per_fy'] = 0.6 * self.columns['Aw']             # Vn = 0.6*Fy*Aw*Cv1
+        self._shear_cache = {}
+        self._moment_table = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def rows(self, labels):
+        """Índices de fila para una lista de etiquetas."""
+        return np.array([self.row_of[l] for l in labels], dtype=np.intp)
+
+    def gather(self, rows, fields=None):
+        """Propiedades de las filas indicadas como dict de arrays."""
+        fields = fields or self.columns.keys()
+        return {k: self.columns[k][rows] for k in fields}
+
+    def shear_coefficients(self, fy):
+        """(phi_v, Cv1) por perfil para un Fy dado; se calcula una vez por valor de Fy."""
+        key = float(fy)
+        if key not in self._shear_cache:
+            self._shear_cache[key] = shear_coefficients(self.columns['h_tw'], key)
+        return self._shear_cache[key]
+
+    def plastic_moment_table(self):
+        """Tabla de Mn vs ΣQn (PNA, Tabla 3-19) de todos los perfiles; se construye una vez."""
+        if self._moment_table is None:
+            self._moment_table = PlasticMomentTable(self.columns)
+        return self._moment_table
+
+    def shear_strength(self, rows, fy):
+        """
+        phi_v*Vn, phi_v y Cv1 para las filas indicadas, con Fy escalar o por fila.
+        Las combinaciones perfil/Fy se leen de la caché, sin recalcular la clasificación.
+        """
+        fy = np.broadcast_to(np.asarray(fy, dtype=float), np.shape(rows))
+        phi_v = np.empty(fy.shape)
+        Cv1 = np.empty(fy.shape)
+        for value in np.unique(fy):
+            mask = fy == value
+            phi_all, cv_all = self.shear_coefficients(value)
+            phi_v[mask] = phi_all[rows[mask]]
+            Cv1[mask] = cv_all[rows[mask]]
+        PhiVn = phi_v * self.columns['Vn_per_fy'][rows] * fy * Cv1
+        return PhiVn, phi_v, Cv1
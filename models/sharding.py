@@ -0,0 +1,205 @@
+"""
+Reparto determinista de barridos grandes en N fragmentos (shards)
+independientes y fusión de sus resultados parciales.
+
+Uso:
+    python -m models.sharding job   trabajo.json --chunk-size 65536 < spec.json
+    python -m models.sharding run   trabajo.json --shard 0 --shards 4 --out parte_0
+    python -m models.sharding merge trabajo.json parte_* --out resultados/
+
+El archivo de trabajo tiene el formato de sweep.json (SweepExecutor): spec,
+tamaño de bloque, dtype, campos y versión del cálculo. El fragmento k de N
+evalúa los bloques c con c % N == k, de modo que cualquier proceso o
+máquina con el mismo archivo de trabajo calcula exactamente la misma
+partición. Cada parcial es un directorio con meta.json y un .npy por campo
+que se escribe bloque a bloque (memmap), sin acumular el fragmento en memoria.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from models.calculator import CompositeBeamDesign
+from models.sweep import SWEEP_FIELDS, SweepExecutor, SweepSpec, evaluate_chunk
+from models.section_database import SteelSectionDatabase
+
+PARTIAL_FORMAT = "lrfd-sweep-partial/2"
+PARTIAL_META = "meta.json"
+
+
+def make_job(spec, chunk_size=1 << 16, dtype="float64", fields=SWEEP_FIELDS):
+    """Descripción completa de un trabajo (mismo formato que sweep.json)."""
+    return SweepExecutor(spec, None, chunk_size, dtype, fields)._manifest()
+
+
+def _executor(job, out_dir=None):
+    return SweepExecutor(SweepSpec.from_dict(job["spec"]), out_dir, job["chunk_size"], job["dtype"], job["fields"])
+
+
+def shard_chunks(n_chunks, shard, n_shards):
+    """Bloques asignados al fragmento 'shard' de 'n_shards' (reparto intercalado)."""
+    if not 0 <= shard < n_shards:
+        raise ValueError(f"Fragmento fuera de rango: {shard} de {n_shards}")
+    return np.arange(shard, n_chunks, n_shards, dtype=np.int64)
+
+
+def run_shard(job, shard, n_shards, out_path):
+    """
+    Evalúa los bloques del fragmento y escribe el directorio parcial
+    autodescriptivo out_path: un .npy por campo, preasignado con el largo del
+    fragmento y escrito bloque a bloque en orden, y meta.json (huellas del
+    barrido y del cálculo, fragmento, bloques y formato). Se escribe en
+    out_path.tmp y se renombra al terminar, de modo que un parcial existente
+    siempre está completo. Lanza ValueError si el trabajo se creó con otra
+    versión del cálculo.
+    """
+    executor = _executor(job)
+    if job.get("calculator", executor.calculator) != executor.calculator:
+        raise ValueError("El trabajo se creó con otra versión del cálculo (calculator distinto)")
+    spec = executor.spec
+    chunks = shard_chunks(executor.n_chunks, shard, n_shards)
+    starts = chunks * executor.chunk_size
+    lengths = np.minimum(starts + executor.chunk_size, spec.size) - starts
+    table = SteelSectionDatabase.get_table()
+
+    tmp_dir = out_path + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    outputs = {k: open_memmap(os.path.join(tmp_dir, f"{k}.npy"), mode="w+", dtype=executor.dtype,
+                              shape=(int(lengths.sum()),)) for k in executor.fields}
+    offset = 0
+    for start, n in zip(starts.tolist(), lengths.tolist()):
+        values = evaluate_chunk(spec, start, start + n, table)
+        for k, out in outputs.items():
+            out[offset:offset + n] = values[k]
+        offset += n
+    for out in outputs.values():
+        out.flush()
+    del outputs
+
+    meta = {"format": PARTIAL_FORMAT, "fingerprint": spec.fingerprint(), "calculator": executor.calculator,
+            "shard": shard, "n_shards": n_shards, "size": spec.size, "chunk_size": executor.chunk_size,
+            "n_chunks": executor.n_chunks, "dtype": executor.dtype, "fields": list(executor.fields),
+            "chunks": chunks.tolist()}
+    # meta.json se escribe al final: su presencia indica un parcial completo
+    with open(os.path.join(tmp_dir, PARTIAL_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    shutil.rmtree(out_path, ignore_errors=True)
+    os.replace(tmp_dir, out_path)
+    return meta
+
+
+def read_partial_meta(path):
+    try:
+        with open(os.path.join(path, PARTIAL_META), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        raise ValueError(f"Formato de parcial desconocido: {path}")
+
+
+def merge_shards(job, paths, out_dir):
+    """
+    Fusiona archivos parciales en un directorio con el formato de
+    SweepExecutor (memmaps .npy + done.npy + sweep.json). Verifica que todos
+    los parciales pertenezcan al mismo trabajo y a la versión actual del
+    cálculo, y que cada bloque aparezca exactamente una vez; lanza
+    ValueError si falta o se repite alguno.
+    """
+    executor = _executor(job, out_dir)
+    fingerprint = executor.spec.fingerprint()
+    owner = np.full(executor.n_chunks, -1, dtype=np.int64)
+
+    metas = []
+    for path in paths:
+        meta = read_partial_meta(path)
+        if meta.get("format") != PARTIAL_FORMAT:
+            raise ValueError(f"Formato de parcial desconocido: {path}")
+        for key, expected in (("fingerprint", fingerprint), ("calculator", executor.calculator),
+                              ("chunk_size", executor.chunk_size), ("fields", list(executor.fields))):
+            if meta.get(key) != expected:
+                raise ValueError(f"El parcial {path} pertenece a otro trabajo ({key} distinto)")
+        chunks = np.asarray(meta["chunks"], dtype=np.int64)
+        repeated = chunks[owner[chunks] >= 0]
+        if len(repeated):
+            raise ValueError(f"Bloques repetidos en {path}: {repeated[:10].tolist()}")
+        owner[chunks] = len(metas)
+        metas.append((path, meta, chunks))
+
+    missing = np.flatnonzero(owner < 0)
+    if len(missing):
+        raise ValueError(f"Cobertura incompleta: faltan {len(missing)} bloques, p. ej. {missing[:10].tolist()}")
+
+    done = executor.prepare()
+    outputs = {k: np.load(os.path.join(out_dir, f"{k}.npy"), mmap_mode="r+") for k in executor.fields}
+    for path, meta, chunks in metas:
+        for k in executor.fields:
+            values = np.load(os.path.join(path, f"{k}.npy"), mmap_mode="r")
+            offset = 0
+            for c in chunks:
+                start = int(c) * executor.chunk_size
+                stop = min(start + executor.chunk_size, executor.spec.size)
+                outputs[k][start:stop] = values[offset:offset + stop - start]
+                offset += stop - start
+            outputs[k].flush()
+        done[chunks] = True
+        done.flush()
+    return {"size": executor.spec.size, "chunks": executor.n_chunks, "partials": len(metas)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barridos paramétricos fragmentados")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_job = sub.add_parser("job", help="Crea el archivo de trabajo a partir de un spec JSON (stdin)")
+    p_job.add_argument("job")
+    p_job.add_argument("--chunk-size", type=int, default=1 << 16)
+    p_job.add_argument("--float32", action="store_true")
+
+    p_run = sub.add_parser("run", help="Evalúa un fragmento")
+    p_run.add_argument("job")
+    p_run.add_argument("--shard", type=int, required=True)
+    p_run.add_argument("--shards", type=int, required=True)
+    p_run.add_argument("--out", required=True)
+
+    p_merge = sub.add_parser("merge", help="Fusiona los parciales y verifica la cobertura")
+    p_merge.add_argument("job")
+    p_merge.add_argument("partials", nargs="+")
+    p_merge.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "job":
+        spec = SweepSpec.from_dict(json.load(sys.stdin))
+        job = make_job(spec, args.chunk_size, "float32" if args.float32 else "float64")
+        with open(args.job, "w", encoding="utf-8") as f:
+            json.dump(job, f, indent=2)
+        print(f"Trabajo: {job['size']} combinaciones")
+        return 0
+
+    with open(args.job, encoding="utf-8") as f:
+        job = json.load(f)
+    if args.command == "run":
+        try:
+            meta = run_shard(job, args.shard, args.shards, args.out)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Fragmento {args.shard}/{args.shards}: {len(meta['chunks'])} bloques -> {args.out}")
+    else:
+        # parte_* también coincide con los parte_k.tmp de un fragmento interrumpido
+        paths = sorted(p for pattern in args.partials for p in glob.glob(pattern) if not p.endswith(".tmp"))
+        try:
+            info = merge_shards(job, paths, args.out)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Fusión completa: {info['size']} combinaciones de {info['partials']} parciales -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import numpy as np
+
+
+def max_stud_spacing(tc, hr):
+    """Separación máxima de conectores en in: min(8 t, 36 in), t = tc + hr espesor total de losa (AISC I8.2d)."""
+    return np.minimum(8.0 * (np.asarray(tc, dtype=float) + hr), 36.0)
+
+
+def stud_layout(x, M, Qn, Vh_max, slab_force, min_spacing=None, max_spacing=None):
+    """
+    Distribución de pernos de cantidad mínima a lo largo de la viga.
+
+      x: estaciones (S,) o (B, S) en ft, desde el apoyo izquierdo hasta el derecho
+      M: momentos (S,), (P, S) o (B, P, S) en k-ft; P = patrones de carga
+      Qn, Vh_max: escalares o (B,) (Qn por perno, Vh_max = min(0.85 f'c Ac, As Fy))
+      slab_force: función M (B, P, S) -> fuerza C requerida en la losa (kips),
+         inf donde no se alcanza (ver PlasticMomentTable.required_force)
+      min_spacing / max_spacing: separaciones límite en in (AISC I8.2d)
+
+    La fuerza en la losa en cada estación debe transferirse por los pernos
+    entre la estación y cada apoyo (puntos de momento nulo), así que con
+    N_i = ceil(C_i/Qn) (envolvente de los patrones) y F_i = pernos antes de
+    la estación i:  N_i <= F_i <= T - N_i.  La separación máxima agrega
+    cotas del mismo tipo (un perno por cada max_spacing entre estaciones).
+    El total mínimo es T = max(A_i + B_i), con A = máximo acumulado de las
+    cotas desde la izquierda y B desde la derecha; F toma A hasta la estación
+    crítica y T - B después. Retorna un dict con arrays por viga (B, ...),
+    incluidas las posiciones de los pernos en ft ('positions', rellenas con
+    NaN hasta el máximo T del lote; todas NaN si la separación mínima no se
+    puede cumplir, ver 'spacing_ok').
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    M = np.asarray(M, dtype=float)
+    if M.ndim == 1:
+        M = M[None, None, :]
+    elif M.ndim == 2:
+        M = M[None, :, :]
+    n_beams = max(x.shape[0], M.shape[0])
+    x = np.broadcast_to(x, (n_beams, x.shape[1]))
+    col = lambda v: np.broadcast_to(np.asarray(v, dtype=float), (n_beams,))[:, None]
+    Qn, Vh_max = col(Qn), col(Vh_max)
+
+    # Envolvente de fuerza requerida y pernos acumulados requeridos por estación
+    C_req = np.max(slab_force(np.broadcast_to(M, (n_beams,) + M.shape[1:])), axis=1)
+    reachable = np.all(C_req <= Vh_max * (1 + 1e-9), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        N_req = np.ceil(np.where(np.isfinite(C_req), C_req, Vh_max) / Qn - 1e-9)
+    N_req = np.maximum(N_req, 0.0)
+
+    # Separación máxima: entre dos estaciones cualesquiera debe haber al menos
+    # (x_j - x_i)/max_spacing pernos; en forma acumulada es un máximo prefijo
+    # de A - x/s sumado a x/s (y su simétrico desde la derecha). Se cumple con
+    # la resolución de las estaciones.
+    A = np.maximum.accumulate(N_req, axis=1)
+    B = np.maximum.accumulate(N_req[:, ::-1], axis=1)[:, ::-1]
+    if max_spacing is not None:
+        u = (x - x[:, :1]) * 12.0 / col(max_spacing)
+        A = np.floor(np.maximum.accumulate(A - u, axis=1) + u + 1e-9)
+        B = np.floor(np.maximum.accumulate((B + u)[:, ::-1], axis=1)[:, ::-1] - u + 1e-9)
+
+    total = np.max(A + B, axis=1)
+    crit = np.argmax(A + B, axis=1)
+    after = np.arange(x.shape[1])[None, :] > crit[:, None]
+    F = np.where(after, total[:, None] - B, A)
+
+    # Pernos por tramo entre estaciones consecutivas (el último tramo cierra en T)
+    counts = np.diff(F, axis=1)
+    counts[:, -1] += total - F[:, -1]
+
+    # Posiciones: el perno k (1..T) debe quedar antes de la primera estación con
+    # A >= k (l_k) y después de la última estación con T - B < k (e_k). Con
+    # separación mínima s, los pernos del lado izquierdo de la estación crítica
+    # se colocan lo más tarde posible, q_k = k s + min_{j>=k}(l_j - j s), y los
+    # del lado derecho lo más temprano posible, p_k = k s + max_{j<=k}(e_j - j s);
+    # así la separación máxima queda cubierta por las cotas de A y B. Una pasada
+    # final impone la separación mínima en la unión de ambos lados.
+    n_st = x.shape[1]
+    t_max = int(np.max(total)) if n_beams else 0
+    k = np.arange(1, t_max + 1, dtype=float)[None, :]
+    valid = k <= total[:, None]
+    rows = np.arange(n_beams)[:, None]
+    offset = rows * (t_max + 2.0)
+    i_late = np.searchsorted((A + offset).ravel(), (k + offset).ravel()).reshape(n_beams, -1)
+    i_late = np.clip(i_late - rows * n_st, 0, n_st - 1)
+    i_early = np.searchsorted((total[:, None] - B + offset).ravel(), (k + offset).ravel()).reshape(n_beams, -1)
+    i_early = np.clip(i_early - rows * n_st - 1, 0, n_st - 1)
+    late = x[rows, i_late] * 12.0
+    early = x[rows, i_early] * 12.0
+
+    smin = col(0.0 if min_spacing is None else min_spacing)
+    p = k * smin + np.maximum.accumulate(np.where(valid, early - k * smin, -np.inf), axis=1)
+    q = k * smin + np.minimum.accumulate(np.where(valid, late - k * smin, np.inf)[:, ::-1], axis=1)[:, ::-1]
+    left = k <= A[rows[:, 0], crit][:, None]
+    pos = np.where(left, q, p)
+    pos = k * smin + np.maximum.accumulate(np.where(valid, pos - k * smin, -np.inf), axis=1)
+    spacing_ok = np.all(~valid | (pos <= late + 1e-9), axis=1)
+    positions = np.where(valid & spacing_ok[:, None], pos / 12.0, np.nan)
+
+    return {"C_req": C_req, "N_req": N_req, "cumulative": F, "counts": counts, "total": total,
+            "positions": positions, "reachable": reachable, "spacing_ok": spacing_ok,
+            "feasible": reachable & spacing_ok}
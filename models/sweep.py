@@ -0,0 +1,229 @@
+import hashlib
+import json
+import multiprocessing
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from models.batch_calculator import BatchCompositeBeamDesign, CONNECTOR_DEFAULTS, NUMERIC_KEYS, RESULT_FIELDS
+from models.calculator import CompositeBeamDesign
+from models.section_database import SteelSectionDatabase
+
+# Campos que se guardan por combinación (resumen de run() + relación máxima)
+SWEEP_FIELDS = RESULT_FIELDS + ("max_ratio",)
+
+# Ejes de texto; el resto son numéricos (NUMERIC_KEYS o propiedades de conector)
+TEXT_AXES = ("beam_name", "deck_orientation", "connector_type")
+
+
+class SweepSpec:
+    """
+    Definición de un barrido paramétrico: producto cartesiano de los ejes
+    (lista de pares nombre -> valores) más valores fijos comunes. Los nombres
+    son los de CompositeBeamDesign; el perfil se indica por etiqueta en
+    'beam_name' y las propiedades de conector (diameter, fu, height,
+    studs_per_rib, length) se aceptan directamente como ejes.
+    La combinación i corresponde al índice plano i del arreglo de forma
+    self.shape (orden C: el último eje varía más rápido).
+    """
+    def __init__(self, axes, fixed=None):
+        self.axes = [(name, list(values)) for name, values in (axes.items() if isinstance(axes, dict) else axes)]
+        self.fixed = dict(fixed or {})
+        allowed = set(NUMERIC_KEYS) | set(TEXT_AXES) | set(CONNECTOR_DEFAULTS)
+        for name, values in self.axes:
+            if name not in allowed:
+                raise ValueError(f"Eje de barrido no válido: {name}")
+            if not values:
+                raise ValueError(f"Eje de barrido vacío: {name}")
+        self._arrays = None
+
+    @property
+    def shape(self):
+        return tuple(len(v) for _, v in self.axes)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def to_dict(self):
+        return {"axes": [[name, values] for name, values in self.axes], "fixed": self.fixed}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls([(name, values) for name, values in data["axes"]], data.get("fixed"))
+
+    def fingerprint(self):
+        """Huella del barrido (sha256 del JSON canónico) para validar reanudaciones y fusiones."""
+        text = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def parameters(self, index):
+        """Valores de cada eje para la combinación de índice plano 'index'."""
+        digits = np.unravel_index(int(index), self.shape)
+        params = dict(self.fixed)
+        params.update({name: values[i] for (name, values), i in zip(self.axes, digits)})
+        return params
+
+    def _axis_arrays(self, table):
+        if self._arrays is None:
+            self._arrays = {}
+            for name, values in self.axes:
+                if name == "beam_name":
+                    self._arrays[name] = table.rows(values)
+                elif name in TEXT_AXES:
+                    self._arrays[name] = np.array(values)
+                else:
+                    self._arrays[name] = np.array(values, dtype=float)
+        return self._arrays
+
+    def chunk_inputs(self, start, stop, table):
+        """Entradas columnares de BatchCompositeBeamDesign para las combinaciones [start, stop)."""
+        arrays = self._axis_arrays(table)
+        digits = np.unravel_index(np.arange(start, stop, dtype=np.int64), self.shape)
+        values = dict(self.fixed)
+        conn = dict(values.pop("connector_props", None) or {})
+        if "beam_name" in values:
+            values["beam_name"] = table.rows([values["beam_name"]])[0]
+        for (name, _), idx in zip(self.axes, digits):
+            values[name] = arrays[name][idx]
+
+        inputs = {k: values[k] for k in NUMERIC_KEYS if k in values}
+        inputs["section_rows"] = values["beam_name"]
+        inputs["section_table"] = table
+        inputs["deck_orientation"] = values.get("deck_orientation", "Perpendicular")
+        inputs["connector_type"] = values.get("connector_type", "Stud")
+        inputs["connector_props"] = {
+            k: values[k] if k in values else (conn.get(k) if conn.get(k) is not None else v)
+            for k, v in CONNECTOR_DEFAULTS.items()
+        }
+        if conn.get("label"):
+            inputs["connector_props"]["label"] = conn["label"]
+        return inputs
+
+
+def evaluate_chunk(spec, start, stop, table=None):
+    """Evalúa las combinaciones [start, stop) y retorna un dict campo -> array."""
+    table = table or SteelSectionDatabase.get_table()
+    res = BatchCompositeBeamDesign(spec.chunk_inputs(start, stop, table)).run()
+    res["max_ratio"] = np.maximum.reduce([res["ratio_flexure"], res["ratio_shear"], res["ratio_deflection"]])
+    n = stop - start
+    return {k: np.broadcast_to(res[k], (n,)) for k in SWEEP_FIELDS}
+
+
+# Estado por proceso de trabajo (se inicializa una vez por proceso)
+_worker_state = {}
+
+
+def _init_worker(out_dir, manifest):
+    _worker_state["spec"] = SweepSpec.from_dict(manifest["spec"])
+    _worker_state["chunk_size"] = manifest["chunk_size"]
+    _worker_state["size"] = manifest["size"]
+    _worker_state["outputs"] = {k: np.load(os.path.join(out_dir, f"{k}.npy"), mmap_mode="r+")
+                                for k in manifest["fields"]}
+    SteelSectionDatabase.get_table()
+
+
+def _run_chunk(chunk):
+    state = _worker_state
+    start = chunk * state["chunk_size"]
+    stop = min(start + state["chunk_size"], state["size"])
+    values = evaluate_chunk(state["spec"], start, stop)
+    for k, out in state["outputs"].items():
+        out[start:stop] = values[k]
+        out.flush()
+    return chunk
+
+
+class SweepExecutor:
+    """
+    Ejecuta un barrido por bloques sin materializar el producto cartesiano:
+    cada bloque de chunk_size combinaciones se genera a partir de su rango de
+    índices, se evalúa vectorizado y se escribe en arrays .npy mapeados en
+    memoria (uno por campo, float64 o float32) dentro de out_dir.
+    El avance se registra en done.npy (un indicador por bloque, escrito solo
+    por el proceso principal); un barrido interrumpido se reanuda desde los
+    bloques pendientes. Los bloques se reparten entre 'workers' procesos.
+    """
+    MANIFEST = "sweep.json"
+
+    def __init__(self, spec, out_dir, chunk_size=1 << 16, dtype="float64", fields=SWEEP_FIELDS, workers=None):
+        if np.dtype(dtype) not in (np.dtype("float64"), np.dtype("float32")):
+            raise ValueError("dtype debe ser float64 o float32")
+        self.spec = spec
+        self.out_dir = out_dir
+        self.chunk_size = int(chunk_size)
+        self.dtype = np.dtype(dtype).name
+        self.fields = tuple(fields)
+        self.workers = workers or os.cpu_count() or 1
+        self.n_chunks = -(-spec.size // self.chunk_size)
+        # Versión del cálculo: los resultados de versiones distintas no se mezclan
+        self.calculator = CompositeBeamDesign.fingerprint()
+
+    def _manifest(self):
+        return {"spec": self.spec.to_dict(), "fingerprint": self.spec.fingerprint(), "size": self.spec.size,
+                "shape": list(self.spec.shape), "chunk_size": self.chunk_size, "dtype": self.dtype,
+                "fields": list(self.fields), "calculator": self.calculator}
+
+    def prepare(self):
+        """Crea los archivos de salida o valida los existentes para reanudar. Retorna done (memmap)."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, self.MANIFEST)
+        manifest = self._manifest()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                existing = json.load(f)
+            for key in ("fingerprint", "calculator", "chunk_size", "dtype", "fields"):
+                if existing.get(key) != manifest[key]:
+                    raise ValueError(f"El directorio contiene otro barrido ({key} distinto): {self.out_dir}")
+            return np.load(os.path.join(self.out_dir, "done.npy"), mmap_mode="r+")
+
+        for k in self.fields:
+            open_memmap(os.path.join(self.out_dir, f"{k}.npy"), mode="w+", dtype=self.dtype,
+                        shape=(self.spec.size,)).flush()
+        done = open_memmap(os.path.join(self.out_dir, "done.npy"), mode="w+", dtype=bool, shape=(self.n_chunks,))
+        done.flush()
+        # El manifiesto se escribe al final: su presencia indica salidas completas
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return done
+
+    def run(self, progress=None):
+        """
+        Evalúa los bloques pendientes. progress(completados, total) se llama
+        tras cada bloque. Retorna el número de bloques evaluados en esta corrida.
+        """
+        done = self.prepare()
+        pending = [int(c) for c in np.flatnonzero(~done)]
+        if not pending:
+            return 0
+        manifest = self._manifest()
+        completed = int(done.sum())
+
+        def mark(chunk):
+            nonlocal completed
+            done[chunk] = True
+            done.flush()
+            completed += 1
+            if progress:
+                progress(completed, self.n_chunks)
+
+        if self.workers <= 1 or len(pending) == 1:
+            _init_worker(self.out_dir, manifest)
+            for chunk in pending:
+                mark(_run_chunk(chunk))
+        else:
+            SteelSectionDatabase.get_table()
+            ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+            with ctx.Pool(self.workers, initializer=_init_worker, initargs=(self.out_dir, manifest)) as pool:
+                for chunk in pool.imap_unordered(_run_chunk, pending):
+                    mark(chunk)
+        return len(pending)
+
+    def results(self):
+        """Salidas del barrido como dict campo -> memmap de solo lectura."""
+        return {k: np.load(os.path.join(self.out_dir, f"{k}.npy"), mmap_mode="r") for k in self.fields}
+
+    def is_complete(self):
+        path = os.path.join(self.out_dir, "done.npy")
+        return os.path.exists(path) and bool(np.load(path, mmap_mode="r").all())
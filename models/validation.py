@@ -0,0 +1,280 @@
+from itertools import repeat
+
+import numpy as np
+from models.section_database import SteelSectionDatabase
+from models.stud_layout import max_stud_spacing
+
+# Datos numéricos requeridos (connector_spacing tiene valor por defecto)
+REQUIRED_KEYS = ("span_ft", "spacing_ft", "slab_thickness", "fc_ksi", "fy_ksi",
+                 "rib_width", "rib_height", "dl_psf", "ll_psf")
+
+# Propiedades de conector validadas y sus valores por defecto
+CONNECTOR_DEFAULTS = (("diameter", 0.75), ("fu", 65.0), ("height", np.nan), ("studs_per_rib", 1.0),
+                      ("length", 0.0), ("tf", 0.0), ("tw", 0.0))
+
+# Propiedades que usa cada tipo de conector (un dato no numérico solo invalida las filas de ese tipo)
+STUD_FIELDS = ("diameter", "fu", "height", "studs_per_rib")
+CHANNEL_FIELDS = ("length", "tf", "tw")
+
+DECK_ORIENTATIONS = ("Perpendicular", "Parallel")
+CONNECTOR_TYPES = ("Stud", "Channel")
+
+# Reglas: (nombre, severidad, campos del mensaje, condición de falla, mensaje).
+# La condición recibe el dict de columnas y retorna un array booleano (True = falla).
+# Las reglas 'error' invalidan la fila; las 'warning' solo se informan.
+RULES = (
+    ("span", "error", ("span_ft",), lambda c: ~(c['span_ft'] > 0), "Luz debe ser positiva ({span_ft} ft)"),
+    ("spacing", "error", ("spacing_ft",), lambda c: ~(c['spacing_ft'] > 0),
+     "Espaciamiento debe ser positivo ({spacing_ft} ft)"),
+    ("slab", "error", ("slab_thickness",), lambda c: ~(c['slab_thickness'] > 0),
+     "Espesor de losa debe ser positivo ({slab_thickness} in)"),
+    ("rib_height", "error", ("rib_height",), lambda c: ~(c['rib_height'] > 0),
+     "Altura de nervio debe ser positiva ({rib_height} in)"),
+    ("rib_width", "error", ("rib_width",), lambda c: ~(c['rib_width'] > 0),
+     "Ancho de nervio debe ser positivo ({rib_width} in)"),
+    ("loads", "error", ("dl_psf", "ll_psf"), lambda c: ~((c['dl_psf'] >= 0) & (c['ll_psf'] >= 0)),
+     "Cargas no pueden ser negativas (DL={dl_psf}, LL={ll_psf} psf)"),
+    ("connector_spacing", "error", ("connector_spacing",), lambda c: ~(c['connector_spacing'] > 0),
+     "Separación de conectores debe ser positiva ({connector_spacing} in)"),
+    ("fc", "error", ("fc_ksi",), lambda c: ~((c['fc_ksi'] >= 3.0) & (c['fc_ksi'] <= 10.0)),
+     "f'c = {fc_ksi} ksi fuera del rango 3-10 ksi (AISC I1.3)"),
+    ("fy", "error", ("fy_ksi",), lambda c: ~((c['fy_ksi'] > 0) & (c['fy_ksi'] <= 75.0)),
+     "Fy = {fy_ksi} ksi fuera del rango 0-75 ksi (AISC I1.3)"),
+    ("hr_max", "error", ("rib_height",), lambda c: c['rib_height'] > 3.0,
+     "Altura de nervio hr = {rib_height} in mayor que 3 in (AISC I3.2c(1))"),
+    ("wr_min", "error", ("rib_width",), lambda c: c['rib_width'] < 2.0,
+     "Ancho de nervio wr = {rib_width} in menor que 2 in (AISC I3.2c(2))"),
+    ("tc_min", "error", ("slab_thickness",), lambda c: c['slab_thickness'] < 2.0,
+     "Losa sobre el deck tc = {slab_thickness} in menor que 2 in (AISC I3.2c(3))"),
+    ("stud_diameter", "error", ("diameter",), lambda c: c['is_stud'] & ~((c['diameter'] > 0) & (c['diameter'] <= 0.75)),
+     "Diámetro de perno {diameter} in fuera de 0-3/4 in con deck (AISC I3.2c(4))"),
+    ("stud_height", "error", ("height", "rib_height"), lambda c: c['is_stud'] & (c['height'] < c['rib_height'] + 1.5),
+     "Perno de {height} in no sobresale 1 1/2 in sobre el nervio de {rib_height} in (AISC I3.2c(3))"),
+    ("stud_fu", "error", ("fu",), lambda c: c['is_stud'] & ~(c['fu'] > 0), "Fu del perno debe ser positivo ({fu} ksi)"),
+    ("studs_per_rib", "error", ("studs_per_rib",), lambda c: c['is_stud'] & ~(c['studs_per_rib'] >= 1),
+     "Pernos por nervio debe ser al menos 1 ({studs_per_rib})"),
+    ("channel_length", "error", ("length",), lambda c: c['is_channel'] & ~(c['length'] > 0),
+     "Longitud del canal debe ser positiva ({length} in)"),
+    ("channel_section", "error", ("tf", "tw"),
+     lambda c: c['is_channel'] & (c['channel'] == '') & ~((c['tf'] > 0) & (c['tw'] > 0)),
+     "Canal sin perfil de la base de datos: tf = {tf} in y tw = {tw} in deben ser positivos"),
+    ("stud_cover", "warning", ("height", "rib_height", "slab_thickness"),
+     lambda c: c['is_stud'] & (c['height'] > c['rib_height'] + c['slab_thickness'] - 0.5),
+     "Perno de {height} in con menos de 1/2 in de recubrimiento (AISC I3.2c(3))"),
+    ("spacing_min", "warning", ("connector_spacing", "diameter"),
+     lambda c: c['is_stud'] & (c['connector_spacing'] * c['studs_per_rib'] < 6.0 * c['diameter']),
+     "Separación {connector_spacing} in menor que 6d (AISC I8.2d)"),
+    ("spacing_max", "warning", ("connector_spacing", "slab_thickness", "rib_height"),
+     lambda c: c['connector_spacing'] > max_stud_spacing(c['slab_thickness'], c['rib_height']),
+     "Separación {connector_spacing} in mayor que min(8 (tc + hr), 36 in) (AISC I8.2d)"),
+    ("stud_flange", "warning", ("diameter",), lambda c: c['is_stud'] & (c['diameter'] > 2.5 * c['beam_tf']),
+     "Diámetro de perno {diameter} in mayor que 2.5 tf del ala (AISC I8.1)"),
+)
+
+
+def _float_column(values, n, default=None):
+    """
+    Convierte una columna a float; retorna (valores, máscara de no
+    numéricos). Los valores que no se pueden convertir (texto, listas,
+    diccionarios) se marcan por fila. Con default, los datos omitidos (None
+    o NaN) toman ese valor y no se marcan.
+    """
+    bad = None
+    try:
+        col = np.asarray(values, dtype=float)
+        col = np.full(n, col) if col.ndim == 0 else col
+        if col.shape == (n,):
+            bad = np.zeros(n, dtype=bool)
+    except (TypeError, ValueError):
+        pass
+    if bad is None:
+        col = np.full(n, np.nan)
+        bad = np.zeros(n, dtype=bool)
+        for i, v in enumerate(values):
+            if v is None:
+                continue
+            try:
+                col[i] = float(v)
+            except (TypeError, ValueError):
+                bad[i] = True
+    if default is None:
+        return col, bad | ~np.isfinite(col)
+    col = np.where(np.isnan(col), default, col)
+    return col, bad | np.isinf(col)
+
+
+def _object_column(values, n):
+    """Columna (n,) de objetos sin que las listas anidadas agreguen dimensiones."""
+    if isinstance(values, str) or not isinstance(values, (list, tuple, np.ndarray)):
+        return np.full(n, values, dtype=object)
+    return np.fromiter(values, dtype=object, count=n)
+
+
+def _option_column(values, n):
+    """Columna de opciones de texto; los valores que no son texto quedan como su repr (opción no válida)."""
+    if isinstance(values, str) or not isinstance(values, (list, tuple, np.ndarray)):
+        values = [values] * n
+    try:
+        col = np.asarray(values)
+        if col.dtype.kind == 'U' and col.shape == (n,):
+            return col
+    except ValueError:
+        pass
+    return np.array([v if isinstance(v, str) else repr(v) for v in values], dtype=object)
+
+
+class ValidationReport:
+    """
+    Resultado de la validación: 'valid' (N,) sin errores, 'failed' (N, R)
+    por regla y 'bad_type' (N, K) por campo numérico faltante o inválido.
+    Los mensajes se arman solo para las filas con fallas.
+    """
+    def __init__(self, columns, failed, bad_type, numeric_keys):
+        self.columns = columns
+        self.failed = failed
+        self.bad_type = bad_type
+        self.numeric_keys = numeric_keys
+        self.is_error = np.array([r[1] == "error" for r in RULES])
+        self.valid = ~(failed[:, self.is_error].any(axis=1) | bad_type.any(axis=1)
+                       | columns['bad_label'] | columns['bad_option'] | columns['bad_props'] | columns['bad_channel'])
+        self.has_warnings = failed[:, ~self.is_error].any(axis=1)
+
+    def __len__(self):
+        return len(self.valid)
+
+    def subset(self, index):
+        """Reporte de las filas 'index' (columnas ya convertidas, ver records_to_inputs)."""
+        columns = {k: v[index] for k, v in self.columns.items()}
+        return ValidationReport(columns, self.failed[index], self.bad_type[index], self.numeric_keys)
+
+    def row_messages(self, i, warnings=True):
+        """Lista de (severidad, mensaje) de la fila i."""
+        c = self.columns
+        out = []
+        if c['bad_label'][i]:
+            out.append(("error", f"Perfil no válido: {c['beam_name'][i]}"))
+        if c['bad_option'][i]:
+            out.append(("error", f"Opción no válida: deck '{c['deck'][i]}', conector '{c['kind'][i]}'"))
+        if c['bad_props'][i]:
+            out.append(("error", "Propiedades del conector no válidas (connector_props debe ser un diccionario)"))
+        if c['bad_channel'][i]:
+            out.append(("error", f"Perfil C no válido: {c['channel'][i]}"))
+        for k, bad in zip(self.numeric_keys, self.bad_type[i]):
+            if bad:
+                out.append(("error", f"Dato faltante o no numérico: {k}"))
+        for (name, severity, fields, _, msg), bad in zip(RULES, self.failed[i]):
+            if bad and (warnings or severity == "error") and not any(
+                    self.bad_type[i][self.numeric_keys.index(f)] for f in fields if f in self.numeric_keys):
+                out.append((severity, msg.format(**{f: f"{c[f][i]:g}" for f in fields})))
+        return out
+
+    def errors(self, warnings=False):
+        """{fila: [mensajes]} de las filas con errores (y advertencias si warnings)."""
+        rows = np.flatnonzero(~self.valid | (self.has_warnings if warnings else False))
+        return {int(i): [m for _, m in self.row_messages(i, warnings)] for i in rows}
+
+
+def validate_columns(columns, table=None):
+    """
+    Valida entradas columnares (mismo formato que records_to_inputs, con
+    'beam_name' como array de etiquetas) en una sola pasada vectorizada.
+    'bad_props' (opcional) marca las filas cuyo connector_props no era un
+    diccionario (ver validate_records).
+    """
+    table = table or SteelSectionDatabase.get_table()
+    n = len(columns['beam_name'])
+    labels = _object_column(columns['beam_name'], n)
+    conn = columns.get('connector_props') or {}
+    deck = _option_column(columns.get('deck_orientation', 'Perpendicular'), n)
+    kind = _option_column(columns.get('connector_type', 'Stud'), n)
+    cols = {'is_stud': kind == 'Stud', 'is_channel': kind == 'Channel', 'deck': deck, 'kind': kind}
+    bad = []
+    numeric_keys = REQUIRED_KEYS + ("connector_spacing",) + tuple(k for k, _ in CONNECTOR_DEFAULTS)
+    for k in REQUIRED_KEYS:
+        cols[k], mask = _float_column(columns.get(k, np.nan), n)
+        bad.append(mask)
+    cols['connector_spacing'], mask = _float_column(columns.get('connector_spacing', 12.0), n, 12.0)
+    bad.append(mask)
+    for k, default in CONNECTOR_DEFAULTS:
+        col, mask = _float_column(conn.get(k, default), n, default)
+        # Un dato no numérico solo invalida las filas cuyo conector lo usa;
+        # en las demás se reemplaza por el valor por defecto
+        cols[k] = np.where(mask, default, col)
+        bad.append(mask & (cols['is_stud'] if k in STUD_FIELDS else cols['is_channel']))
+    cols['height'] = np.where(np.isnan(cols['height']), cols['rib_height'] + 2.0, cols['height'])
+
+    try:
+        rows = np.fromiter(map(table.row_of.get, labels, repeat(-1)), dtype=np.intp, count=n)
+    except TypeError:
+        # Etiquetas no hashables (listas, diccionarios): no son perfiles válidos
+        rows = np.array([table.row_of.get(l, -1) if isinstance(l, str) else -1 for l in labels.tolist()], dtype=np.intp)
+    cols['bad_label'] = rows < 0
+    cols['beam_name'] = labels
+    cols['section_rows'] = rows
+    cols['beam_tf'] = np.where(rows >= 0, table.columns['tf'][np.maximum(rows, 0)], np.inf)
+    cols['bad_option'] = ~np.isin(deck, DECK_ORIENTATIONS) | ~np.isin(kind, CONNECTOR_TYPES)
+    cols['bad_props'] = np.broadcast_to(np.asarray(columns.get('bad_props', False), dtype=bool), (n,))
+
+    # Canales de la base de datos: la etiqueta debe existir en c_sections.csv
+    channel = _object_column(conn.get('label', ''), n)
+    known = SteelSectionDatabase.get_channels()
+    cols['channel'] = channel
+    cols['bad_channel'] = np.zeros(n, dtype=bool)
+    idx = np.flatnonzero(cols['is_channel'])
+    try:
+        found = np.fromiter(map(known.__contains__, channel[idx]), dtype=bool, count=len(idx))
+        cols['bad_channel'][idx] = (channel[idx] != '') & ~found
+    except TypeError:
+        cols['bad_channel'][idx] = [l != '' and not (isinstance(l, str) and l in known) for l in channel[idx].tolist()]
+
+    with np.errstate(invalid='ignore'):
+        failed = np.column_stack([rule(cols) for _, _, _, rule, _ in RULES]) if n else np.zeros((0, len(RULES)), bool)
+    bad_type = np.column_stack(bad) if n else np.zeros((0, len(numeric_keys)), bool)
+    return ValidationReport(cols, failed, bad_type, numeric_keys)
+
+
+def _record_field(records, key, numeric=False):
+    """
+    Valores de 'key' en cada registro (None si falta) en un solo recorrido en
+    C. Con numeric, un array float sin lista intermedia si todos son números;
+    si no, la lista cruda (la convierte _float_column fila por fila).
+    """
+    if numeric:
+        try:
+            return np.fromiter(map(dict.get, records, repeat(key)), dtype=float, count=len(records))
+        except (TypeError, ValueError):
+            pass
+    return list(map(dict.get, records, repeat(key)))
+
+
+def validate_records(records, table=None):
+    """
+    Valida una lista de diseños en formato plano (ver records_to_inputs).
+    Los datos omitidos (None) de connector_spacing, las opciones y el
+    conector toman su valor por defecto.
+    """
+    n = len(records)
+    columns = {k: _record_field(records, k, numeric=True) for k in REQUIRED_KEYS + ("connector_spacing",)}
+    columns['beam_name'] = _record_field(records, 'beam_name')
+    for k, default in (('deck_orientation', 'Perpendicular'), ('connector_type', 'Stud')):
+        values = _record_field(records, k)
+        columns[k] = [default if v is None else v for v in values] if None in values else values
+    props = _record_field(records, 'connector_props')
+    if props.count(None) < n:
+        # Solo hay que recorrer las propiedades si algún registro las trae
+        is_dict = np.fromiter(map(isinstance, props, repeat(dict)), dtype=bool, count=n)
+        conn = props
+        if not is_dict.all():
+            empty = {}
+            conn = [p if isinstance(p, dict) else empty for p in props]
+            columns['bad_props'] = ~is_dict & np.array([p is not None for p in props])
+        columns['connector_props'] = {}
+        for k, _ in CONNECTOR_DEFAULTS:
+            values = _record_field(conn, k, numeric=True)
+            if isinstance(values, np.ndarray) or values.count(None) < n:
+                columns['connector_props'][k] = values
+        labels = _record_field(conn, 'label')
+        columns['connector_props']['label'] = label = np.fromiter(labels, dtype=object, count=n)
+        other = ~np.fromiter(map(isinstance, labels, repeat(str)), dtype=bool, count=n)
+        label[other] = ['' if l is None else repr(l) for l in label[other].tolist()]
+    return validate_columns(columns, table)
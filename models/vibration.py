@@ -0,0 +1,56 @@
+import numpy as np
+from models.section_table import ES_KSI
+
+G_IN_S2 = 386.0       # Aceleración de la gravedad (in/s²)
+
+
+def walking_vibration(Lj, sj, wj, Ij, de, n_dyn, Lg=None, Ig=None, Cj=2.0, Cg=1.8,
+                      beta=0.03, Po=0.065, limit=0.005, floor_width=np.inf, floor_length=np.inf, Es=ES_KSI):
+    """
+    Vibración por caminata en pisos (AISC Design Guide 11, Cap. 4). Vectorizado:
+    todas las entradas pueden ser escalares o arrays.
+      Lj, sj: luz y separación de la viga (ft); wj: carga soportada (klf)
+      Ij: inercia transformada con 1.35Ec (in⁴); de: espesor efectivo de losa (in)
+      n_dyn: relación modular dinámica; Lg, Ig: luz (ft) e inercia (in⁴) del girder
+      beta: amortiguamiento; Po: fuerza de caminata (kips); limit: ap/g admisible
+      floor_width / floor_length: dimensiones del piso (ft) para limitar Bj y Bg
+    Fórmulas:
+        Δ = 5 w L⁴ / (384 Es I),  f = 0.18 √(g/Δ),  fn = 0.18 √(g/(Δj + Δg))
+        Bj = Cj (Ds/Dj)^0.25 Lj <= 2/3 ancho,  Ds = de³/n,  Dj = Ij/sj
+        Bg = Cg (Dj/Dg)^0.25 Lg <= 2/3 largo,  Dg = Ig/Lj
+        W = Δj/(Δj+Δg) Wj + Δg/(Δj+Δg) Wg
+        ap/g = Po exp(-0.35 fn) / (β W)
+    """
+    Lj = np.asarray(Lj, dtype=float)
+    Ij = np.asarray(Ij, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta_j = 5 * (wj / 12.0) * (Lj * 12)**4 / (384 * Es * Ij)
+        fj = 0.18 * np.sqrt(G_IN_S2 / delta_j)
+
+        Ds = de**3 / n_dyn
+        Dj = Ij / sj
+        Bj = np.minimum(Cj * (Ds / Dj)**0.25 * Lj, 2.0 / 3.0 * floor_width)
+        Wj = (wj / sj) * Bj * Lj
+
+        if Lg is None or Ig is None:
+            delta_g = np.zeros_like(delta_j)
+            fg = np.full_like(delta_j, np.inf)
+            Wg = np.zeros_like(delta_j)
+        else:
+            Lg = np.asarray(Lg, dtype=float)
+            wg = wj * Lj / sj   # Carga uniforme equivalente de las reacciones de vigas
+            delta_g = 5 * (wg / 12.0) * (Lg * 12)**4 / (384 * Es * Ig)
+            fg = 0.18 * np.sqrt(G_IN_S2 / delta_g)
+            Dg = Ig / Lj
+            Bg = np.minimum(Cg * (Dj / Dg)**0.25 * Lg, 2.0 / 3.0 * floor_length)
+            Wg = (wg / Lj) * Bg * Lg
+            # Girder más corto que el ancho efectivo de las vigas (DG11 Sec. 4.3)
+            delta_g = np.where(Lg < Bj, np.maximum(Lg / Bj, 0.5) * delta_g, delta_g)
+
+        delta = delta_j + delta_g
+        fn = 0.18 * np.sqrt(G_IN_S2 / delta)
+        W = np.where(delta > 0, (delta_j * Wj + delta_g * Wg) / delta, Wj)
+        ap_g = Po * np.exp(-0.35 * fn) / (beta * W)
+
+    return {"delta_j": delta_j, "delta_g": delta_g, "fj": fj, "fg": fg, "fn": fn,
+            "Bj": Bj, "Wj": Wj, "Wg": Wg, "W": W, "ap_g": ap_g, "limit": limit, "ratio": ap_g / limit}
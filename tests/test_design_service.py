@@ -0,0 +1,61 @@
+"""
+Agrupación de solicitudes del servicio de diseño: una solicitud defectuosa
+no debe afectar a las demás solicitudes de su mismo lote.
+
+    python -m pytest tests
+"""
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from controllers import design_service
+from controllers.design_service import RequestBatcher, ServiceMetrics
+from models.batch_calculator import evaluate_records
+
+GOOD = dict(beam_name="W16X26", span_ft=30, spacing_ft=8, slab_thickness=3.5, fc_ksi=4, fy_ksi=50,
+            dl_psf=80, ll_psf=100, rib_height=3, rib_width=6, connector_spacing=12)
+
+
+class RequestBatcherTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Hilos en lugar de procesos: el lote se evalúa igual y se puede interceptar
+        self.executor = ThreadPoolExecutor(2)
+        self.metrics = ServiceMetrics()
+        self.batcher = RequestBatcher(self.executor, self.metrics, max_wait_s=0.05)
+
+    async def asyncTearDown(self):
+        await self.batcher.stop()
+        self.executor.shutdown(wait=True)
+
+    async def _submit_together(self, *requests):
+        futures = [self.batcher.submit(recs) for recs in requests]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        self.assertEqual(self.metrics.batches, 1, "las solicitudes deben compartir el lote")
+        return results
+
+    async def test_malformed_connector_only_fails_its_request(self):
+        bad = dict(GOOD, connector_props={"height": "abc"})
+        good, wrong = await self._submit_together([GOOD, GOOD], [bad, GOOD])
+        self.assertTrue(all("error" not in r for r in good))
+        self.assertIn("height", wrong[0]["error"])
+        self.assertNotIn("error", wrong[1])
+        self.assertEqual(good[0]["max_ratio"], wrong[1]["max_ratio"])
+
+    async def test_engine_failure_is_split_per_request(self):
+        def engine(records, strict=False):
+            # Falla del motor vectorizado provocada por un solo diseño
+            if any(r.get("poison") for r in records):
+                if strict:
+                    raise ValueError("motor")
+                return [{"error": "motor"} for _ in records]
+            return evaluate_records(records, strict)
+
+        with mock.patch.object(design_service, "evaluate_records", engine):
+            good, wrong = await self._submit_together([GOOD], [dict(GOOD, poison=True)])
+        self.assertNotIn("error", good[0])
+        self.assertEqual(wrong, [{"error": "motor"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
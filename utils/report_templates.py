@@ -0,0 +1,284 @@
+"""
+Plantillas de la memoria de cálculo compartidas por el reporte HTML (GUI y
+lotes) y el PDF.
+
+La memoria se describe una sola vez como un registro: una lista de bloques
+(tipo, contenido) armada a partir de las entradas y resultados de
+CompositeBeamDesign (build_record). Los renderizadores solo recorren el
+registro. Las plantillas HTML son funciones de formato compiladas al
+importar el módulo, y el PDF traduce cada bloque al estilo de párrafo
+equivalente. render_html_reports escribe un conjunto estático de memorias
+con una página índice.
+"""
+import os
+import html as _html
+
+SECTION_COLUMNS = ["Item", "A (in²)", "y (in)", "Ay (in³)", "Io (in⁴)", "Ad² (in⁴)"]
+SENSITIVITY_COLUMNS = ["Variable", "Valor", "∂ Flexión", "∂ Cortante", "∂ Deflexión"]
+
+# Variables de las sensibilidades (GRADIENT_VARIABLES) con su rótulo y unidad
+SENSITIVITY_LABELS = {
+    "span_ft": "Luz (ft)", "spacing_ft": "Espaciamiento (ft)", "dl_psf": "DL (psf)", "ll_psf": "LL (psf)",
+    "fc_ksi": "f'c (ksi)", "fy_ksi": "Fy (ksi)", "slab_thickness": "Losa tc (in)",
+    "rib_height": "Nervio hr (in)", "connector_spacing": "Sep. conectores (in)",
+}
+
+CSS = """
+    h3 { color: #004488; border-bottom: 2px solid #004488; margin-bottom: 5px; }
+    h4 { background-color: #f2f2f2; padding: 5px; border-left: 5px solid #004488; margin-top: 10px; font-weight: bold;}
+    .step { font-family: monospace; font-size: 10pt; margin-left: 10px; color: #333; }
+    .result { font-weight: bold; margin-left: 10px; margin-bottom: 3px; color: #000; }
+    .sub { font-weight: bold; margin-left: 10px; margin-top: 10px; color: #000; }
+    table { width: 100%; border-collapse: collapse; font-size: 9pt; margin-top: 5px; }
+    th { background-color: #004488; color: white; padding: 4px; text-align: center; }
+    td { border: 1px solid #ddd; padding: 3px; text-align: center; }
+    tr.total { background-color: #eee; font-weight: bold; }
+    .pass { color: green; font-weight: bold; }
+    .fail { color: red; font-weight: bold; }
+"""
+
+
+def _trans_table(beam_name, data):
+    d = data['table_data']
+    row = lambda name, v: [name, f"{v['A']:.2f}", f"{v['y']:.2f}", f"{v['Ay']:.1f}", f"{v['Io']:.1f}", f"{v['Ad2']:.1f}"]
+    total = ["SUMA", f"{d['sum']['A']:.2f}", "-", f"{d['sum']['Ay']:.1f}", "-", "-"]
+    return ("table", (SECTION_COLUMNS, [row(beam_name, d['steel']), row("Conc(Tr)", d['conc']), total], True))
+
+
+def build_record(inputs, res, title="MEMORIA DE CÁLCULO"):
+    """Registro de la memoria (lista de bloques) a partir de entradas y resultados escalares."""
+    l_steps = res['loads']['steps']
+    c_steps = res['conn_data']['steps']
+    f_steps = res['strength']['steps']
+    s_steps = res['shear']['steps']
+    b_steps = res['b_eff_steps']
+    conn, st, defs, shear = res['conn_data'], res['strength'], res['deflections'], res['shear']
+    const = res.get('construction')
+    beam_name = inputs['beam_name']
+    b_eff = st['b_eff']
+    fc_psi = inputs['fc_ksi'] * 1000
+
+    rec = [
+        ("title", title),
+        ("h", "1. DATOS DE ENTRADA"),
+        ("table", (None, [
+            ["Luz", f"{inputs['span_ft']} ft", "f'c", f"{inputs['fc_ksi']} ksi"],
+            ["Espaciamiento", f"{inputs['spacing_ft']} ft", "Fy", f"{inputs['fy_ksi']} ksi"],
+            ["Perfil", beam_name, "Losa (tc)", f"{inputs['slab_thickness']} in"],
+            ["Cargas (DL/LL)", f"{inputs['dl_psf']} / {inputs['ll_psf']} psf", "Deck",
+             f"{inputs['rib_height']}\" x {inputs['rib_width']}\""],
+        ], False)),
+
+        ("h", "2. ANCHO EFECTIVO (AISC I3.1a)"),
+        ("step", f"L/4: {b_steps['L_4']}"),
+        ("step", f"Spacing: {b_steps['spacing']}"),
+        ("result", b_steps['final']),
+
+        ("h", "3. CARGAS"),
+        ("step", l_steps['w_u']),
+        ("result", l_steps['M_u']),
+
+        ("h", "4. CONECTORES (AISC I8)"),
+        ("step", f"Qn: {c_steps['Qn_desc']} = <b>{conn['Qn_unit']:.2f} k</b>"),
+        ("step", f"Cant: {c_steps['N_calc']}"),
+        ("result", f"Vh Req: {c_steps['Vh_calc']} -> {conn['percent']:.1f}% Compuesta"),
+
+        ("h", "5. FLEXIÓN (AISC I3.2)"),
+        ("step", f_steps['C_calc']),
+        ("step", f_steps['a_calc']),
+        ("step", f_steps['Y_calc']),
+        ("step", f_steps['PNA_calc']),
+        ("step", f_steps['Mn_calc']),
+        ("result", f"PhiMn = {st['phi_Mn']:.1f} k-ft (Ratio: {st['ratio']:.2f})"),
+
+        ("h", "6. CORTANTE (AISC G2)"),
+        ("step", s_steps['Class_calc']),
+        ("step", s_steps['Aw_calc']),
+        ("step", s_steps['Formula']),
+        ("step", s_steps['Vn_calc']),
+        ("result", f"{s_steps['PhiVn_calc']} (Ratio: {shear['ratio']:.2f})"),
+
+        ("h", "7. DEFLEXIONES (AISC I3.2 / C-I3-1)"),
+        ("step", f"Ec = 57000 * sqrt({fc_psi:.0f}) / 1000 = <b>{conn['Ec']:.1f} ksi</b>"),
+        ("step", f"n = Es / Ec = 29000 / {conn['Ec']:.1f} = <b>{defs['short']['data']['n_base']:.2f}</b>"),
+    ]
+    for tag, key in (("A. Corto Plazo", 'short'), ("B. Largo Plazo", 'long')):
+        data = defs[key]['data']
+        rec += [
+            ("sub", f"{tag} (n={data['n']:.2f})"),
+            ("step", f"Ancho Equiv. (btr) = {b_eff:.1f} / {data['n']:.2f} = <b>{data['b_tr']:.2f} in</b>"),
+            _trans_table(beam_name, data),
+            ("step", f"Itr={data['I_tr']:.1f}, <b>Ieff={data['I_eff']:.1f} in⁴</b>"),
+            ("result", f"Def = {defs[key]['delta']:.3f}\" (Lim {defs[key]['limit']:.3f}\")"),
+        ]
+
+    if const:
+        k_steps = const['steps']
+        rec += [("h", "8. ETAPA CONSTRUCTIVA (AISC F2)")]
+        rec += [("step", k_steps[k]) for k in ('w_calc', 'Lb_calc', 'Mn_calc', 'delta_calc')]
+        rec += [("result", f"Ratio Flexión: {const['ratio_flexure']:.2f}, "
+                           f"Ratio Deflexión: {const['ratio_deflection']:.2f} [{const['status']}]")]
+
+    ratio_def = max(defs['short']['ratio'], defs['long']['ratio'])
+    rec += [
+        ("h", "9. RESUMEN"),
+        ("check", ("Flexión", st['ratio'], st['status'])),
+        ("check", ("Cortante", shear['ratio'], 'OK' if shear['ratio'] <= 1 else 'FALLA')),
+        ("check", ("Deflexión", ratio_def, 'OK' if ratio_def <= 1 else 'FALLA')),
+    ]
+    if const:
+        rec += [("check", ("Constructiva", const['ratio'], const['status'])),
+                ("step", f"Contraflecha: {const['camber']:.2f}\"")]
+    if res.get('sensitivity'):
+        rec += _sensitivity_blocks(inputs, res['sensitivity'],
+                                   {"ratio_flexure": st['ratio'], "ratio_shear": shear['ratio'],
+                                    "ratio_deflection": ratio_def})
+    return rec
+
+
+def _sensitivity_blocks(inputs, sens, ratios):
+    """
+    Tabla de derivadas de cada relación por unidad de la variable y, por
+    relación, la variable de mayor influencia según la elasticidad
+    (% de cambio de la relación por 1% de cambio de la variable).
+    """
+    values = {v: inputs.get(v, 12.0 if v == 'connector_spacing' else 0.0) for v in SENSITIVITY_LABELS}
+    rows = [[label, f"{values[v]:g}"]
+            + [f"{sens[r][v]:+.3g}" for r in ("ratio_flexure", "ratio_shear", "ratio_deflection")]
+            for v, label in SENSITIVITY_LABELS.items()]
+    blocks = [("h", "10. SENSIBILIDADES"),
+              ("step", "Derivadas analíticas de cada relación por unidad de la variable"),
+              ("table", (SENSITIVITY_COLUMNS, rows, False))]
+    for name, key in (("Flexión", "ratio_flexure"), ("Cortante", "ratio_shear"), ("Deflexión", "ratio_deflection")):
+        if not ratios[key] > 0:
+            continue
+        elasticity = {v: d * values[v] / ratios[key]
+                      for v, d in sens[key].items()}
+        v = max(elasticity, key=lambda k: abs(elasticity[k]))
+        blocks.append(("result", f"{name}: domina {SENSITIVITY_LABELS[v]} "
+                                 f"(+1% → {elasticity[v]:+.2f}% en la relación)"))
+    return blocks
+
+
+def record_summary(inputs, res):
+    """Fila del índice: perfil, relación que controla y estado."""
+    ratios = {"Flexión": res['strength']['ratio'], "Cortante": res['shear']['ratio'],
+              "Deflexión": max(res['deflections']['short']['ratio'], res['deflections']['long']['ratio'])}
+    if res.get('construction'):
+        ratios["Constructiva"] = res['construction']['ratio']
+    governs = max(ratios, key=ratios.get)
+    return {"beam_name": inputs['beam_name'], "governs": governs, "ratio": ratios[governs],
+            "status": "OK" if ratios[governs] <= 1.0 else "FALLA"}
+
+
+# --- HTML: plantillas compiladas una vez ---
+_HTML_BLOCK = {
+    "title": "<h3>{}</h3>".format,
+    "h": "<h4>{}</h4>".format,
+    "sub": '<div class="sub">{}</div>'.format,
+    "step": '<div class="step">{}</div>'.format,
+    "result": '<div class="result">{}</div>'.format,
+}
+_HTML_CHECK = '<div>{}: {:.2f} <span class="{}">[{}]</span></div>'.format
+_HTML_TH = "<th>{}</th>".format
+_HTML_TD = "<td>{}</td>".format
+_HTML_IMAGE = '<div><img src="{}" style="max-width:100%"></div>'.format
+_HTML_PAGE = ('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title>'
+              '<link rel="stylesheet" href="{css}"></head><body>\n{body}\n</body></html>\n').format
+
+
+def _html_table(payload):
+    header, rows, total = payload
+    out = ["<table>"]
+    if header:
+        out.append("<tr>" + "".join(map(_HTML_TH, header)) + "</tr>")
+    last = len(rows) - 1
+    for i, row in enumerate(rows):
+        out.append(('<tr class="total">' if total and i == last else "<tr>") + "".join(map(_HTML_TD, row)) + "</tr>")
+    out.append("</table>")
+    return "".join(out)
+
+
+def render_html(record, inline_css=True, images=None):
+    """HTML de un registro; con inline_css incluye la hoja de estilos (GUI)."""
+    parts = [f"<style>{CSS}</style>"] if inline_css else []
+    for kind, payload in record:
+        if kind == "table":
+            parts.append(_html_table(payload))
+        elif kind == "check":
+            name, ratio, status = payload
+            parts.append(_HTML_CHECK(name, ratio, "pass" if status == "OK" else "fail", status))
+        else:
+            parts.append(_HTML_BLOCK[kind](payload))
+    for path in (images or ()):
+        parts.append(_HTML_IMAGE(path))
+    return "\n".join(parts)
+
+
+def render_html_reports(out_dir, items, title="Memorias de Cálculo"):
+    """
+    Conjunto estático de memorias HTML: una página por viga, hoja de estilos
+    común e index.html con el resumen y enlaces. items: iterable de
+    (etiqueta, inputs, resultados); se consume en una pasada. Retorna la ruta
+    del índice.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "report.css"), "w", encoding="utf-8") as f:
+        f.write(CSS)
+    rows = []
+    for i, (label, inputs, res) in enumerate(items):
+        name = f"viga_{i:05d}.html"
+        body = render_html(build_record(inputs, res), inline_css=False)
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+            f.write(_HTML_PAGE(title=_html.escape(str(label)), css="report.css", body=body))
+        s = record_summary(inputs, res)
+        rows.append(['<a href="{}">{}</a>'.format(name, _html.escape(str(label))), s['beam_name'], s['governs'],
+                     f"{s['ratio']:.2f}", '<span class="{}">{}</span>'.format(
+                         "pass" if s['status'] == "OK" else "fail", s['status'])])
+    body = _HTML_BLOCK["title"](_html.escape(title)) + _html_table(
+        (["Viga", "Perfil", "Controla", "Ratio", "Estado"], rows, False))
+    index = os.path.join(out_dir, "index.html")
+    with open(index, "w", encoding="utf-8") as f:
+        f.write(_HTML_PAGE(title=_html.escape(title), css="report.css", body=body))
+    return index
+
+
+# --- PDF: bloques del registro como flowables de reportlab ---
+def pdf_story(record, styles, plot_paths=None):
+    """Flowables del registro con la hoja de estilos de PDFReportGenerator."""
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle, Image
+
+    style_of = {"title": styles['Title'], "h": styles['HeaderCustom'], "sub": styles['SubHeader'],
+                "step": styles['CalcStep'], "result": styles['CalcResult']}
+    story = []
+    for kind, payload in record:
+        if kind == "table":
+            header, rows, total = payload
+            data = ([header] if header else []) + rows
+            width = 4.8 * inch / len(data[0])
+            t = Table(data, colWidths=[width] * len(data[0]))
+            style = [('GRID', (0,0), (-1,-1), 0.5, colors.grey)]
+            if header:
+                style += [('BACKGROUND', (0,0), (-1,0), colors.lightgrey), ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold')]
+            else:
+                style += [('BACKGROUND', (0,0), (-1,-1), colors.whitesmoke)]
+            if total:
+                style += [('BACKGROUND', (0,-1), (-1,-1), colors.whitesmoke)]
+            t.setStyle(TableStyle(style))
+            story += [t, Spacer(1, 0.1 * inch)]
+        elif kind == "check":
+            name, ratio, status = payload
+            story.append(Paragraph(f"{name}: {ratio:.2f} [{status}]", styles['CalcResult']))
+        else:
+            story.append(Paragraph(payload, style_of[kind]))
+
+    plot_paths = plot_paths or {}
+    plots = [(k, w, h) for k, w, h in (('moment_plot', 6.0, 4.5), ('section_plot', 4.0, 3.2))
+             if k in plot_paths and os.path.exists(plot_paths[k])]
+    if plots:
+        story.append(Paragraph("11. GRÁFICOS", styles['HeaderCustom']))
+        for k, w, h in plots:
+            story.append(Image(plot_paths[k], width=w * inch, height=h * inch, kind='proportional'))
+    return story
@@ -0,0 +1,41 @@
+from PyQt5.QtWidgets import QComboBox, QCompleter
+from PyQt5.QtCore import Qt, QStringListModel, pyqtSignal
+
+
+class SectionSelector(QComboBox):
+    """
+    Selector de perfiles con búsqueda mientras se escribe.
+    Es un QComboBox editable cuyo QCompleter se alimenta con las sugerencias
+    que entrega el controlador (consultas al índice de perfiles); admite
+    prefijos de etiqueta ("W18") y filtros de propiedades ("d>=16 Ix>=800").
+    """
+    searchTextEdited = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.setMaxVisibleItems(20)
+
+        self._model = QStringListModel(self)
+        self._completer = QCompleter(self._model, self)
+        self._completer.setCaseSensitivity(Qt.CaseInsensitive)
+        # El filtrado lo hace el índice; el completer muestra todas las sugerencias
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._completer.setMaxVisibleItems(15)
+        self.setCompleter(self._completer)
+
+        self.lineEdit().textEdited.connect(self.searchTextEdited)
+        self.lineEdit().setPlaceholderText("W18X35, d>=16, Ix>=800 ...")
+
+    def set_labels(self, labels):
+        """Carga la lista completa de perfiles (orden de presentación)."""
+        self.clear()
+        self.addItems(labels)
+        self._model.setStringList(labels)
+
+    def set_suggestions(self, labels):
+        """Actualiza las sugerencias del completer con el resultado de una búsqueda."""
+        self._model.setStringList(labels)
+        if labels and self.lineEdit().hasFocus():
+            self._completer.complete()
@@ -1,8 +1,10 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QFormLayout, QLineEdit, QComboBox, QPushButton, 
-                             QLabel, QTabWidget, QScrollArea, QGroupBox)
+                             QLabel, QTabWidget, QScrollArea, QGroupBox,
+                             QTableWidget, QSplitter)
 from PyQt5.QtCore import Qt
-from .plotting_widgets import DiagramWidget, CrossSectionWidget, SteelTipsFiguresWidget
+from .input_widgets import SectionSelector
+from .plotting_widgets import DiagramWidget, CrossSectionWidget, SteelTipsFiguresWidget, ComparisonChartWidget
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -49,7 +51,7 @@ class MainWindow(QMainWindow):
         form_mat = QFormLayout()
         self.fc_input = QLineEdit("3.0")
         self.fy_input = QLineEdit("50")
-        self.section_combo = QComboBox()
+        self.section_combo = SectionSelector()
         self.slab_thick_input = QLineEdit("2.5")
         
         # Deck Inputs
@@ -83,26 +85,59 @@ class MainWindow(QMainWindow):
         self.stud_params_widget = QWidget()
         form_stud = QFormLayout(self.stud_params_widget)
         self.stud_diam_combo = QComboBox()
-        self.stud_diam_combo.addItems(["1/2", "5/8", "3/4", "7/8"])
+        self.stud_diam_combo.addItems(["1/2", "5/8", "3/4"])
         self.stud_diam_combo.setCurrentText("3/4")
         self.stud_fu_input = QLineEdit("65")
+        self.stud_height_input = QLineEdit("")
+        self.stud_height_input.setPlaceholderText("hr + 2")
+        self.studs_per_rib_combo = QComboBox()
+        self.studs_per_rib_combo.addItems(["1", "2", "3"])
         form_stud.addRow("Diámetro (in):", self.stud_diam_combo)
         form_stud.addRow("Fu (ksi):", self.stud_fu_input)
+        form_stud.addRow("Altura Hs (in):", self.stud_height_input)
+        form_stud.addRow("Pernos por Rib:", self.studs_per_rib_combo)
         vbox_conn.addWidget(self.stud_params_widget)
         
         self.channel_params_widget = QWidget()
         form_chan = QFormLayout(self.channel_params_widget)
-        self.channel_tf_input = QLineEdit("0.3") 
-        self.channel_tw_input = QLineEdit("0.2") 
+        self.channel_combo = QComboBox()
+        self.channel_info_label = QLabel("")
         self.channel_len_input = QLineEdit("4.0") 
-        form_chan.addRow("Espesor Ala (in):", self.channel_tf_input)
-        form_chan.addRow("Espesor Alma (in):", self.channel_tw_input)
+        form_chan.addRow("Perfil C:", self.channel_combo)
+        form_chan.addRow("tf / tw (in):", self.channel_info_label)
         form_chan.addRow("Longitud (in):", self.channel_len_input)
         vbox_conn.addWidget(self.channel_params_widget)
         self.channel_params_widget.setVisible(False) 
         
         grp_conn.setLayout(vbox_conn)
         scroll_layout.addWidget(grp_conn)
+
+        # Grupo 4: Carga Móvil (estacionamientos)
+        grp_veh = QGroupBox("Carga Móvil")
+        form_veh = QFormLayout()
+        self.vehicle_combo = QComboBox()
+        self.vehicle_combo.addItem("Ninguno")
+        self.distribution_input = QLineEdit("1.0")
+        form_veh.addRow("Vehículo:", self.vehicle_combo)
+        form_veh.addRow("Fracción por viga:", self.distribution_input)
+        grp_veh.setLayout(form_veh)
+        scroll_layout.addWidget(grp_veh)
+
+        # Grupo 5: Comparación de Perfiles
+        grp_cmp = QGroupBox("Comparación de Perfiles")
+        form_cmp = QFormLayout()
+        self.family_combo = QComboBox()
+        self.weight_min_input = QLineEdit("")
+        self.weight_max_input = QLineEdit("")
+        self.weight_min_input.setPlaceholderText("Sin límite")
+        self.weight_max_input.setPlaceholderText("Sin límite")
+        self.compare_btn = QPushButton("Comparar Perfiles")
+        form_cmp.addRow("Familia:", self.family_combo)
+        form_cmp.addRow("Peso mín. (lb/ft):", self.weight_min_input)
+        form_cmp.addRow("Peso máx. (lb/ft):", self.weight_max_input)
+        form_cmp.addRow(self.compare_btn)
+        grp_cmp.setLayout(form_cmp)
+        scroll_layout.addWidget(grp_cmp)
         
         scroll_input.setWidget(scroll_content)
         input_layout.addWidget(scroll_input)
@@ -137,6 +172,15 @@ class MainWindow(QMainWindow):
         
         self.section_widget = CrossSectionWidget()
         self.tabs.addTab(self.section_widget, "Sección")
+
+        # Comparación: tabla de ratios + gráfico de utilización
+        cmp_splitter = QSplitter(Qt.Vertical)
+        self.comparison_table = QTableWidget()
+        self.comparison_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.comparison_chart = ComparisonChartWidget()
+        cmp_splitter.addWidget(self.comparison_table)
+        cmp_splitter.addWidget(self.comparison_chart)
+        self.comparison_tab_index = self.tabs.addTab(cmp_splitter, "Comparación")
         
         # Añadir al content layout (Horizontal)
         content_layout.addWidget(input_panel, 1)
@@ -0,0 +1,404 @@
+"""
+Dibujos de la sección transversal y de las figuras 'Steel Tips' sobre ejes
+de matplotlib, sin Qt: los usan los widgets de plotting_widgets y el
+renderizador sin pantalla (Agg) de las memorias por lotes.
+
+Cada figura se separa en la parte estática, que depende solo del perfil y
+de la geometría del deck/conector, y la parte propia de cada diseño (b_eff,
+PNA, fuerzas). FigureRenderer reutiliza sus figuras, guarda la parte
+estática prerrasterizada por clave y en cada memoria dibuja encima solo la
+parte variable.
+"""
+import io
+import numpy as np
+import matplotlib.patches as patches
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import NullLocator
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+COLOR_STEEL = '#4F4F4F'
+COLOR_CONC = '#E0E0E0'
+COLOR_DECK = '#333333'
+
+
+def _rect(x0, y0, b, h):
+    return np.array([[x0, y0], [x0 + b, y0], [x0 + b, y0 + h], [x0, y0 + h]])
+
+
+def steel_polygons(d, bf, tf, tw):
+    """Alma y alas del perfil I como polígonos (base del acero en y = 0)."""
+    return [_rect(-tw/2, 0, tw, d), _rect(-bf/2, 0, bf, tf), _rect(-bf/2, d-tf, bf, tf)]
+
+
+def _add_polygons(ax, polygons, **style):
+    ax.add_collection(PolyCollection(polygons, closed=True, **style))
+
+
+# --- Sección transversal simplificada ---
+def section_static(ax, d, bf, tf, tw, tc, hr, wr):
+    """Perfil, losa y rib: dependen solo del perfil y del deck."""
+    _add_polygons(ax, steel_polygons(d, bf, tf, tw), facecolor=COLOR_STEEL, edgecolor=COLOR_STEEL)
+    _add_polygons(ax, [_rect(-12, d+hr, 24, tc), _rect(-wr/2, d, wr, hr)], facecolor=COLOR_CONC, edgecolor=COLOR_DECK)
+
+
+def section_limits(d, tc, hr):
+    return (-20, 20, -5, d + hr + tc + 5)
+
+
+def section_overlay(ax, pna_bottom):
+    if pna_bottom is not None:
+        ax.axhline(pna_bottom, color='red', linestyle='--', linewidth=1.5)
+        ax.text(-16, pna_bottom, "PNA", color='red', va='center', ha='right', fontweight='bold')
+
+
+def pna_elevation(inputs, strength):
+    """Altura del PNA sobre la base del acero (en el acero o en la losa)."""
+    beam = inputs['beam_properties']
+    if strength['y_pna'] > 0:
+        return beam['d'] - strength['y_pna']
+    return beam['d'] + inputs['rib_height'] + inputs['slab_thickness'] - strength['a']
+
+
+def draw_section(ax, inputs, pna_bottom=None):
+    """Sección transversal completa (widget 'Sección')."""
+    beam = inputs['beam_properties']
+    d, tc, hr = beam['d'], inputs['slab_thickness'], inputs['rib_height']
+    section_static(ax, d, beam['bf'], beam['tf'], beam['tw'], tc, hr, inputs['rib_width'])
+    section_overlay(ax, pna_bottom)
+    _finish_section(ax, section_limits(d, tc, hr))
+
+
+def _finish_section(ax, limits):
+    ax.set_xlim(*limits[:2])
+    ax.set_ylim(*limits[2:])
+    ax.set_aspect('equal')
+    ax.axis('off')
+    ax.set_title("Sección Transversal Simplificada", fontsize=10)
+
+
+# --- Figuras Steel Tips ---
+def plot_plan(ax, L, S):
+    ax.set_title("Figura 1: Planta Típica", fontsize=10, fontweight='bold')
+
+    # Dibujar vigas como líneas
+    num_beams = 3
+    margin = S * 0.5
+    total_width = S * (num_beams - 1) + 2*margin
+
+    # Girders verticales a izq y der
+    ax.plot([0, 0], [0, total_width], color='black', lw=2) # Girder Left
+    ax.plot([L, L], [0, total_width], color='black', lw=2) # Girder Right
+
+    # Vigas interiores horizontales
+    for i in range(num_beams):
+        y = margin + i * S
+        ax.plot([0, L], [y, y], color='blue', lw=1.5)
+        ax.text(L/2, y + S*0.1, "Viga A", color='blue', ha='center', fontsize=8)
+
+    # Span (Flecha L) debajo de las vigas
+    dim_y = -S * 0.3
+    ax.annotate('', xy=(0, dim_y), xytext=(L, dim_y),
+                arrowprops=dict(arrowstyle='<|-|>', color='black', lw=1.2))
+    ax.text(L/2, dim_y - S*0.15, f'Span L = {L} ft', ha='center', va='top', fontsize=9, color='black')
+
+    # Spacing
+    y_mid = margin + S
+    ax.annotate(f's = {S} ft', xy=(-L*0.1, y_mid), xytext=(-L*0.1, y_mid - S),
+                arrowprops=dict(arrowstyle='<->'), va='center', rotation=90)
+
+    ax.set_xlim(-L*0.2, L*1.2)
+    ax.set_ylim(-S, total_width + S*0.5)
+
+
+def eff_width_static(ax, d, bf, tf, tw, hr):
+    """Viga I y rib simplificado de la Figura 2 (sin la losa, que depende de b_eff)."""
+    _add_polygons(ax, steel_polygons(d, bf, tf, tw), facecolor='#555', edgecolor='#555')
+    _add_polygons(ax, [_rect(-2, d, 4, hr)], facecolor='#ddd', edgecolor='black')
+
+
+def eff_width_static_extent(d, bf, hr):
+    half = max(bf / 2, 2.0) + 0.5
+    return (-half, half, -0.5, d + hr + 0.5)
+
+
+def eff_width_overlay(ax, d, tc, hr, b_eff):
+    """Losa efectiva, cotas y límites de la Figura 2."""
+    ax.add_patch(patches.Rectangle((-b_eff/2, d+hr), b_eff, tc, color='#ddd', ec='black'))
+
+    y_dim = d + hr + tc + 2
+    ax.annotate(f'b = {b_eff:.1f}"', xy=(-b_eff/2, y_dim), xytext=(b_eff/2, y_dim),
+                arrowprops=dict(arrowstyle='<->'), ha='center')
+    ax.text(b_eff/2 + 2, d + hr + tc/2, f"tc={tc}\"", va='center', fontsize=8)
+    ax.text(4, d + hr/2, f"hr={hr}\"", va='center', fontsize=8)
+
+    limits = eff_width_limits(d, tc, hr, b_eff)
+    ax.set_xlim(*limits[:2])
+    ax.set_ylim(*limits[2:])
+
+
+def eff_width_limits(d, tc, hr, b_eff):
+    return (-b_eff/1.5, b_eff/1.5, -2, d + hr + tc + 10)
+
+
+def plot_eff_width(ax, d, bf, tf, tw, tc, hr, b_eff):
+    ax.set_title("Figura 2: Ancho Efectivo", fontsize=10, fontweight='bold')
+    eff_width_static(ax, d, bf, tf, tw, hr)
+    eff_width_overlay(ax, d, tc, hr, b_eff)
+
+
+def deck_detail_static(ax, tc, hr, wr, Hs, c_type, c_props):
+    """Deck ondulado, concreto y conector de la Figura 3 (sin título ni límites)."""
+    rib_pitch = 12.0 # Standard
+    start_x = -rib_pitch
+    y_bot = 0
+    y_top = hr
+
+    # Losa sólida
+    ax.add_patch(patches.Rectangle((start_x, y_top), rib_pitch*2.5, tc, color='#eee', ec='none'))
+
+    deck_line_x = []
+    deck_line_y = []
+    for i in range(3):
+        x_base = start_x + i*rib_pitch
+
+        # Puntos del rib
+        x1 = x_base
+        x2 = x_base + (rib_pitch-wr)/2
+        x3 = x2
+        x4 = x_base + (rib_pitch+wr)/2
+        x5 = x4
+        x6 = x_base + rib_pitch
+
+        deck_line_x.extend([x1, x2, x3, x4, x5, x6])
+        deck_line_y.extend([y_top, y_top, y_bot, y_bot, y_top, y_top])
+
+        # Relleno de concreto en el rib (ligeramente trapezoidal)
+        ax.add_patch(patches.Polygon([[x2, y_top], [x2 + 0.5, y_bot], [x4 - 0.5, y_bot], [x4, y_top]],
+                                     closed=True, color='#eee', ec='none'))
+
+        # Conector en el rib central
+        if i == 1:
+            center_x = (x2 + x4) / 2
+
+            if c_type == 'Stud':
+                # Stud: poste con cabeza y cota
+                stud_h = Hs
+                ax.plot([center_x, center_x], [y_bot, y_bot + stud_h], color='black', lw=2)
+                ax.plot([center_x-0.4, center_x+0.4], [y_bot + stud_h, y_bot + stud_h], color='black', lw=4)
+                ax.text(center_x + 1, y_bot + stud_h/2, f"Hs={stud_h}\"", fontsize=8)
+
+            elif c_type == 'Channel':
+                # Channel (C-Shape) como rectángulo relleno
+                chan_h = min(3.0, hr - 0.5)
+                chan_len = c_props.get('length', 4.0) # Longitud La
+
+                rect_w = chan_len if chan_len < wr else wr - 1 # Ajuste visual
+                rect_x = center_x - rect_w/2
+                ax.add_patch(patches.Rectangle((rect_x, y_bot), rect_w, chan_h, color='#555', ec='black'))
+                ax.text(center_x, y_bot + chan_h + 0.5, f"Channel\nL={chan_len}\"", ha='center', fontsize=8)
+
+    ax.plot(deck_line_x, deck_line_y, color='black', lw=1)
+
+    # Cota wr
+    center_rib_x = start_x + rib_pitch + rib_pitch/2
+    ax.annotate(f'wr={wr}"', xy=(center_rib_x - wr/2, y_bot-0.5), xytext=(center_rib_x + wr/2, y_bot-0.5),
+                arrowprops=dict(arrowstyle='<->'), ha='center')
+
+
+def deck_detail_limits(tc, hr):
+    return (-5, 20, -2, hr + tc + 2)
+
+
+def plot_deck_detail(ax, tc, hr, wr, Hs, c_type, c_props):
+    """Detalle del rib con el conector apropiado (Stud o Channel)."""
+    ax.set_title(f"Figura 3: Detalle Conector ({c_type})", fontsize=10, fontweight='bold')
+    deck_detail_static(ax, tc, hr, wr, Hs, c_type, c_props)
+    limits = deck_detail_limits(tc, hr)
+    ax.set_xlim(*limits[:2])
+    ax.set_ylim(*limits[2:])
+
+
+def plot_forces(ax, d, hr, tc, a, results):
+    ax.set_title("Figura 4: Distribución de Fuerzas", fontsize=10, fontweight='bold')
+
+    total_h = d + hr + tc
+
+    # 1. Diagrama de la sección (Esquemático vertical)
+    x_sec = 0
+    ax.plot([x_sec, x_sec], [0, total_h], color='black', lw=1)
+    ax.plot([x_sec-1, x_sec+1], [0, 0], color='black') # Bot
+    ax.plot([x_sec-1, x_sec+1], [d, d], color='black') # Top Steel
+    ax.plot([x_sec-2, x_sec+2], [total_h, total_h], color='black') # Top Conc
+
+    # 2. Bloque de Compresión (C)
+    x_force = 4
+    y_top = total_h
+    y_bot_a = total_h - a
+    ax.add_patch(patches.Rectangle((x_force, y_bot_a), 2, a, color='#ffcccc', ec='red'))
+
+    # Flecha C
+    c_y = y_top - a/2
+    ax.arrow(x_force + 4, c_y, -2, 0, head_width=1, head_length=0.5, fc='red', ec='red')
+
+    # Valor de C (Manejo seguro de la clave C_force)
+    c_val = results.get('C_force', 0.0)
+    if c_val == 0.0 and 'strength' in results and 'C_force' in results['strength']:
+        c_val = results['strength']['C_force']
+    ax.text(x_force + 4.5, c_y, f"C = {c_val:.1f} k", color='red', va='center', fontsize=8)
+
+    # 3. Flecha T (Tensión)
+    t_y = d/2
+    ax.arrow(x_force + 4, t_y, -2, 0, head_width=1, head_length=0.5, fc='blue', ec='blue')
+    ax.text(x_force + 4.5, t_y, "T = AsFy", color='blue', va='center', fontsize=8)
+
+    # 4. Cotas
+    ax.annotate(f'a={a:.2f}"', xy=(x_force-0.5, y_top), xytext=(x_force-0.5, y_bot_a),
+                arrowprops=dict(arrowstyle='<->'), ha='center', color='red')
+    ax.annotate(f'Brazo', xy=(x_force + 1, t_y), xytext=(x_force + 1, c_y),
+                arrowprops=dict(arrowstyle='<->'), ha='center')
+
+    ax.set_xlim(-5, 15)
+    ax.set_ylim(-2, total_h + 2)
+
+
+def stud_height(inputs):
+    """Altura del stud (hr + 2 si no se indica)."""
+    return inputs.get('connector_props', {}).get('height') or inputs['rib_height'] + 2.0
+
+
+class FigureRenderer:
+    """
+    Renderizador sin pantalla (Agg) de la sección y de las figuras Steel Tips
+    para memorias por lotes. Reutiliza sus figuras entre memorias y guarda a
+    nivel de clase la parte estática de cada dibujo por clave (perfil y
+    geometría del deck/conector):
+        _backgrounds: imagen RGBA prerrasterizada y su extensión en datos
+    Los fondos se rasterizan a la escala de los ejes de destino (mismo dpi y
+    pulgadas de papel por unidad de dibujo), de modo que líneas y textos
+    quedan del mismo tamaño que en el dibujo vectorial. Con raster=False (por
+    defecto) la parte estática se dibuja como vector en cada memoria: con
+    los dibujos actuales, de pocos polígonos, la imagen no resulta más rápida
+    y el costo lo dominan el guardado del PNG y la creación de los ejes, que
+    se evitan reutilizando las figuras.
+    """
+    _backgrounds = {}
+
+    def __init__(self, dpi=150, raster=False):
+        self.dpi = dpi
+        self.raster = raster
+        self._section_fig = None
+        self._tips_fig = None
+
+    @classmethod
+    def background(cls, key, extent, draw, inches_per_unit, dpi):
+        """Imagen RGBA del dibujo estático draw(ax) en la extensión (x0, x1, y0, y1)."""
+        key = key + (dpi,)
+        if key not in cls._backgrounds:
+            x0, x1, y0, y1 = extent
+            fig = Figure(figsize=((x1 - x0) * inches_per_unit, (y1 - y0) * inches_per_unit), dpi=dpi)
+            FigureCanvasAgg(fig)
+            fig.patch.set_alpha(0.0)
+            ax = fig.add_axes([0, 0, 1, 1])
+            ax.set_xlim(x0, x1)
+            ax.set_ylim(y0, y1)
+            ax.axis('off')
+            draw(ax)
+            fig.canvas.draw()
+            cls._backgrounds[key] = np.asarray(fig.canvas.buffer_rgba()).copy()
+        return cls._backgrounds[key]
+
+    def _static(self, ax, key, extent, draw, view):
+        """Parte estática en los ejes ax, cuya vista final será view = (x0, x1, y0, y1)."""
+        if self.raster:
+            fig, box = ax.figure, ax.get_position(original=True)
+            inches_per_unit = min(box.width * fig.get_figwidth() / (view[1] - view[0]),
+                                  box.height * fig.get_figheight() / (view[3] - view[2]))
+            ax.imshow(self.background(key, extent, draw, inches_per_unit, fig.dpi), extent=extent,
+                      interpolation='nearest', zorder=0.5, aspect='equal')
+        else:
+            draw(ax)
+
+    @staticmethod
+    def _axes(fig, n):
+        """Ejes persistentes sin ejes visibles ni marcas (no se recalculan al guardar)."""
+        for i in range(n):
+            ax = fig.add_subplot(1, 1, 1) if n == 1 else fig.add_subplot(221 + i)
+            ax.xaxis.set_major_locator(NullLocator())
+            ax.yaxis.set_major_locator(NullLocator())
+            ax.set_aspect('equal')
+            ax.axis('off')
+        return fig.axes
+
+    @staticmethod
+    def _reset(ax):
+        """Quita los artistas de la memoria anterior sin ax.clear(), que reconstruye los ejes."""
+        for artist in [*ax.patches, *ax.lines, *ax.texts, *ax.images, *ax.collections]:
+            artist.remove()
+        ax.relim()
+
+    @staticmethod
+    def _save(fig, path):
+        if path is None:
+            buf = io.BytesIO()
+            fig.savefig(buf, format='png')
+            return buf.getvalue()
+        fig.savefig(path)
+        return path
+
+    def render_section(self, inputs, pna_bottom=None, path=None):
+        """PNG de la sección transversal (ruta o bytes si path es None)."""
+        if self._section_fig is None:
+            self._section_fig = Figure(figsize=(5, 4), dpi=self.dpi)
+            FigureCanvasAgg(self._section_fig)
+            self._axes(self._section_fig, 1)
+        fig = self._section_fig
+        ax = fig.axes[0]
+        self._reset(ax)
+
+        beam = inputs['beam_properties']
+        d, bf, tf, tw = beam['d'], beam['bf'], beam['tf'], beam['tw']
+        tc, hr, wr = inputs['slab_thickness'], inputs['rib_height'], inputs['rib_width']
+        limits = section_limits(d, tc, hr)
+        self._static(ax, ("section", d, bf, tf, tw, tc, hr, wr), limits,
+                     lambda a: section_static(a, d, bf, tf, tw, tc, hr, wr), limits)
+        section_overlay(ax, pna_bottom)
+        _finish_section(ax, limits)
+        return self._save(fig, path)
+
+    def render_steel_tips(self, inputs, results, path=None):
+        """PNG de las 4 figuras Steel Tips (ruta o bytes si path es None)."""
+        if self._tips_fig is None:
+            self._tips_fig = Figure(figsize=(10, 8), dpi=self.dpi)
+            FigureCanvasAgg(self._tips_fig)
+            self._axes(self._tips_fig, 4)
+            self._tips_fig.subplots_adjust(hspace=0.3, wspace=0.3, left=0.05, right=0.95, top=0.92, bottom=0.05)
+        fig = self._tips_fig
+        ax1, ax2, ax3, ax4 = fig.axes
+        for ax in fig.axes:
+            self._reset(ax)
+
+        beam = inputs['beam_properties']
+        d, bf, tf, tw = beam['d'], beam['bf'], beam['tf'], beam['tw']
+        tc, hr, wr = inputs['slab_thickness'], inputs['rib_height'], inputs['rib_width']
+        b_eff, a = results['strength']['b_eff'], results['strength']['a']
+
+        plot_plan(ax1, inputs['span_ft'], inputs['spacing_ft'])
+
+        ax2.set_title("Figura 2: Ancho Efectivo", fontsize=10, fontweight='bold')
+        self._static(ax2, ("eff_width", d, bf, tf, tw, hr), eff_width_static_extent(d, bf, hr),
+                     lambda a_: eff_width_static(a_, d, bf, tf, tw, hr), eff_width_limits(d, tc, hr, b_eff))
+        eff_width_overlay(ax2, d, tc, hr, b_eff)
+
+        c_type = inputs.get('connector_type', 'Stud')
+        c_props = inputs.get('connector_props', {})
+        Hs = stud_height(inputs)
+        limits = deck_detail_limits(tc, hr)
+        ax3.set_title(f"Figura 3: Detalle Conector ({c_type})", fontsize=10, fontweight='bold')
+        self._static(ax3, ("deck", tc, hr, wr, Hs, c_type, c_props.get('length', 4.0)), limits,
+                     lambda a_: deck_detail_static(a_, tc, hr, wr, Hs, c_type, c_props), limits)
+        ax3.set_xlim(*limits[:2])
+        ax3.set_ylim(*limits[2:])
+
+        plot_forces(ax4, d, hr, tc, a, results)
+        return self._save(fig, path)